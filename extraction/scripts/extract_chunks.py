@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""Run chunk extraction concurrently with retries, resuming from progress.json.
+
+Pending chunks (anything not completed, or completed without a chunk file)
+are claimed in the journaled progress store and handed to N workers; several
+runs can work on the same workspace at once. Each chunk is retried with exponential backoff and
+written atomically to chunks/chunk-NN.json, so a crash never leaves a
+half-written chunk and re-running picks up where the last run stopped.
+
+The extractor backend is a plug-in: any class with an
+extract(chunk, image_paths) method returning a list of items. The built-in
+"stub" backend is deterministic and offline, for testing the pipeline.
+
+Usage:
+    python3 extraction/scripts/extract_chunks.py [--workers 4] [--backend stub]
+    python3 extraction/scripts/extract_chunks.py --backend mypkg.vision:VisionExtractor
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+EXTRACTION_DIR = Path(__file__).parent.parent
+
+sys.path.insert(0, str(EXTRACTION_DIR.parent / "scripts"))
+sys.path.insert(0, str(Path(__file__).parent))
+from food_model import Flag, HistamineLevel
+from progress_store import ProgressStore, default_owner
+
+# (category, subcategory) sections the stub backend cycles through
+STUB_SECTIONS = [
+    ("ANIMAL_PRODUCTS", "DAIRY"),
+    ("PLANT_PRODUCTS", "VEGETABLES"),
+    ("BEVERAGES", "WATER"),
+    ("FOOD_ADDITIVES", "FOOD_ADDITIVES"),
+]
+
+
+class Extractor:
+    """Base class for extractor backends."""
+
+    def extract(self, chunk: dict, image_paths: list) -> list:
+        """Return the food items found on the chunk's pages.
+
+        Items use the chunk schema (name, histamineLevel, flags, notes,
+        category, subcategory). category/subcategory may be None when the
+        section header is on an earlier page; they are filled in afterwards.
+        Raise any exception to have the chunk retried.
+        """
+        raise NotImplementedError
+
+
+class StubExtractor(Extractor):
+    """Deterministic offline backend: synthesizes items from page numbers.
+
+    delay simulates backend latency; every fail_every-th chunk fails on its
+    first attempt to exercise the retry path.
+    """
+
+    def __init__(self, items_per_page: int = 3, delay: float = 0.0, fail_every: int = 0):
+        self.items_per_page = items_per_page
+        self.delay = delay
+        self.fail_every = fail_every
+        self._attempts = {}
+        self._lock = threading.Lock()
+
+    def extract(self, chunk: dict, image_paths: list) -> list:
+        with self._lock:
+            attempt = self._attempts.get(chunk["chunkId"], 0) + 1
+            self._attempts[chunk["chunkId"]] = attempt
+
+        time.sleep(self.delay)
+        if self.fail_every and chunk["chunkId"] % self.fail_every == 0 and attempt == 1:
+            raise RuntimeError(f"stub failure for chunk {chunk['chunkId']}")
+
+        levels = list(HistamineLevel)
+        flags = list(Flag)
+        first, last = chunk["pages"]
+        items = []
+        for page in range(first, last + 1):
+            for n in range(self.items_per_page):
+                seed = page * self.items_per_page + n
+                # Only the first item of a page carries its section
+                section = STUB_SECTIONS[(page // 4) % len(STUB_SECTIONS)] if n == 0 else (None, None)
+                items.append({
+                    "name": f"stub food {page}-{n + 1}",
+                    "histamineLevel": levels[seed % len(levels)].name,
+                    "flags": flags[seed % len(flags)].names() if seed % 3 == 0 else [],
+                    "notes": "",
+                    "category": section[0],
+                    "subcategory": section[1],
+                })
+        return items
+
+
+BACKENDS = {
+    "stub": StubExtractor,
+}
+
+
+def load_backend(spec: str, options: dict) -> Extractor:
+    """Instantiate a backend by name ("stub") or "module:Class" path."""
+    if spec in BACKENDS:
+        cls = BACKENDS[spec]
+    else:
+        module_name, _, class_name = spec.partition(":")
+        if not class_name:
+            raise ValueError(f"Backend must be one of {sorted(BACKENDS)} or 'module:Class': {spec}")
+        cls = getattr(importlib.import_module(module_name), class_name)
+    return cls(**options)
+
+
+def write_json_atomic(path: Path, data) -> None:
+    """Write JSON to a temporary file and rename it into place."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def chunk_path(chunks_dir: Path, chunk_id: int) -> Path:
+    """Return the chunk file path for a chunk id."""
+    return chunks_dir / f"chunk-{chunk_id:02d}.json"
+
+
+def pending_chunks(progress: dict, chunks_dir: Path) -> list:
+    """Return chunks that still need extraction (crashed in-progress ones included)."""
+    return [
+        chunk for chunk in progress.get("chunks", [])
+        if chunk["status"] != "completed" or not chunk_path(chunks_dir, chunk["chunkId"]).exists()
+    ]
+
+
+def run_chunk(backend: Extractor, chunk: dict, images_dir: Path, chunks_dir: Path,
+              progress: ProgressStore, retries: int, backoff: float) -> int:
+    """Extract one claimed chunk with retries; return the number of items written."""
+    first, last = chunk["pages"]
+    # Prefer cropped row bands from prepare_images.py over full pages
+    # (imported here: it loads Pillow, which nothing else in this module needs)
+    from prepare_images import load_prepared
+
+    prepared = load_prepared(images_dir)
+    image_paths = []
+    for page in range(first, last + 1):
+        image_paths.extend(prepared.get(page) or [images_dir / f"page-{page:02d}.png"])
+
+    for attempt in range(retries + 1):
+        try:
+            items = backend.extract(chunk, image_paths)
+            break
+        except Exception as e:
+            if attempt == retries:
+                progress.update_chunk(chunk["chunkId"], status="failed", error=str(e))
+                raise
+            # Exponential backoff with jitter so retries don't synchronize
+            time.sleep(backoff * (2 ** attempt) * (0.5 + random.random()))
+
+    write_json_atomic(chunk_path(chunks_dir, chunk["chunkId"]), {
+        "chunkId": chunk["chunkId"],
+        "pages": chunk["pages"],
+        "items": items,
+    })
+    progress.update_chunk(chunk["chunkId"], status="completed", itemsExtracted=len(items))
+    return len(items)
+
+
+def fill_sections(progress: dict, chunks_dir: Path) -> int:
+    """Carry category/subcategory forward across chunks in page order.
+
+    Chunks run out of order, so a chunk can't know the section a previous
+    page opened. Returns the number of items that were filled in.
+    """
+    filled = 0
+    category = subcategory = None
+    for chunk in sorted(progress.get("chunks", []), key=lambda c: c["chunkId"]):
+        path = chunk_path(chunks_dir, chunk["chunkId"])
+        if not path.exists():
+            category = subcategory = None
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        changed = 0
+        for item in data.get("items", []):
+            missing = not item.get("category") or not item.get("subcategory")
+            if item.get("category"):
+                if item["category"] != category:
+                    subcategory = None
+                category = item["category"]
+            elif category:
+                item["category"] = category
+            if item.get("subcategory"):
+                subcategory = item["subcategory"]
+            elif subcategory:
+                item["subcategory"] = subcategory
+            changed += missing
+        if changed:
+            write_json_atomic(path, data)
+        filled += changed
+    return filled
+
+
+def extract_chunks(backend: Extractor, workers: int = 4, retries: int = 3,
+                   backoff: float = 1.0, limit: int = None) -> dict:
+    """Extract all pending chunks; return a summary dict."""
+    images_dir = EXTRACTION_DIR / "images"
+    chunks_dir = EXTRACTION_DIR / "chunks"
+    chunks_dir.mkdir(exist_ok=True)
+    progress = ProgressStore(EXTRACTION_DIR)
+
+    # Completed chunks whose file went missing must be extracted again
+    pending = pending_chunks(progress.load(), chunks_dir)
+    for chunk in pending:
+        if chunk["status"] == "completed":
+            progress.update_chunk(chunk["chunkId"], status="pending")
+    todo = {chunk["chunkId"] for chunk in pending}
+    print(f"Pending chunks: {len(todo)} (workers: {workers})")
+
+    progress.set_status("in_progress")
+    owner = default_owner()
+    completed, failed, items = 0, 0, 0
+    start = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        while True:
+            # Claim only as many chunks as there are idle workers, so
+            # concurrent runs on the same workspace share the remaining work
+            room = workers - len(futures)
+            if limit is not None:
+                room = min(room, limit - completed - failed - len(futures))
+            if room > 0 and todo:
+                for chunk in progress.claim(owner, chunk_ids=todo, limit=room):
+                    todo.discard(chunk["chunkId"])
+                    future = pool.submit(run_chunk, backend, chunk, images_dir, chunks_dir,
+                                         progress, retries, backoff)
+                    futures[future] = chunk
+            if not futures:
+                break
+
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk_id = futures.pop(future)["chunkId"]
+                try:
+                    count = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"Chunk {chunk_id}: failed ({e})")
+                else:
+                    completed += 1
+                    items += count
+                    print(f"Chunk {chunk_id}: {count} items")
+
+    state = progress.load()
+    remaining = pending_chunks(state, chunks_dir)
+    if not remaining:
+        fill_sections(state, chunks_dir)
+    progress.set_status("completed" if not remaining else "in_progress")
+    progress.compact()
+
+    return {
+        "completed": completed,
+        "failed": failed,
+        "items": items,
+        "remaining": len(remaining),
+        "seconds": round(time.monotonic() - start, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract pending chunks concurrently.")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent chunks (default: 4)")
+    parser.add_argument("--backend", default="stub", help="'stub' or 'module:Class' (default: stub)")
+    parser.add_argument("--option", action="append", default=[], metavar="KEY=VALUE",
+                        help="Backend constructor option (JSON value), repeatable")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per chunk (default: 3)")
+    parser.add_argument("--backoff", type=float, default=1.0, help="Initial backoff seconds (default: 1)")
+    parser.add_argument("--limit", type=int, help="Process at most this many chunks")
+    args = parser.parse_args()
+
+    options = {}
+    for option in args.option:
+        key, _, value = option.partition("=")
+        try:
+            options[key] = json.loads(value)
+        except json.JSONDecodeError:
+            options[key] = value
+
+    backend = load_backend(args.backend, options)
+    summary = extract_chunks(backend, args.workers, args.retries, args.backoff, args.limit)
+
+    print(f"\nCompleted: {summary['completed']}, failed: {summary['failed']}, "
+          f"items: {summary['items']}, remaining: {summary['remaining']} "
+          f"({summary['seconds']}s)")
+    return summary["failed"] == 0
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -1,20 +1,103 @@
 #!/usr/bin/env python3
 """Merge all chunk JSON files into final output JSON.
-Reads language and chunk count from progress.json."""
+Reads language and chunk count from progress.json.
 
+With --run-size N the merge runs in bounded memory: dedupe keys are sorted
+in runs of N on disk and k-way merged, and the output is streamed. The
+result is byte-identical to the in-memory merge.
+
+Usage:
+    python3 extraction/scripts/merge_chunks.py [lang] [--run-size N] [--tmp-dir DIR]
+"""
+
+import argparse
+import heapq
 import json
+import os
 import sys
+import tempfile
 from pathlib import Path
 from datetime import date
 
-def merge_chunks(lang_override=None):
-    extraction_dir = Path(__file__).parent.parent
-    chunks_dir = extraction_dir / "chunks"
-    output_dir = extraction_dir / "output"
-    progress_file = extraction_dir / "progress.json"
-    output_dir.mkdir(exist_ok=True)
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from food_ids import IdRegistry, food_identity, registry_path
+from food_model import FLAG_ABBREVIATIONS, Category, Flag, HistamineLevel
+from food_store import write_store
 
-    # Read progress to get language and chunk count
+# Most runs merged at once; more are first merged into intermediate runs
+MAX_FAN_IN = 64
+
+# PDF abbreviation of each flag ("H", "A", ...)
+FLAG_CODES = {flag: code for code, flag in FLAG_ABBREVIATIONS.items()}
+
+
+def _by_name(table):
+    """Key a {member: info} table by member name, in table order."""
+    return {member.name: info for member, info in table.items()}
+
+
+ENUMS = {
+    "histamineLevel": _by_name({
+        HistamineLevel.WELL_TOLERATED: {"value": 0, "label": "Well tolerated", "color": "#4CAF50"},
+        HistamineLevel.MODERATELY_TOLERATED: {"value": 1, "label": "Moderately tolerated", "color": "#FFC107"},
+        HistamineLevel.POORLY_TOLERATED: {"value": 2, "label": "Poorly tolerated", "color": "#FF9800"},
+        HistamineLevel.VERY_POORLY_TOLERATED: {"value": 3, "label": "Very poorly tolerated", "color": "#F44336"},
+        HistamineLevel.INSUFFICIENT_INFO: {"value": -1, "label": "Insufficient info", "color": "#9E9E9E"},
+        HistamineLevel.VARIABLE: {"value": -2, "label": "Variable", "color": "#607D8B"}
+    }),
+    "flags": _by_name({
+        Flag.HIGH_HISTAMINE: {"code": FLAG_CODES[Flag.HIGH_HISTAMINE], "label": "High histamine content"},
+        Flag.FAST_SPOILAGE: {"code": FLAG_CODES[Flag.FAST_SPOILAGE], "label": "Fast spoilage / histamine accumulates quickly"},
+        Flag.OTHER_BIOGENIC_AMINES: {"code": FLAG_CODES[Flag.OTHER_BIOGENIC_AMINES], "label": "Other biogenic amines"},
+        Flag.HISTAMINE_LIBERATOR: {"code": FLAG_CODES[Flag.HISTAMINE_LIBERATOR], "label": "Histamine liberator"},
+        Flag.DAO_BLOCKER: {"code": FLAG_CODES[Flag.DAO_BLOCKER], "label": "DAO blocker"}
+    }),
+    "categories": _by_name({
+        Category.ANIMAL_PRODUCTS: {"label": "Animal products"},
+        Category.PLANT_PRODUCTS: {"label": "Plant products"},
+        Category.BEVERAGES: {"label": "Beverages"},
+        Category.FOOD_ADDITIVES: {"label": "Food additives"},
+        Category.DIETARY_SUPPLEMENTS: {"label": "Dietary supplements"},
+        Category.PREPARATIONS: {"label": "Preparations, mixtures"}
+    }),
+    "subcategories": {
+        "EGGS": {"label": "Eggs", "category": Category.ANIMAL_PRODUCTS.name},
+        "DAIRY": {"label": "Dairy products", "category": Category.ANIMAL_PRODUCTS.name},
+        "MEAT": {"label": "Meat", "category": Category.ANIMAL_PRODUCTS.name},
+        "FISH": {"label": "Fish", "category": Category.ANIMAL_PRODUCTS.name},
+        "SEAFOOD": {"label": "Seafood", "category": Category.ANIMAL_PRODUCTS.name},
+        "OTHER": {"label": "Other animal products", "category": Category.ANIMAL_PRODUCTS.name},
+        "STARCHES": {"label": "Starch sources", "category": Category.PLANT_PRODUCTS.name},
+        "NUTS": {"label": "Nuts, seeds", "category": Category.PLANT_PRODUCTS.name},
+        "OILS_FATS": {"label": "Oils, fats", "category": Category.PLANT_PRODUCTS.name},
+        "VEGETABLES": {"label": "Vegetables", "category": Category.PLANT_PRODUCTS.name},
+        "HERBS": {"label": "Herbs", "category": Category.PLANT_PRODUCTS.name},
+        "FRUITS": {"label": "Fruits", "category": Category.PLANT_PRODUCTS.name},
+        "MUSHROOMS": {"label": "Mushrooms, algae", "category": Category.PLANT_PRODUCTS.name},
+        "SWEETENERS": {"label": "Sweeteners", "category": Category.PLANT_PRODUCTS.name},
+        "SPICES": {"label": "Spices", "category": Category.PLANT_PRODUCTS.name},
+        "WATER": {"label": "Water", "category": Category.BEVERAGES.name},
+        "ALCOHOLIC_BEVERAGES": {"label": "Alcoholic beverages", "category": Category.BEVERAGES.name},
+        "CAFFEINE_DRINKS": {"label": "Caffeine drinks, teas", "category": Category.BEVERAGES.name},
+        "FRUIT_JUICES": {"label": "Fruit juices", "category": Category.BEVERAGES.name},
+        "VEGETABLE_JUICES": {"label": "Vegetable juices", "category": Category.BEVERAGES.name},
+        "MILK_SUBSTITUTES": {"label": "Milk substitutes", "category": Category.BEVERAGES.name},
+        "SOFT_DRINKS": {"label": "Soft drinks", "category": Category.BEVERAGES.name},
+        "FOOD_ADDITIVES": {"label": "Food additives, E-numbers", "category": Category.FOOD_ADDITIVES.name},
+        "DIETARY_SUPPLEMENTS": {"label": "Dietary supplements", "category": Category.DIETARY_SUPPLEMENTS.name},
+        "PREPARATIONS": {"label": "Preparations, mixtures", "category": Category.PREPARATIONS.name}
+    }
+}
+
+
+def dedupe_key(name):
+    """Normalize: lowercase, strip whitespace."""
+    return name.lower().strip()
+
+
+def read_progress(extraction_dir, lang_override=None):
+    """Return (lang, total_chunks) from progress.json."""
+    progress_file = extraction_dir / "progress.json"
     if progress_file.exists():
         with open(progress_file, 'r', encoding='utf-8') as f:
             progress = json.load(f)
@@ -23,20 +106,76 @@ def merge_chunks(lang_override=None):
     else:
         lang = lang_override or "en"
         total_chunks = 50
+    return lang, total_chunks
 
-    print(f"Merging chunks for language: {lang}")
 
-    all_items = []
+def chunk_files(chunks_dir, total_chunks):
+    """Existing chunk files, in order."""
+    files = (chunks_dir / f"chunk-{i:02d}.json" for i in range(1, total_chunks + 1))
+    return [chunk_file for chunk_file in files if chunk_file.exists()]
+
+
+def iter_items(files, report=False):
+    """Yield the items of every chunk in order, holding one chunk at a time."""
+    for chunk_file in files:
+        with open(chunk_file, 'r', encoding='utf-8') as f:
+            items = json.load(f).get("items", [])
+        if report:
+            print(f"Chunk {int(chunk_file.stem.split('-')[1])}: {len(items)} items")
+        yield from items
+
+
+def final_structure(foods, lang, total_items):
+    """Output JSON structure around the food list."""
+    return {
+        "foods": foods,
+        "enums": ENUMS,
+        "metadata": {
+            "source": "SIGHI Food Compatibility List",
+            "language": lang,
+            "version": date.today().isoformat(),
+            "totalItems": total_items
+        }
+    }
+
+
+def load_registry(lang, ids_path=None):
+    """ID registry for lang: ids_path (empty if missing), else the default
+    registry if it exists, else None (IDs follow input order).
+
+    The registry is only read here; callers save it when asked to (--save-ids),
+    so trial merges don't claim IDs in the published registry."""
+    if ids_path:
+        return IdRegistry.load(ids_path)
+    path = registry_path(lang)
+    return IdRegistry.load(path) if path.exists() else None
+
+
+def print_summary(output_file, table):
+    """Print the summary after writing the output."""
+    from food_stats import format_counts  # NumPy; only the report needs it
+
+    print(f"\nOutput written to: {output_file}")
+    print(f"Final item count: {len(table)}")
+
+    # Print category breakdown
+    print("\nCategory breakdown:")
+    print("\n".join(format_counts(table.counts("category"))))
+
+
+def merge_chunks(lang_override=None, ids_path=None, save_ids=False):
+    extraction_dir = Path(__file__).parent.parent
+    chunks_dir = extraction_dir / "chunks"
+    output_dir = extraction_dir / "output"
+    output_dir.mkdir(exist_ok=True)
+
+    # Read progress to get language and chunk count
+    lang, total_chunks = read_progress(extraction_dir, lang_override)
+
+    print(f"Merging chunks for language: {lang}")
 
     # Read all chunks in order
-    for i in range(1, total_chunks + 1):
-        chunk_file = chunks_dir / f"chunk-{i:02d}.json"
-        if chunk_file.exists():
-            with open(chunk_file, 'r', encoding='utf-8') as f:
-                chunk_data = json.load(f)
-                items = chunk_data.get("items", [])
-                all_items.extend(items)
-                print(f"Chunk {i}: {len(items)} items")
+    all_items = list(iter_items(chunk_files(chunks_dir, total_chunks), report=True))
 
     if not all_items:
         print("No items found in chunks!")
@@ -50,8 +189,7 @@ def merge_chunks(lang_override=None):
     duplicates = []
 
     for item in all_items:
-        # Normalize: lowercase, strip whitespace
-        key = item["name"].lower().strip()
+        key = dedupe_key(item["name"])
         if key not in seen:
             seen.add(key)
             unique_items.append(item)
@@ -61,92 +199,229 @@ def merge_chunks(lang_override=None):
     print(f"Duplicates removed: {len(duplicates)}")
     print(f"Unique items: {len(unique_items)}")
 
-    # Add IDs
-    for idx, item in enumerate(unique_items, start=1):
-        item["id"] = idx
+    # Add IDs (stable ones from the registry if there is one)
+    registry = load_registry(lang, ids_path)
+    if registry:
+        registry.assign(unique_items)
+    else:
+        for idx, item in enumerate(unique_items, start=1):
+            item["id"] = idx
 
     # Create final structure
-    final_data = {
-        "foods": unique_items,
-        "enums": {
-            "histamineLevel": {
-                "WELL_TOLERATED": {"value": 0, "label": "Well tolerated", "color": "#4CAF50"},
-                "MODERATELY_TOLERATED": {"value": 1, "label": "Moderately tolerated", "color": "#FFC107"},
-                "POORLY_TOLERATED": {"value": 2, "label": "Poorly tolerated", "color": "#FF9800"},
-                "VERY_POORLY_TOLERATED": {"value": 3, "label": "Very poorly tolerated", "color": "#F44336"},
-                "INSUFFICIENT_INFO": {"value": -1, "label": "Insufficient info", "color": "#9E9E9E"},
-                "VARIABLE": {"value": -2, "label": "Variable", "color": "#607D8B"}
-            },
-            "flags": {
-                "HIGH_HISTAMINE": {"code": "H", "label": "High histamine content"},
-                "FAST_SPOILAGE": {"code": "H!", "label": "Fast spoilage / histamine accumulates quickly"},
-                "OTHER_BIOGENIC_AMINES": {"code": "A", "label": "Other biogenic amines"},
-                "HISTAMINE_LIBERATOR": {"code": "L", "label": "Histamine liberator"},
-                "DAO_BLOCKER": {"code": "B", "label": "DAO blocker"}
-            },
-            "categories": {
-                "ANIMAL_PRODUCTS": {"label": "Animal products"},
-                "PLANT_PRODUCTS": {"label": "Plant products"},
-                "BEVERAGES": {"label": "Beverages"},
-                "FOOD_ADDITIVES": {"label": "Food additives"},
-                "DIETARY_SUPPLEMENTS": {"label": "Dietary supplements"},
-                "PREPARATIONS": {"label": "Preparations, mixtures"}
-            },
-            "subcategories": {
-                "EGGS": {"label": "Eggs", "category": "ANIMAL_PRODUCTS"},
-                "DAIRY": {"label": "Dairy products", "category": "ANIMAL_PRODUCTS"},
-                "MEAT": {"label": "Meat", "category": "ANIMAL_PRODUCTS"},
-                "FISH": {"label": "Fish", "category": "ANIMAL_PRODUCTS"},
-                "SEAFOOD": {"label": "Seafood", "category": "ANIMAL_PRODUCTS"},
-                "OTHER": {"label": "Other animal products", "category": "ANIMAL_PRODUCTS"},
-                "STARCHES": {"label": "Starch sources", "category": "PLANT_PRODUCTS"},
-                "NUTS": {"label": "Nuts, seeds", "category": "PLANT_PRODUCTS"},
-                "OILS_FATS": {"label": "Oils, fats", "category": "PLANT_PRODUCTS"},
-                "VEGETABLES": {"label": "Vegetables", "category": "PLANT_PRODUCTS"},
-                "HERBS": {"label": "Herbs", "category": "PLANT_PRODUCTS"},
-                "FRUITS": {"label": "Fruits", "category": "PLANT_PRODUCTS"},
-                "MUSHROOMS": {"label": "Mushrooms, algae", "category": "PLANT_PRODUCTS"},
-                "SWEETENERS": {"label": "Sweeteners", "category": "PLANT_PRODUCTS"},
-                "SPICES": {"label": "Spices", "category": "PLANT_PRODUCTS"},
-                "WATER": {"label": "Water", "category": "BEVERAGES"},
-                "ALCOHOLIC_BEVERAGES": {"label": "Alcoholic beverages", "category": "BEVERAGES"},
-                "CAFFEINE_DRINKS": {"label": "Caffeine drinks, teas", "category": "BEVERAGES"},
-                "FRUIT_JUICES": {"label": "Fruit juices", "category": "BEVERAGES"},
-                "VEGETABLE_JUICES": {"label": "Vegetable juices", "category": "BEVERAGES"},
-                "MILK_SUBSTITUTES": {"label": "Milk substitutes", "category": "BEVERAGES"},
-                "SOFT_DRINKS": {"label": "Soft drinks", "category": "BEVERAGES"},
-                "FOOD_ADDITIVES": {"label": "Food additives, E-numbers", "category": "FOOD_ADDITIVES"},
-                "DIETARY_SUPPLEMENTS": {"label": "Dietary supplements", "category": "DIETARY_SUPPLEMENTS"},
-                "PREPARATIONS": {"label": "Preparations, mixtures", "category": "PREPARATIONS"}
-            }
-        },
-        "metadata": {
-            "source": "SIGHI Food Compatibility List",
-            "language": lang,
-            "version": date.today().isoformat(),
-            "totalItems": len(unique_items)
-        }
-    }
+    final_data = final_structure(unique_items, lang, len(unique_items))
 
     # Write output
     output_file = output_dir / f"{lang}.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
+    tmp_file = output_file.with_name(output_file.name + ".tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
         json.dump(final_data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, output_file)
 
-    print(f"\nOutput written to: {output_file}")
-    print(f"Final item count: {len(unique_items)}")
+    # Packed binary copy for mmap-based Python consumers
+    write_store(final_data, output_file.with_suffix(".bin"))
+    if registry and save_ids:
+        registry.save()
 
-    # Print category breakdown
-    print("\nCategory breakdown:")
-    categories = {}
-    for item in unique_items:
-        cat = item.get("category", "UNKNOWN")
-        categories[cat] = categories.get(cat, 0) + 1
-    for cat, count in sorted(categories.items()):
-        print(f"  {cat}: {count}")
+    from food_stats import FoodTable
+    print_summary(output_file, FoodTable.from_foods(unique_items, lang))
 
     return unique_items, duplicates
 
+
+# ----------------------------------------------------------------------
+# Bounded-memory merge
+# ----------------------------------------------------------------------
+
+def write_run(entries, run_path):
+    """Write sorted (key, seq) entries as one JSON-lines run file."""
+    with open(run_path, 'w', encoding='utf-8') as f:
+        for key, seq in entries:
+            f.write(json.dumps([key, seq], ensure_ascii=False) + "\n")
+    return run_path
+
+
+def read_run(run_path):
+    """Yield (key, seq) entries of a run file."""
+    with open(run_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            key, seq = json.loads(line)
+            yield key, seq
+
+
+def spill_runs(items, run_size, run_dir):
+    """Sort (dedupe key, input position) pairs in runs of run_size on disk.
+
+    Returns (run paths, item count).
+    """
+    runs = []
+    buffer = []
+    count = 0
+    for item in items:
+        buffer.append((dedupe_key(item["name"]), count))
+        count += 1
+        if len(buffer) >= run_size:
+            buffer.sort()
+            runs.append(write_run(buffer, Path(run_dir) / f"run-0-{len(runs)}.jsonl"))
+            buffer = []
+    if buffer:
+        buffer.sort()
+        runs.append(write_run(buffer, Path(run_dir) / f"run-0-{len(runs)}.jsonl"))
+    return runs, count
+
+
+def merge_runs(runs, run_dir):
+    """Yield all entries of the runs in (key, seq) order."""
+    # Keep the number of open files bounded
+    level = 1
+    while len(runs) > MAX_FAN_IN:
+        merged = []
+        for start in range(0, len(runs), MAX_FAN_IN):
+            group = runs[start:start + MAX_FAN_IN]
+            run_path = Path(run_dir) / f"run-{level}-{len(merged)}.jsonl"
+            merged.append(write_run(heapq.merge(*map(read_run, group)), run_path))
+            for run_path in group:
+                run_path.unlink()
+        runs = merged
+        level += 1
+    yield from heapq.merge(*map(read_run, runs))
+
+
+def first_occurrences(runs, count, run_dir):
+    """Bitmap of input positions that are the first item with their key.
+
+    Entries arrive grouped by key with the lowest position first, so the
+    first entry of each group is the one the in-memory merge keeps.
+    """
+    kept = bytearray((count + 7) // 8)
+    previous = None
+    for key, seq in merge_runs(runs, run_dir):
+        if key != previous:
+            kept[seq >> 3] |= 1 << (seq & 7)
+            previous = key
+    return kept
+
+
+class KeptItems:
+    """Re-iterable view of the deduplicated items, in input order with IDs.
+
+    Each pass re-reads the chunks, so only one chunk is in memory at a time.
+    """
+
+    def __init__(self, files, kept, total):
+        self.files = files
+        self.kept = kept
+        self.total = total
+        self.ids = None  # IDs by position; default 1..total
+
+    def __len__(self):
+        return self.total
+
+    def without_ids(self):
+        """Iterate the kept items as they are in the chunks."""
+        for seq, item in enumerate(iter_items(self.files)):
+            if self.kept[seq >> 3] & (1 << (seq & 7)):
+                yield item
+
+    def __iter__(self):
+        for position, item in enumerate(self.without_ids()):
+            item["id"] = self.ids[position] if self.ids is not None else position + 1
+            yield item
+
+
+def dump_streaming(data, f):
+    """Write data like json.dump(data, f, indent=2, ensure_ascii=False),
+    taking data["foods"] from an iterable instead of a list."""
+    def dumps(value, indent):
+        return json.dumps(value, indent=2, ensure_ascii=False).replace("\n", "\n" + " " * indent)
+
+    f.write('{\n  "foods": [')
+    empty = True
+    for item in data["foods"]:
+        f.write(("\n    " if empty else ",\n    ") + dumps(item, 4))
+        empty = False
+    f.write("]" if empty else "\n  ]")
+    for key, value in data.items():
+        if key != "foods":
+            f.write(f",\n  {dumps(key, 2)}: {dumps(value, 2)}")
+    f.write("\n}")
+
+
+def merge_chunks_external(lang_override=None, run_size=100000, tmp_dir=None, ids_path=None,
+                          save_ids=False):
+    """Bounded-memory merge_chunks(): same output, memory independent of item count
+    (apart from the ID registry, if there is one, 4 bytes per item for its IDs and
+    10 bytes per item for the summary statistics).
+
+    Returns (kept items view, number of duplicates).
+    """
+    extraction_dir = Path(__file__).parent.parent
+    chunks_dir = extraction_dir / "chunks"
+    output_dir = extraction_dir / "output"
+    output_dir.mkdir(exist_ok=True)
+
+    lang, total_chunks = read_progress(extraction_dir, lang_override)
+    files = chunk_files(chunks_dir, total_chunks)
+
+    print(f"Merging chunks for language: {lang} (bounded memory, runs of {run_size})")
+
+    with tempfile.TemporaryDirectory(prefix="merge-runs-", dir=tmp_dir) as run_dir:
+        runs, count = spill_runs(iter_items(files, report=True), run_size, run_dir)
+        if count == 0:
+            print("No items found in chunks!")
+            return [], 0
+        print(f"\nTotal items before deduplication: {count}")
+        print(f"Sorted runs: {len(runs)}")
+        kept = first_occurrences(runs, count, run_dir)
+
+    total = sum(bin(byte).count("1") for byte in kept)
+    duplicates = count - total
+    print(f"Duplicates removed: {duplicates}")
+    print(f"Unique items: {total}")
+
+    unique_items = KeptItems(files, kept, total)
+    registry = load_registry(lang, ids_path)
+    if registry:
+        unique_items.ids = registry.allocate(lambda: map(food_identity, unique_items.without_ids()))
+    from food_stats import FoodTableBuilder
+    stats = FoodTableBuilder()
+
+    # Write output; IDs are assigned and the items encoded for the summary
+    # as they stream past
+    output_file = output_dir / f"{lang}.json"
+    tmp_file = output_file.with_name(output_file.name + ".tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        dump_streaming(final_structure(stats.collect(unique_items, lang), lang, total), f)
+    os.replace(tmp_file, output_file)
+
+    # Packed binary copy for mmap-based Python consumers (re-reads the chunks
+    # per pass; only the packed records and strings are held in memory)
+    write_store(final_structure(unique_items, lang, total), output_file.with_suffix(".bin"))
+    if registry and save_ids:
+        registry.save()
+
+    print_summary(output_file, stats.build())
+
+    return unique_items, duplicates
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Merge chunk files into the final output JSON.")
+    parser.add_argument("lang", nargs="?", help="Output language (default: from progress.json)")
+    parser.add_argument("--run-size", type=int,
+                        help="Merge in bounded memory, sorting this many keys per on-disk run")
+    parser.add_argument("--tmp-dir", help="Directory for sorted runs (default: system temp)")
+    parser.add_argument("--ids", help="Stable ID registry "
+                                      "(default: data/ids/<lang>.json if it exists, else input order)")
+    parser.add_argument("--save-ids", action="store_true",
+                        help="Write newly allocated IDs back to the registry (read-only otherwise)")
+    args = parser.parse_args()
+
+    if args.run_size:
+        merge_chunks_external(args.lang, args.run_size, args.tmp_dir, args.ids, args.save_ids)
+    else:
+        merge_chunks(args.lang, args.ids, args.save_ids)
+
+
 if __name__ == "__main__":
-    lang = sys.argv[1] if len(sys.argv) > 1 else None
-    merge_chunks(lang)
+    main()
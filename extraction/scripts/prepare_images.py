@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""Crop, split and compress page images for extraction.
+
+For every images/page-NN.png:
+
+    1. Find the inked region and drop the page margins.
+    2. Drop the first/last text block when it repeats on most pages (the
+       "Zoznam kompatibilných…/SIGHI" header, footer with page number).
+    3. Split the table into row bands no taller than --band-height,
+       cutting only in the whitespace between lines.
+    4. Store the bands as grayscale PNG (or WebP).
+
+Results are cached under images/prepared/<key>/, where the key is the hash
+of the page image and the settings, so unchanged pages are not processed
+again. images/prepared.json maps page numbers to their band files and is
+what extract_chunks.py hands to the backend instead of the full page.
+
+Requires Pillow (pip install Pillow).
+
+Usage:
+    python3 extraction/scripts/prepare_images.py [--format png|webp] [--band-height 1400]
+                                                 [--drop-originals]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from pathlib import Path
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+EXTRACTION_DIR = Path(__file__).parent.parent
+IMAGES_DIR = EXTRACTION_DIR / "images"
+MANIFEST_NAME = "prepared.json"
+
+# Pixels darker than this count as ink
+INK_THRESHOLD = 160
+
+# Layout analysis runs on a downscaled copy
+ANALYSIS_SCALE = 4
+
+# Blank rows (at analysis scale) that separate text blocks
+BLOCK_GAP = 6
+
+# Padding kept around the cropped region (full resolution)
+MARGIN = 16
+
+# A first/last block repeating on this share of pages is page furniture
+REPEAT_SHARE = 0.5
+HASH_DISTANCE = 6
+
+BAND_HEIGHT = 1400
+WEBP_QUALITY = 80
+
+
+def page_number(path: Path) -> int:
+    """Return the page number of a page-NN.png path."""
+    return int(re.search(r"page-(\d+)", path.name).group(1))
+
+
+def ink_mask(image: "Image.Image") -> "Image.Image":
+    """Return a downscaled mask with ink pixels set to 255."""
+    gray = image.convert("L").reduce(ANALYSIS_SCALE)
+    return gray.point(lambda p: 255 if p < INK_THRESHOLD else 0)
+
+
+def runs(projection, min_gap: int = 1) -> list:
+    """Return (start, end) runs of non-zero entries, merging gaps shorter than min_gap."""
+    result = []
+    start = last = None
+    for i, value in enumerate(projection):
+        if not value:
+            continue
+        if start is None:
+            start = i
+        elif i - last > min_gap:
+            result.append((start, last + 1))
+            start = i
+        last = i
+    if start is not None:
+        result.append((start, last + 1))
+    return result
+
+
+def dhash(image: "Image.Image") -> int:
+    """64-bit difference hash of an image."""
+    small = image.convert("L").resize((9, 8), Image.BILINEAR)
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return bits
+
+
+def analyze(path: Path) -> dict:
+    """Return the text blocks of a page and signatures of its first/last block."""
+    with Image.open(path) as image:
+        mask = ink_mask(image)
+    _, y_projection = mask.getprojection()
+    blocks = runs(y_projection, BLOCK_GAP)
+    signatures = []
+    for top, bottom in blocks[:1] + blocks[-1:]:
+        signatures.append([bottom - top, dhash(mask.crop((0, top, mask.width, bottom)))])
+    return {"blocks": blocks, "signatures": signatures}
+
+
+def repeating(signatures: list, index: int) -> list:
+    """Flag pages whose first (index 0) or last (index -1) block repeats across pages."""
+    candidates = [s[index] if s else None for s in signatures]
+    threshold = max(2, REPEAT_SHARE * len(candidates))
+    flags = []
+    for candidate in candidates:
+        if candidate is None:
+            flags.append(False)
+            continue
+        height, bits = candidate
+        matches = sum(
+            1 for other in candidates
+            if other is not None and abs(other[0] - height) <= 2
+            and bin(other[1] ^ bits).count("1") <= HASH_DISTANCE
+        )
+        flags.append(matches >= threshold)
+    return flags
+
+
+def table_region(mask: "Image.Image", blocks: list) -> tuple:
+    """Return the (left, top, right, bottom) analysis-scale box around blocks."""
+    top, bottom = blocks[0][0], blocks[-1][1]
+    box = mask.crop((0, top, mask.width, bottom)).getbbox()
+    left, right = (box[0], box[2]) if box else (0, mask.width)
+    return left, top, right, bottom
+
+
+def split_bands(image: "Image.Image", band_height: int) -> list:
+    """Split an image into bands no taller than band_height, cutting between text lines."""
+    mask = image.point(lambda p: 255 if p < INK_THRESHOLD else 0)
+    _, y_projection = mask.getprojection()
+    lines = runs(y_projection)
+    if not lines:
+        return [image]
+
+    bands = []
+    start = 0
+    for i, (_, line_bottom) in enumerate(lines):
+        next_top = lines[i + 1][0] if i + 1 < len(lines) else image.height
+        if i + 1 < len(lines) and lines[i + 1][1] - start <= band_height:
+            continue
+        # Cut in the middle of the gap below this line
+        cut = (line_bottom + next_top) // 2 if i + 1 < len(lines) else image.height
+        bands.append(image.crop((0, start, image.width, cut)))
+        start = cut
+    return bands
+
+
+def cache_key(path: Path, settings: dict) -> str:
+    """Hash the page image together with everything that affects the output."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    digest.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()[:24]
+
+
+def prepare_page(path: Path, blocks: list, drop_header: bool, drop_footer: bool,
+                 cache_dir: Path, fmt: str, band_height: int) -> list:
+    """Crop and split one page into cache_dir; return the band file paths."""
+    kept = blocks[1 if drop_header else 0:len(blocks) - 1 if drop_footer else len(blocks)]
+    with Image.open(path) as image:
+        gray = image.convert("L")
+    if kept:
+        left, top, right, bottom = (v * ANALYSIS_SCALE for v in table_region(ink_mask(gray), kept))
+        gray = gray.crop((max(0, left - MARGIN), max(0, top - MARGIN),
+                          min(gray.width, right + MARGIN), min(gray.height, bottom + MARGIN)))
+
+    tmp_dir = cache_dir.with_name(f".{cache_dir.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    for n, band in enumerate(split_bands(gray, band_height), start=1):
+        band_path = tmp_dir / f"band-{n:02d}.{fmt}"
+        if fmt == "webp":
+            band.save(band_path, "WEBP", quality=WEBP_QUALITY, method=4)
+        else:
+            band.save(band_path, "PNG", optimize=True)
+    # Rename the finished directory into place so the cache never holds partial pages
+    os.replace(tmp_dir, cache_dir)
+    return sorted(cache_dir.iterdir())
+
+
+def load_prepared(images_dir: Path = IMAGES_DIR) -> dict:
+    """Return {page number: [band paths]} from the manifest (empty if not prepared)."""
+    manifest_path = images_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    return {
+        int(page): [images_dir / band for band in entry["bands"]]
+        for page, entry in manifest.get("pages", {}).items()
+    }
+
+
+def prepare_images(images_dir: Path = IMAGES_DIR, fmt: str = "png", band_height: int = BAND_HEIGHT,
+                   drop_originals: bool = False) -> dict:
+    """Prepare every page image; return a summary dict."""
+    pages = sorted(images_dir.glob("page-*.png"), key=page_number)
+    cache_root = images_dir / "prepared"
+    manifest_path = images_dir / MANIFEST_NAME
+    manifest = {"pages": {}}
+    if manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    analyses = [analyze(path) for path in pages]
+    signatures = [a["signatures"] for a in analyses]
+    headers = repeating(signatures, 0)
+    footers = repeating(signatures, -1)
+
+    summary = {"pages": len(pages), "cached": 0, "bands": 0, "input_bytes": 0, "output_bytes": 0}
+    for path, analysis, drop_header, drop_footer in zip(pages, analyses, headers, footers):
+        # A one-block page is never all header/footer
+        drop_footer = drop_footer and len(analysis["blocks"]) > 1 + drop_header
+        settings = {"format": fmt, "bandHeight": band_height, "header": drop_header, "footer": drop_footer,
+                    "threshold": INK_THRESHOLD, "margin": MARGIN}
+        key = cache_key(path, settings)
+        cache_dir = cache_root / key
+        if cache_dir.is_dir():
+            bands = sorted(cache_dir.iterdir())
+            summary["cached"] += 1
+        else:
+            bands = prepare_page(path, analysis["blocks"], drop_header, drop_footer, cache_dir, fmt, band_height)
+
+        manifest["pages"][str(page_number(path))] = {
+            "source": path.name,
+            "key": key,
+            "bands": [str(band.relative_to(images_dir)) for band in bands],
+            "droppedHeader": drop_header,
+            "droppedFooter": drop_footer,
+        }
+        summary["bands"] += len(bands)
+        summary["input_bytes"] += path.stat().st_size
+        summary["output_bytes"] += sum(band.stat().st_size for band in bands)
+        if drop_originals:
+            path.unlink()
+
+    tmp_path = manifest_path.with_name(f".{manifest_path.name}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    # Drop cache entries no page refers to any more
+    live = {entry["key"] for entry in manifest["pages"].values()}
+    for entry in cache_root.iterdir() if cache_root.exists() else []:
+        if entry.is_dir() and entry.name not in live:
+            shutil.rmtree(entry)
+
+    return summary
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Crop, split and compress page images for extraction.")
+    parser.add_argument("--format", choices=["png", "webp"], default="png", help="Band image format (default: png)")
+    parser.add_argument("--band-height", type=int, default=BAND_HEIGHT,
+                        help=f"Maximum band height in pixels (default: {BAND_HEIGHT})")
+    parser.add_argument("--drop-originals", action="store_true", help="Delete page-NN.png after preparing")
+    args = parser.parse_args()
+
+    if Image is None:
+        print("Error: Pillow is required for image preparation")
+        print("  pip install Pillow")
+        sys.exit(1)
+
+    if args.format == "webp" and not features.check("webp"):
+        print("Error: this Pillow build has no WebP support, use --format png")
+        sys.exit(1)
+
+    summary = prepare_images(IMAGES_DIR, args.format, args.band_height, args.drop_originals)
+
+    saved = summary["input_bytes"] - summary["output_bytes"]
+    print(f"Prepared {summary['pages']} pages into {summary['bands']} {args.format} bands "
+          f"({summary['cached']} cached)")
+    print(f"Size: {summary['input_bytes'] / 1e6:.1f} MB -> {summary['output_bytes'] / 1e6:.1f} MB "
+          f"({saved / 1e6:.1f} MB saved)")
+
+
+if __name__ == "__main__":
+    main()
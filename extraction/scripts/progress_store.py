@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Journaled progress.json store that is safe for concurrent writers.
+
+progress.json is the compacted snapshot. Status updates are appended as
+NDJSON events to progress.log, each with a sequence number; the current
+state is the snapshot plus every logged event newer than its journalSeq.
+Appends are O(1) and serialized with an flock on progress.lock, which also
+holds the last sequence number. Compaction (periodic, or on demand) folds
+the log into progress.json under the same lock and truncates the log.
+
+A crashed run is rebuilt by replaying the log over the snapshot, which
+load() always does.
+
+Usage:
+    python3 extraction/scripts/progress_store.py [--compact]
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import socket
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+EXTRACTION_DIR = Path(__file__).parent.parent
+
+COMPACT_EVERY = 200
+
+# Claims older than this are treated as abandoned by a crashed worker
+CLAIM_LEASE_SECONDS = 15 * 60
+
+
+def default_owner() -> str:
+    """Return an owner id for claims made by this process."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def owner_alive(owner) -> bool:
+    """Return False if owner is a process on this host that no longer exists."""
+    host, _, pid = (owner or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True  # Can't tell for other hosts; rely on the lease
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def apply_event(progress: dict, event: dict) -> None:
+    """Apply one journal event to a progress dict in place."""
+    kind = event["type"]
+    if kind == "chunk":
+        for chunk in progress.get("chunks", []):
+            if chunk["chunkId"] == event["chunkId"]:
+                chunk.update(event["fields"])
+    elif kind == "error":
+        progress.setdefault("errors", []).append({"chunkId": event["chunkId"], "error": event["error"]})
+    elif kind == "status":
+        progress["status"] = event["status"]
+    progress["journalSeq"] = event["seq"]
+
+
+def refresh_counters(progress: dict) -> None:
+    """Recompute lastProcessedChunk and extractedCount from the chunk list."""
+    completed = [c for c in progress.get("chunks", []) if c.get("status") == "completed"]
+    progress["lastProcessedChunk"] = max((c["chunkId"] for c in completed), default=0)
+    progress["extractedCount"] = sum(c.get("itemsExtracted", 0) for c in completed)
+
+
+class ProgressStore:
+    """progress.json snapshot plus an append-only event log."""
+
+    def __init__(self, extraction_dir: Path = EXTRACTION_DIR, compact_every: int = COMPACT_EVERY):
+        self.snapshot_path = Path(extraction_dir) / "progress.json"
+        self.log_path = Path(extraction_dir) / "progress.log"
+        self.lock_path = Path(extraction_dir) / "progress.lock"
+        self.compact_every = compact_every
+        self._pending = 0
+
+    @contextmanager
+    def _locked(self):
+        """Hold the exclusive store lock; yields the open lock file."""
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, 'r+') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield lock_file
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_snapshot(self) -> dict:
+        with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _replay(self, progress: dict) -> int:
+        """Apply logged events newer than the snapshot; return how many were applied."""
+        applied = 0
+        if not self.log_path.exists():
+            return applied
+        base_seq = progress.get("journalSeq", 0)
+        with open(self.log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # torn final line from a crash mid-append
+                event = json.loads(line)
+                if event["seq"] > base_seq:
+                    apply_event(progress, event)
+                    applied += 1
+        return applied
+
+    def _load_unlocked(self) -> dict:
+        progress = self._read_snapshot()
+        self._replay(progress)
+        refresh_counters(progress)
+        return progress
+
+    def load(self) -> dict:
+        """Return the current state (snapshot + journal)."""
+        with self._locked():
+            return self._load_unlocked()
+
+    def _last_seq(self, lock_file) -> int:
+        """Return the last assigned sequence number; caller holds the lock."""
+        lock_file.seek(0)
+        counter = lock_file.read().strip()
+        if counter:
+            return int(counter)
+        # Lock file was (re)created: seed from the snapshot and the log tail
+        last_seq = self._read_snapshot().get("journalSeq", 0)
+        if self.log_path.exists():
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.endswith("\n"):
+                        last_seq = max(last_seq, json.loads(line)["seq"])
+        return last_seq
+
+    @staticmethod
+    def _drop_torn_tail(log) -> None:
+        """Truncate a partial last line left by a crash mid-append."""
+        size = log.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        with open(log.name, 'rb') as f:
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            # Scan back in blocks for the previous newline
+            end = size
+            while end > 0:
+                start = max(0, end - 4096)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline != -1:
+                    log.truncate(start + newline + 1)
+                    return
+                end = start
+        log.truncate(0)
+
+    def _append(self, lock_file, events: list) -> None:
+        """Assign sequence numbers and append events; caller holds the lock."""
+        last_seq = self._last_seq(lock_file)
+
+        lines = []
+        for event in events:
+            last_seq += 1
+            event = {"seq": last_seq, "ts": time.time(), **event}
+            lines.append(json.dumps(event, ensure_ascii=False) + "\n")
+
+        with open(self.log_path, 'ab') as log:
+            self._drop_torn_tail(log)
+            log.write("".join(lines).encode('utf-8'))
+            log.flush()
+            os.fsync(log.fileno())
+
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(last_seq))
+        lock_file.flush()
+
+        self._pending += len(events)
+        if self.compact_every and self._pending >= self.compact_every:
+            self._compact_unlocked()
+
+    def append(self, *events: dict) -> None:
+        """Append events atomically (O(1), independent of log size)."""
+        with self._locked() as lock_file:
+            self._append(lock_file, list(events))
+
+    def update_chunk(self, chunk_id: int, **fields) -> None:
+        """Record new field values for one chunk."""
+        events = [{"type": "chunk", "chunkId": chunk_id, "fields": fields}]
+        if "error" in fields:
+            events.append({"type": "error", "chunkId": chunk_id, "error": fields["error"]})
+        self.append(*events)
+
+    def set_status(self, status: str) -> None:
+        """Record the overall run status."""
+        self.append({"type": "status", "status": status})
+
+    def claim(self, owner: str, chunk_ids=None, limit: int = None,
+              lease: float = CLAIM_LEASE_SECONDS) -> list:
+        """Atomically claim pending chunks for owner; return the claimed chunk dicts.
+
+        Completed chunks are never claimed; chunk_ids restricts the
+        candidates further. A chunk is skipped while another live owner's
+        claim is within the lease period.
+        """
+        now = time.time()
+        with self._locked() as lock_file:
+            progress = self._load_unlocked()
+            claimed = []
+            for chunk in progress.get("chunks", []):
+                if chunk.get("status") == "completed":
+                    continue
+                if chunk_ids is not None and chunk["chunkId"] not in chunk_ids:
+                    continue
+                if (chunk.get("status") == "in_progress" and chunk.get("owner") != owner
+                        and now - chunk.get("claimedAt", 0) < lease
+                        and owner_alive(chunk.get("owner"))):
+                    continue
+                claimed.append(chunk)
+                if limit is not None and len(claimed) >= limit:
+                    break
+
+            if claimed:
+                self._append(lock_file, [
+                    {"type": "chunk", "chunkId": chunk["chunkId"],
+                     "fields": {"status": "in_progress", "owner": owner, "claimedAt": now}}
+                    for chunk in claimed
+                ])
+            return claimed
+
+    def _compact_unlocked(self) -> None:
+        progress = self._load_unlocked()
+        tmp_path = self.snapshot_path.with_name(f".{self.snapshot_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(progress, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+        # Safe even if we crash before truncating: replay skips seq <= journalSeq
+        with open(self.log_path, 'w', encoding='utf-8'):
+            pass
+        self._pending = 0
+
+    def compact(self) -> dict:
+        """Fold the journal into progress.json and truncate it; return the state."""
+        with self._locked():
+            self._compact_unlocked()
+            return self._read_snapshot()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show or compact journaled extraction progress.")
+    parser.add_argument("--compact", action="store_true", help="Fold progress.log into progress.json")
+    args = parser.parse_args()
+
+    store = ProgressStore()
+    progress = store.compact() if args.compact else store.load()
+
+    statuses = {}
+    for chunk in progress.get("chunks", []):
+        statuses[chunk.get("status")] = statuses.get(chunk.get("status"), 0) + 1
+
+    print(f"Language: {progress.get('language')}")
+    print(f"Status: {progress.get('status')}")
+    print(f"Chunks: {', '.join(f'{k}: {v}' for k, v in sorted(statuses.items(), key=str)) or 'none'}")
+    print(f"Last processed chunk: {progress.get('lastProcessedChunk')}")
+    print(f"Extracted items: {progress.get('extractedCount')}")
+    print(f"Errors: {len(progress.get('errors', []))}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,7 +20,7 @@ echo "This will reset the extraction workspace:"
 echo "  - Delete all chunk files (extraction/chunks/)"
 echo "  - Delete all image files (extraction/images/)"
 echo "  - Delete output files (extraction/output/)"
-echo "  - Reset progress.json"
+echo "  - Reset progress.json and its journal"
 echo ""
 echo "Note: Source PDFs in source/ folder are NOT touched."
 echo ""
@@ -45,6 +45,7 @@ rm -rf "$EXTRACTION_DIR/output"
 mkdir -p "$EXTRACTION_DIR/output"
 
 print_step "Resetting progress.json..."
+rm -f "$EXTRACTION_DIR/progress.log" "$EXTRACTION_DIR/progress.lock"
 cat > "$EXTRACTION_DIR/progress.json" << 'EOF'
 {
   "language": null,
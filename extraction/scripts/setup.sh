@@ -1,7 +1,11 @@
 #!/bin/bash
 # Setup script for PDF extraction
-# Usage: ./setup.sh <language-code> [pdf-path]
+# Usage: ./setup.sh <language-code> [pdf-path] [--raster]
 # Example: ./setup.sh sk source/foodlist-sk.pdf
+#
+# If the PDF has a text layer, chunks are built from it directly and only
+# pages where column detection fails are rasterized. --raster renders every
+# page for visual extraction instead.
 
 set -e
 
@@ -20,8 +24,19 @@ print_warn() { echo -e "${YELLOW}[WARN]${NC} $1"; }
 print_error() { echo -e "${RED}[ERROR]${NC} $1"; }
 
 # Check arguments
+RASTER_ONLY=false
+ARGS=()
+for arg in "$@"; do
+    if [ "$arg" == "--raster" ]; then
+        RASTER_ONLY=true
+    else
+        ARGS+=("$arg")
+    fi
+done
+set -- "${ARGS[@]}"
+
 if [ -z "$1" ]; then
-    echo "Usage: $0 <language-code> [pdf-path]"
+    echo "Usage: $0 <language-code> [pdf-path] [--raster]"
     echo "Example: $0 sk source/foodlist-sk.pdf"
     echo ""
     echo "Language codes: en, sk, de, etc."
@@ -58,44 +73,56 @@ mkdir -p "$EXTRACTION_DIR/output"
 
 # Clean existing files
 print_step "Cleaning existing extraction data..."
-rm -f "$EXTRACTION_DIR/images/"*.png
+rm -f "$EXTRACTION_DIR/images/"*.png "$EXTRACTION_DIR/images/prepared.json"
 rm -f "$EXTRACTION_DIR/chunks/"*.json
 rm -f "$EXTRACTION_DIR/output/"*.json
 
-# Convert PDF to images
-print_step "Converting PDF to PNG images (300 DPI)..."
-pdftoppm -png -r 300 "$PDF_PATH" "$EXTRACTION_DIR/images/page"
-
-# Rename to consistent format (page-01.png, page-02.png, etc.)
-print_step "Renaming images to consistent format..."
-cd "$EXTRACTION_DIR/images"
-for f in page-*.png; do
-    if [[ $f =~ page-([0-9]+)\.png ]]; then
-        num="${BASH_REMATCH[1]}"
-        # Force base 10 interpretation (handles leading zeros like 08, 09)
-        num=$((10#$num))
-        # Pad to 2 digits
-        padded=$(printf "%02d" "$num")
-        mv "$f" "page-$padded.png" 2>/dev/null || true
-    fi
-done
+# Use the text layer when pdftotext is available
+USE_TEXT_LAYER=false
+if [ "$RASTER_ONLY" = false ] && command -v pdftotext &> /dev/null; then
+    USE_TEXT_LAYER=true
+fi
 
-# Count pages
-PAGE_COUNT=$(ls -1 "$EXTRACTION_DIR/images/"page-*.png 2>/dev/null | wc -l | tr -d ' ')
+if [ "$USE_TEXT_LAYER" = true ]; then
+    PAGE_COUNT=$(pdfinfo "$PDF_PATH" | awk '/^Pages:/ {print $2}')
+else
+    # Convert PDF to images
+    print_step "Converting PDF to PNG images (300 DPI)..."
+    pdftoppm -png -r 300 "$PDF_PATH" "$EXTRACTION_DIR/images/page"
+
+    # Rename to consistent format (page-01.png, page-02.png, etc.)
+    print_step "Renaming images to consistent format..."
+    cd "$EXTRACTION_DIR/images"
+    for f in page-*.png; do
+        if [[ $f =~ page-([0-9]+)\.png ]]; then
+            num="${BASH_REMATCH[1]}"
+            # Force base 10 interpretation (handles leading zeros like 08, 09)
+            num=$((10#$num))
+            # Pad to 2 digits
+            padded=$(printf "%02d" "$num")
+            mv "$f" "page-$padded.png" 2>/dev/null || true
+        fi
+    done
+    cd - > /dev/null
+
+    # Count pages
+    PAGE_COUNT=$(ls -1 "$EXTRACTION_DIR/images/"page-*.png 2>/dev/null | wc -l | tr -d ' ')
+fi
 
-if [ "$PAGE_COUNT" -eq 0 ]; then
+if [ -z "$PAGE_COUNT" ] || [ "$PAGE_COUNT" -eq 0 ]; then
     print_error "No pages extracted from PDF!"
     exit 1
 fi
 
-print_step "Extracted $PAGE_COUNT pages"
+print_step "Found $PAGE_COUNT pages"
 
 # Calculate chunks (2 pages per chunk)
 CHUNK_SIZE=2
 TOTAL_CHUNKS=$(( (PAGE_COUNT + CHUNK_SIZE - 1) / CHUNK_SIZE ))
 
-# Create progress.json
+# Create progress.json (and drop any journal from a previous run)
 print_step "Creating progress.json..."
+rm -f "$EXTRACTION_DIR/progress.log" "$EXTRACTION_DIR/progress.lock"
 CHUNKS_JSON="["
 for i in $(seq 1 $TOTAL_CHUNKS); do
     START_PAGE=$(( (i - 1) * CHUNK_SIZE + 1 ))
@@ -132,6 +159,21 @@ cat > "$EXTRACTION_DIR/progress.json" << EOF
 }
 EOF
 
+if [ "$USE_TEXT_LAYER" = true ]; then
+    print_step "Extracting chunks from the PDF text layer..."
+    python3 "$SCRIPT_DIR/text_layer.py" "$PDF_PATH" --lang "$LANG_CODE"
+fi
+
+# Crop and split page images when Pillow is available
+if ls "$EXTRACTION_DIR/images/"page-*.png &> /dev/null; then
+    if python3 -c "import PIL" &> /dev/null; then
+        print_step "Preparing page images (crop, split into row bands)..."
+        python3 "$SCRIPT_DIR/prepare_images.py"
+    else
+        print_warn "Pillow not installed, extraction will use full page images (pip install Pillow)"
+    fi
+fi
+
 print_step "Setup complete!"
 echo ""
 echo "Summary:"
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""Build chunk files from the PDF's text layer instead of page images.
+
+Runs poppler's `pdftotext -bbox-layout`, streams the word boxes with
+iterparse and rebuilds the table from coordinates:
+
+    rows     words grouped by vertical position
+    columns  level / flags / name / notes, found by clustering the x
+             positions of rows that start with a histamine level symbol
+    sections rows without a level whose text is a known category or
+             subcategory label (data/<lang>.json enums, i18n strings)
+
+Text repeated on most pages (page header, column titles, footer) is dropped.
+Chunks whose pages all parse cleanly are written as standard chunk-NN.json
+files and marked completed; chunks with a page where column detection fails
+(no text layer, misaligned or unrecognized rows) stay pending, and only
+their pages are rasterized for visual extraction.
+
+Usage:
+    python3 extraction/scripts/text_layer.py [pdf-path] [--lang sk] [--no-raster]
+"""
+
+import argparse
+import json
+import re
+import shutil
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from statistics import median
+
+EXTRACTION_DIR = Path(__file__).parent.parent
+PROJECT_DIR = EXTRACTION_DIR.parent
+
+sys.path.insert(0, str(PROJECT_DIR / "scripts"))
+sys.path.insert(0, str(Path(__file__).parent))
+from food_model import FLAG_ABBREVIATIONS, LEVEL_SYMBOLS, Category, Flag
+from food_query import normalize
+from extract_chunks import chunk_path, write_json_atomic
+from progress_store import ProgressStore
+
+# Horizontal slack (PDF points) when matching a word to a column
+TOLERANCE = 3.0
+
+# A notes cell starts after a gap this many times wider than a space
+NOTES_GAP_FACTOR = 1.8
+
+# Minimum number of rows that must agree on a column position
+MIN_ROWS = 3
+
+# Text appearing on at least this share of pages is page furniture
+BOILERPLATE_SHARE = 0.5
+
+# Section headings as printed in the PDF, where they differ from app labels
+PDF_SECTION_LABELS = {
+    "Živočíšne potraviny": (Category.ANIMAL_PRODUCTS.name, None),
+    "Rastlinné potraviny": (Category.PLANT_PRODUCTS.name, None),
+}
+
+
+@dataclass(slots=True)
+class Word:
+    """Word box from the text layer (PDF points, origin top-left)."""
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    text: str
+
+
+@dataclass(slots=True)
+class Layout:
+    """Left edges of the table columns."""
+    level_x: float
+    name_x: float
+    notes_x: float = None
+    space: float = 2.5
+
+
+@dataclass
+class PageResult:
+    """Items parsed from one page, or the reason the page needs rasterizing."""
+    page: int
+    items: list = field(default_factory=list)
+    error: str = None
+
+
+def parse_bbox_pages(stream):
+    """Yield the word list of each <page> in pdftotext -bbox(-layout) output."""
+    words = []
+    for _, element in ET.iterparse(stream, events=("end",)):
+        tag = element.tag.rpartition("}")[2]
+        if tag == "word":
+            text = (element.text or "").strip()
+            if text:
+                words.append(Word(float(element.get("xMin")), float(element.get("yMin")),
+                                  float(element.get("xMax")), float(element.get("yMax")), text))
+        elif tag == "page":
+            yield words
+            words = []
+            element.clear()
+
+
+def read_pdf_words(pdf_path: Path):
+    """Yield the word list of each page of a PDF (requires pdftotext)."""
+    process = subprocess.Popen(["pdftotext", "-bbox-layout", "-enc", "UTF-8", str(pdf_path), "-"],
+                               stdout=subprocess.PIPE)
+    try:
+        yield from parse_bbox_pages(process.stdout)
+    finally:
+        process.stdout.close()
+        if process.wait() != 0:
+            raise RuntimeError(f"pdftotext failed with exit code {process.returncode}")
+
+
+def group_rows(words: list) -> list:
+    """Group words into rows by vertical center; each row is sorted by x."""
+    if not words:
+        return []
+    threshold = median(w.y1 - w.y0 for w in words) / 2
+    rows = []
+    current, center = [], None
+    for word in sorted(words, key=lambda w: (w.y0 + w.y1) / 2):
+        word_center = (word.y0 + word.y1) / 2
+        if current and word_center - center > threshold:
+            rows.append(sorted(current, key=lambda w: w.x0))
+            current = []
+        if not current:
+            center = word_center
+        current.append(word)
+    rows.append(sorted(current, key=lambda w: w.x0))
+    return rows
+
+
+def row_text(words: list) -> str:
+    """Join words into a single line of text."""
+    return " ".join(w.text for w in words)
+
+
+def clusters(values: list, tolerance: float = TOLERANCE) -> list:
+    """Cluster 1-D positions; return (center, count) sorted by count, then position."""
+    groups = []
+    for value in sorted(values):
+        if groups and value - groups[-1][-1] <= tolerance:
+            groups[-1].append(value)
+        else:
+            groups.append([value])
+    return sorted(((median(g), len(g)) for g in groups), key=lambda c: (-c[1], c[0]))
+
+
+def is_level_row(row: list, layout: Layout = None) -> bool:
+    """Check if a row starts with a histamine level symbol (in the level column)."""
+    if row[0].text not in LEVEL_SYMBOLS:
+        return False
+    return layout is None or abs(row[0].x0 - layout.level_x) <= TOLERANCE
+
+
+def detect_layout(pages: list):
+    """Find the column positions from rows of all pages; None if there is no table."""
+    level_rows = [row for rows in pages for row in rows if len(row) > 1 and is_level_row(row)]
+    if not level_rows:
+        return None
+    level_x, count = clusters([row[0].x0 for row in level_rows])[0]
+    if count < MIN_ROWS:
+        return None
+    level_rows = [row for row in level_rows if abs(row[0].x0 - level_x) <= TOLERANCE]
+
+    name_starts = []
+    for row in level_rows:
+        rest = [w for w in row[1:] if w.text not in FLAG_ABBREVIATIONS and w.text != "?"]
+        if rest:
+            name_starts.append(rest[0].x0)
+    if not name_starts:
+        return None
+    name_x, count = clusters(name_starts)[0]
+    if count < MIN_ROWS:
+        return None
+
+    # Typical word spacing inside the name column
+    gaps = [b.x0 - a.x1 for row in level_rows for a, b in zip(row, row[1:])
+            if a.x0 >= name_x - TOLERANCE and b.x0 > a.x1]
+    space = median(gaps) if gaps else 2.5
+
+    # Notes start at a recurring x position after a wider-than-space gap
+    note_starts = [b.x0 for row in level_rows for a, b in zip(row, row[1:])
+                   if a.x0 >= name_x - TOLERANCE and b.x0 - a.x1 >= space * NOTES_GAP_FACTOR]
+    notes_x = None
+    for center, count in clusters(note_starts):
+        if count >= MIN_ROWS and center > name_x + TOLERANCE:
+            notes_x = center
+            break
+
+    return Layout(level_x=level_x, name_x=name_x, notes_x=notes_x, space=space)
+
+
+def find_boilerplate(pages: list) -> set:
+    """Return row texts that repeat on most pages (headers, column titles, footers)."""
+    seen = Counter()
+    for rows in pages:
+        seen.update({normalize(row_text(row)) for row in rows})
+    threshold = max(2, BOILERPLATE_SHARE * len(pages))
+    return {text for text, count in seen.items() if count >= threshold}
+
+
+def load_section_labels(lang: str) -> dict:
+    """Map normalized section headings to (category, subcategory).
+
+    Labels come from the data file enums and i18n strings (English and the
+    extraction language) plus PDF_SECTION_LABELS. Either side may be None.
+    """
+    labels = {}
+    subcategory_keys = set()
+    for code in dict.fromkeys(["en", lang]):
+        data_path = PROJECT_DIR / "data" / f"{code}.json"
+        if data_path.exists():
+            with open(data_path, 'r', encoding='utf-8') as f:
+                enums = json.load(f).get("enums", {})
+            for key, value in enums.get("categories", {}).items():
+                labels[normalize(value["label"])] = (key, None)
+            for key, value in enums.get("subcategories", {}).items():
+                labels[normalize(value["label"])] = (value.get("category"), key)
+                subcategory_keys.add(key)
+
+        i18n_path = PROJECT_DIR / "i18n" / f"{code}.json"
+        if i18n_path.exists():
+            with open(i18n_path, 'r', encoding='utf-8') as f:
+                strings = json.load(f)
+            for key, label in strings.get("categories", {}).items():
+                labels.setdefault(normalize(label), (key, None))
+            for key, label in strings.get("subcategories", {}).items():
+                labels.setdefault(normalize(label), (None, key))
+
+    for label, section in PDF_SECTION_LABELS.items():
+        labels[normalize(label)] = section
+
+    # Categories without subcategories use the category name for both
+    for label, (category, subcategory) in list(labels.items()):
+        if subcategory is None and category in subcategory_keys:
+            labels[label] = (category, category)
+    return labels
+
+
+def match_section(text: str, labels: dict):
+    """Return (category, subcategory) if text is a section heading, else None."""
+    key = normalize(text).strip(" :")
+    if key in labels:
+        return labels[key]
+    # Headings may carry a qualifier: "Mliečne výrobky (syry, ...)"
+    prefixes = [label for label in labels if key.startswith(label) and not key[len(label)].isalpha()]
+    return labels[max(prefixes, key=len)] if prefixes else None
+
+
+def parse_pages(pages: list, layout: Layout, labels: dict) -> list:
+    """Turn rows into chunk items page by page; sections carry across pages."""
+    boilerplate = find_boilerplate(pages)
+    results = []
+    category = subcategory = None
+    item = None
+
+    for page_number, rows in enumerate(pages, start=1):
+        result = PageResult(page_number)
+        results.append(result)
+        if layout is None or (category and not rows):
+            result.error = "no text layer"
+            continue
+
+        for row in rows:
+            text = row_text(row)
+            if normalize(text) in boilerplate or text.replace(" ", "").isdigit():
+                continue
+
+            # After a failure, keep following section headings so later
+            # pages still get the right category
+            if category and is_level_row(row, layout) and not result.error:
+                flags = Flag(0)
+                name, notes = [], []
+                for word in row[1:]:
+                    if word.x0 < layout.name_x - TOLERANCE:
+                        if word.text == "?":
+                            continue
+                        if word.text not in FLAG_ABBREVIATIONS:
+                            result.error = f"unexpected text in flags column: {text!r}"
+                            break
+                        flags |= FLAG_ABBREVIATIONS[word.text]
+                    elif layout.notes_x is not None and word.x0 >= layout.notes_x - TOLERANCE:
+                        notes.append(word.text)
+                    else:
+                        name.append(word.text)
+                if not name and not result.error:
+                    result.error = f"row without a name: {text!r}"
+                if result.error:
+                    continue
+                item = {
+                    "name": " ".join(name),
+                    "histamineLevel": LEVEL_SYMBOLS[row[0].text].name,
+                    "flags": flags.names(),
+                    "notes": " ".join(notes),
+                    "category": category,
+                    "subcategory": subcategory,
+                }
+                result.items.append(item)
+                continue
+
+            section = match_section(text, labels)
+            if section:
+                if section[0] and section[0] != category:
+                    category, subcategory = section[0], None
+                if section[1]:
+                    subcategory = section[1]
+                item = None
+                continue
+
+            if not category or result.error:
+                continue  # Title pages and legend before the table
+            if row[0].x0 < layout.name_x - TOLERANCE or item is None:
+                result.error = f"unrecognized row: {text!r}"
+                continue
+
+            # Wrapped name or notes of the previous item
+            for word in row:
+                if layout.notes_x is not None and word.x0 >= layout.notes_x - TOLERANCE:
+                    item["notes"] = f"{item['notes']} {word.text}".strip()
+                else:
+                    item["name"] = f"{item['name']} {word.text}"
+
+    return results
+
+
+def write_chunks(results: list, progress: ProgressStore, chunks_dir: Path) -> list:
+    """Write chunks whose pages all parsed; return pages that need rasterizing."""
+    by_page = {result.page: result for result in results}
+    raster_pages = []
+    for chunk in progress.load().get("chunks", []):
+        if chunk["status"] == "completed" and chunk_path(chunks_dir, chunk["chunkId"]).exists():
+            continue
+        first, last = chunk["pages"]
+        pages = [by_page.get(page, PageResult(page, error="page missing from text layer"))
+                 for page in range(first, last + 1)]
+        errors = [f"page {p.page}: {p.error}" for p in pages if p.error]
+        if errors:
+            progress.update_chunk(chunk["chunkId"], source="raster", fallbackReason="; ".join(errors))
+            raster_pages.extend(range(first, last + 1))
+            print(f"Chunk {chunk['chunkId']}: raster fallback ({errors[0]})")
+            continue
+
+        items = [item for p in pages for item in p.items]
+        write_json_atomic(chunk_path(chunks_dir, chunk["chunkId"]), {
+            "chunkId": chunk["chunkId"],
+            "pages": chunk["pages"],
+            "items": items,
+        })
+        progress.update_chunk(chunk["chunkId"], status="completed", itemsExtracted=len(items),
+                              source="text_layer")
+    return raster_pages
+
+
+def rasterize_pages(pdf_path: Path, pages: list, images_dir: Path, dpi: int = 300) -> None:
+    """Render the given pages to images_dir/page-NN.png with pdftoppm."""
+    images_dir.mkdir(exist_ok=True)
+    pages = sorted(set(pages))
+    ranges = []
+    for page in pages:
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1][1] = page
+        else:
+            ranges.append([page, page])
+
+    for first, last in ranges:
+        prefix = images_dir / f"raster-{first}"
+        subprocess.run(["pdftoppm", "-png", "-r", str(dpi), "-f", str(first), "-l", str(last),
+                        str(pdf_path), str(prefix)], check=True)
+        # pdftoppm pads page numbers to the document's page count width
+        for image in images_dir.glob(f"{prefix.name}-*.png"):
+            page = int(re.search(r"-(\d+)\.png$", image.name).group(1))
+            image.replace(images_dir / f"page-{page:02d}.png")
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Extract chunks from the PDF text layer.")
+    parser.add_argument("pdf", nargs="?", type=Path, help="Source PDF (default: sourceFile in progress.json)")
+    parser.add_argument("--lang", help="Language for section labels (default: from progress.json)")
+    parser.add_argument("--no-raster", action="store_true", help="Don't rasterize fallback pages")
+    parser.add_argument("--dpi", type=int, default=300, help="Fallback raster resolution (default: 300)")
+    args = parser.parse_args()
+
+    progress = ProgressStore(EXTRACTION_DIR)
+    state = progress.load()
+    pdf_path = args.pdf or Path(state.get("sourceFile") or "")
+    lang = args.lang or state.get("language") or "en"
+    if not pdf_path.is_file():
+        print(f"Error: PDF not found: {pdf_path}")
+        sys.exit(1)
+    if not state.get("chunks"):
+        print("Error: progress.json has no chunks, run setup.sh first")
+        sys.exit(1)
+
+    if shutil.which("pdftotext"):
+        pages = [group_rows(words) for words in read_pdf_words(pdf_path)]
+    else:
+        print("pdftotext not found, falling back to rasterization")
+        pages = []
+
+    layout = detect_layout(pages)
+    if layout:
+        notes = f"{layout.notes_x:.1f}" if layout.notes_x is not None else "none"
+        print(f"Columns: level {layout.level_x:.1f}, name {layout.name_x:.1f}, notes {notes}")
+    else:
+        print("No table found in the text layer")
+
+    results = parse_pages(pages, layout, load_section_labels(lang))
+    chunks_dir = EXTRACTION_DIR / "chunks"
+    chunks_dir.mkdir(exist_ok=True)
+    raster_pages = write_chunks(results, progress, chunks_dir)
+    progress.compact()
+
+    items = sum(len(result.items) for result in results)
+    print(f"\nText layer: {items} items from {len(pages)} pages")
+    if raster_pages:
+        print(f"Pages needing visual extraction: {len(raster_pages)}")
+        if not args.no_raster:
+            rasterize_pages(pdf_path, raster_pages, EXTRACTION_DIR / "images", args.dpi)
+            print(f"Rasterized to {EXTRACTION_DIR / 'images'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,18 @@
 #!/usr/bin/env python3
 """Validate extracted data for completeness and consistency."""
 
+import argparse
 import json
+import sys
 from pathlib import Path
-from collections import Counter
-
-VALID_LEVELS = {
-    "WELL_TOLERATED",
-    "MODERATELY_TOLERATED",
-    "POORLY_TOLERATED",
-    "VERY_POORLY_TOLERATED",
-    "INSUFFICIENT_INFO",
-    "VARIABLE"
-}
-
-VALID_FLAGS = {
-    "HIGH_HISTAMINE",
-    "FAST_SPOILAGE",
-    "OTHER_BIOGENIC_AMINES",
-    "HISTAMINE_LIBERATOR",
-    "DAO_BLOCKER",
-    "INSUFFICIENT_INFO"  # Some items have this as flag
-}
-
-VALID_CATEGORIES = {
-    "ANIMAL_PRODUCTS",
-    "PLANT_PRODUCTS",
-    "BEVERAGES",
-    "FOOD_ADDITIVES",
-    "DIETARY_SUPPLEMENTS",
-    "PREPARATIONS"
-}
-
-def validate():
-    output_file = Path(__file__).parent.parent / "output" / "en.json"
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+from food_model import Flag
+
+VALID_FLAGS = Flag.__members__
+
+def validate(output_file=None):
+    output_file = Path(output_file or Path(__file__).parent.parent / "output" / "en.json")
 
     with open(output_file, 'r', encoding='utf-8') as f:
         data = json.load(f)
@@ -44,59 +23,52 @@ def validate():
 
     print(f"Validating {len(foods)} food items...\n")
 
-    # Check for required fields
-    for item in foods:
-        item_id = item.get("id", "?")
-        name = item.get("name", "")
-
-        if not name:
-            errors.append(f"Item {item_id}: missing name")
+    from food_stats import FoodTable, duplicate_values, format_counts  # Loads NumPy
+    table = FoodTable.from_foods(foods)
 
-        level = item.get("histamineLevel")
-        if level not in VALID_LEVELS:
-            errors.append(f"Item {item_id} ({name[:30]}): invalid histamine level '{level}'")
+    # Check for required fields and invalid values (reported in item order)
+    def item_label(i):
+        return f"Item {foods[i].get('id', '?')} ({foods[i].get('name', '')[:30]})"
 
-        category = item.get("category")
-        if category not in VALID_CATEGORIES:
-            errors.append(f"Item {item_id} ({name[:30]}): invalid category '{category}'")
+    problems = [(i, f"Item {item.get('id', '?')}: missing name")
+                for i, item in enumerate(foods) if not item.get("name")]
+    problems += [(i, f"{item_label(i)}: invalid histamine level '{foods[i].get('histamineLevel')}'")
+                 for i in table.invalid("level").tolist()]
+    problems += [(i, f"{item_label(i)}: invalid category '{foods[i].get('category')}'")
+                 for i in table.invalid("category").tolist()]
+    problems.sort(key=lambda problem: problem[0])
+    errors += [message for _, message in problems]
 
-        flags = item.get("flags", [])
-        for flag in flags:
+    for i in table.invalid("flags").tolist():
+        for flag in foods[i].get("flags", []):
             if flag not in VALID_FLAGS:
-                warnings.append(f"Item {item_id} ({name[:30]}): unknown flag '{flag}'")
+                warnings.append(f"{item_label(i)}: unknown flag '{flag}'")
 
     # Check for near-duplicate names (case-insensitive)
-    names = [i["name"].lower().strip() for i in foods]
-    name_counts = Counter(names)
-    duplicates = [n for n, count in name_counts.items() if count > 1]
+    duplicates = duplicate_values([i["name"].lower().strip() for i in foods])
     if duplicates:
         warnings.append(f"Potential duplicates found: {len(duplicates)}")
         for d in duplicates[:5]:
             warnings.append(f"  - '{d}'")
 
+    # Check that each subcategory belongs to one category
+    spans = table.crosstab("subcategory", "category")
+    for subcategory, row in zip(spans.rows, spans.counts):
+        if (row > 0).sum() > 1:
+            categories = ", ".join(c for c, count in zip(spans.columns, row) if count)
+            warnings.append(f"Subcategory '{subcategory}' spans several categories: {categories}")
+
     # Check histamine level distribution
-    level_counts = Counter(item.get("histamineLevel") for item in foods)
     print("Histamine level distribution:")
-    for level, count in sorted(level_counts.items(), key=lambda x: -x[1]):
-        pct = count / len(foods) * 100
-        print(f"  {level}: {count} ({pct:.1f}%)")
+    print("\n".join(format_counts(table.counts("level"), len(foods), by_count=True)))
 
     # Check flag distribution
-    flag_counts = Counter()
-    for item in foods:
-        for flag in item.get("flags", []):
-            flag_counts[flag] += 1
-
     print("\nFlag distribution:")
-    for flag, count in sorted(flag_counts.items(), key=lambda x: -x[1]):
-        print(f"  {flag}: {count}")
+    print("\n".join(format_counts(table.counts("flags"), by_count=True)))
 
     # Check category distribution
-    cat_counts = Counter(item.get("category") for item in foods)
     print("\nCategory distribution:")
-    for cat, count in sorted(cat_counts.items(), key=lambda x: -x[1]):
-        pct = count / len(foods) * 100
-        print(f"  {cat}: {count} ({pct:.1f}%)")
+    print("\n".join(format_counts(table.counts("category"), len(foods), by_count=True)))
 
     # Summary
     print(f"\n{'='*50}")
@@ -128,6 +100,12 @@ def validate():
 
     return len(errors) == 0
 
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Validate extracted food data.")
+    parser.add_argument("path", nargs="?", help="Output JSON to check (default: extraction/output/en.json)")
+    success = validate(parser.parse_args().path)
+    sys.exit(0 if success else 1)
+
 if __name__ == "__main__":
-    success = validate()
-    exit(0 if success else 1)
+    main()
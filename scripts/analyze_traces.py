@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Aggregate client performance traces exported from ?debug=perf.
+
+Samples (loadFoodData, jsonParse, renderFoods, handleSearch, inputToFrame)
+are grouped per device class and measurement name and summarized as
+p50/p95/p99 in milliseconds. With --baseline, each percentile is compared
+against the same group in the baseline traces; changes beyond --threshold
+percent are marked as regressions (+) or improvements (-), and the exit
+status is 2 if anything regressed.
+
+Usage:
+    python scripts/analyze_traces.py trace.json [trace.json ...]
+        [--baseline old.json [old.json ...]] [--threshold 10] [--all-devices] [--json]
+"""
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+
+
+PERCENTILES = (50, 95, 99)
+
+ALL_DEVICES = "all"
+
+
+def load_samples(paths: list) -> list:
+    """Read samples from exported traces (or bare sample lists)."""
+    samples = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            trace = json.load(f)
+        entries = trace["samples"] if isinstance(trace, dict) else trace
+        device_class = trace.get("deviceClass", "unknown") if isinstance(trace, dict) else "unknown"
+        for sample in entries:
+            if isinstance(sample.get("duration"), (int, float)):
+                samples.append({"deviceClass": device_class, **sample})
+    return samples
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Linearly interpolated percentile of pre-sorted values."""
+    if not sorted_values:
+        return math.nan
+    rank = (len(sorted_values) - 1) * p / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def aggregate(samples: list, pool_devices: bool = False) -> dict:
+    """Return {(device class, name): {"count": n, "p50": ..., "p95": ..., "p99": ...}}."""
+    groups = {}
+    for sample in samples:
+        device = ALL_DEVICES if pool_devices else sample["deviceClass"]
+        # Warm starts (data from the IndexedDB cache) are reported separately
+        name = f"{sample['name']}:warm" if sample.get("warm") else sample["name"]
+        groups.setdefault((device, name), []).append(sample["duration"])
+
+    table = {}
+    for key, durations in groups.items():
+        durations.sort()
+        row = {"count": len(durations)}
+        for p in PERCENTILES:
+            row[f"p{p}"] = percentile(durations, p)
+        table[key] = row
+    return table
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> dict:
+    """Add baseline values and percentage changes to the rows of current."""
+    for key, row in current.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        row["baseline"] = base
+        row["change"] = {}
+        for p in PERCENTILES:
+            name = f"p{p}"
+            change = (row[name] - base[name]) / base[name] * 100 if base[name] else math.nan
+            row["change"][name] = change
+        row["regressed"] = any(c > threshold for c in row["change"].values())
+        row["improved"] = not row["regressed"] and any(c < -threshold for c in row["change"].values())
+    return current
+
+
+def format_table(table: dict) -> str:
+    """Render the aggregate as a fixed-width text table."""
+    header = f"{'device':<22} {'name':<18} {'n':>6}" + "".join(f" {f'p{p}':>16}" for p in PERCENTILES)
+    lines = [header, "-" * len(header)]
+    for (device, name), row in sorted(table.items()):
+        cells = []
+        for p in PERCENTILES:
+            value = f"{row[f'p{p}']:.1f}"
+            change = row.get("change", {}).get(f"p{p}")
+            if change is not None and not math.isnan(change):
+                value += f" ({change:+.0f}%)"
+            cells.append(f" {value:>16}")
+        marker = " +" if row.get("regressed") else " -" if row.get("improved") else ""
+        lines.append(f"{device:<22} {name:<18} {row['count']:>6}" + "".join(cells) + marker)
+    return "\n".join(lines)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Percentile tables for exported performance traces.")
+    parser.add_argument("traces", nargs="+", type=Path, help="Exported trace JSON files")
+    parser.add_argument("--baseline", nargs="+", type=Path, help="Baseline trace JSON files to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Percent change reported as a regression/improvement (default: 10)")
+    parser.add_argument("--all-devices", action="store_true", help="Pool all device classes together")
+    parser.add_argument("--json", action="store_true", help="Print the aggregate as JSON")
+    args = parser.parse_args()
+
+    samples = load_samples(args.traces)
+    if not samples:
+        print("Error: no samples found")
+        sys.exit(1)
+
+    table = aggregate(samples, args.all_devices)
+    if args.baseline:
+        table = compare(table, aggregate(load_samples(args.baseline), args.all_devices), args.threshold)
+
+    if args.json:
+        print(json.dumps([{"deviceClass": device, "name": name, **row} for (device, name), row in sorted(table.items())],
+                         indent=2))
+    else:
+        print(format_table(table))
+
+    if any(row.get("regressed") for row in table.values()):
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
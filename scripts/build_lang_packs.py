@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Build one language pack per language and inline the default one.
+
+A pack (data/packs/<lang>.json) holds everything the app loads for a
+language: the i18n strings, the enums and the foods. Its version is a short
+hash of that content, so the app loads a language with a single request and
+can tell from the version alone whether its IndexedDB copy is current.
+
+index.html gets two generated blocks, between BEGIN/END markers:
+
+    lang-pack-hints   prefetch hints for the packs of the other languages
+    lang-pack         the pack versions and the default language's pack
+                      (i18n.defaultLang), so a cold start in that language
+                      needs no data request at all
+
+Run by the pre-commit hook (before build_manifest.py).
+
+Usage:
+    python scripts/build_lang_packs.py [--check]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+
+PROJECT_DIR = Path(__file__).parent.parent
+DATA_DIR = PROJECT_DIR / "data"
+I18N_DIR = PROJECT_DIR / "i18n"
+PACKS_DIR = DATA_DIR / "packs"
+INDEX_PATH = PROJECT_DIR / "index.html"
+
+DEFAULT_LANG = re.compile(r"defaultLang: '([a-z]+)'")
+
+VERSION_LENGTH = 12
+
+BLOCK = re.compile(r"(?P<indent>[ \t]*)<!-- BEGIN (?P<name>[\w-]+) .*?-->\n.*?<!-- END (?P=name) -->", re.S)
+
+
+def pack_languages() -> list:
+    """Languages that have both translations and food data."""
+    return sorted(path.stem for path in I18N_DIR.glob("*.json") if (DATA_DIR / path.name).exists())
+
+
+def compact(data) -> str:
+    """Minified JSON."""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def build_pack(lang: str) -> dict:
+    """Merge the translations, enums and foods of one language."""
+    with open(I18N_DIR / f"{lang}.json", 'r', encoding='utf-8') as f:
+        translations = json.load(f)
+    with open(DATA_DIR / f"{lang}.json", 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    content = {"i18n": translations, "enums": data.get("enums", {}), "foods": data["foods"]}
+    version = hashlib.sha256(compact(content).encode("utf-8")).hexdigest()[:VERSION_LENGTH]
+    return {"lang": lang, "version": version, **content}
+
+
+def inline_json(data) -> str:
+    """JSON that is safe inside a <script> element."""
+    return compact(data).replace("</", "<\\/").replace("<!--", "<\\u0021--")
+
+
+def render_blocks(packs: dict, inline_lang: str) -> dict:
+    """Contents of the generated index.html blocks, by name."""
+    hints = [f'<link rel="prefetch" href="data/packs/{lang}.json?v={pack["version"]}" as="fetch" crossorigin="anonymous">'
+             for lang, pack in packs.items() if lang != inline_lang]
+    info = {"inline": inline_lang, "versions": {lang: pack["version"] for lang, pack in packs.items()}}
+    return {
+        "lang-pack-hints": hints,
+        "lang-pack": [
+            f'<script type="application/json" id="langPackInfo">{inline_json(info)}</script>',
+            f'<script type="application/json" id="langPack">{inline_json(packs[inline_lang])}</script>',
+        ],
+    }
+
+
+def update_index(html: str, blocks: dict) -> str:
+    """Replace the generated blocks of index.html."""
+    found = set()
+
+    def replace(match):
+        name, indent = match.group("name"), match.group("indent")
+        if name not in blocks:
+            return match.group(0)
+        found.add(name)
+        lines = [f"<!-- BEGIN {name} (generated by scripts/build_lang_packs.py) -->",
+                 *blocks[name], f"<!-- END {name} -->"]
+        return "\n".join(indent + line for line in lines)
+
+    html = BLOCK.sub(replace, html)
+    missing = set(blocks) - found
+    if missing:
+        raise ValueError(f"{INDEX_PATH.name}: no BEGIN/END markers for {', '.join(sorted(missing))}")
+    return html
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """Write a text file atomically."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Build per-language packs and inline the default one.")
+    parser.add_argument("--check", action="store_true",
+                        help="Don't write; exit with status 1 if a pack or index.html is out of date")
+    args = parser.parse_args()
+
+    try:
+        html = INDEX_PATH.read_text(encoding='utf-8')
+        match = DEFAULT_LANG.search(html)
+        if not match:
+            raise ValueError(f"defaultLang not found in {INDEX_PATH.name}")
+        packs = {lang: build_pack(lang) for lang in pack_languages()}
+        if match.group(1) not in packs:
+            raise ValueError(f"no i18n and data files for the default language {match.group(1)!r}")
+        updated = update_index(html, render_blocks(packs, match.group(1)))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    outputs = {PACKS_DIR / f"{lang}.json": compact(pack) + "\n" for lang, pack in packs.items()}
+    outputs[INDEX_PATH] = updated
+    stale = [path for path, text in outputs.items()
+             if not path.exists() or path.read_text(encoding='utf-8') != text]
+
+    if not stale:
+        print(f"Language packs are up to date ({', '.join(packs)})")
+        return
+    names = ", ".join(str(path.relative_to(PROJECT_DIR)) for path in stale)
+    if args.check:
+        print(f"Out of date: {names}", file=sys.stderr)
+        sys.exit(1)
+
+    PACKS_DIR.mkdir(exist_ok=True)
+    for path in stale:
+        write_atomic(path, outputs[path])
+    print(f"Wrote {names}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Build asset-manifest.json: a content revision for every URL in sw.js
+ASSETS_TO_CACHE.
+
+The service worker caches each asset under its revision and serves it from
+the cache without going to the network; only the manifest itself is
+revalidated. When the manifest changes, the worker re-downloads just the
+assets whose revision changed. Run by the pre-commit hook.
+
+Usage:
+    python scripts/build_manifest.py [--check]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+
+PROJECT_DIR = Path(__file__).parent.parent
+SW_PATH = PROJECT_DIR / "sw.js"
+MANIFEST_PATH = PROJECT_DIR / "asset-manifest.json"
+
+# URL prefix the site is served under (GitHub Pages project site)
+BASE_URL = "/histali/"
+
+ASSET_LIST = re.compile(r"const ASSETS_TO_CACHE = \[(.*?)\];", re.S)
+ASSET_URL = re.compile(r"'([^']+)'")
+
+REVISION_LENGTH = 12
+
+
+def read_asset_urls(sw_path: Path = SW_PATH) -> list:
+    """Return the URLs listed in ASSETS_TO_CACHE, in order."""
+    match = ASSET_LIST.search(sw_path.read_text(encoding='utf-8'))
+    if not match:
+        raise ValueError(f"ASSETS_TO_CACHE not found in {sw_path}")
+    return ASSET_URL.findall(match.group(1))
+
+
+def asset_path(url: str) -> Path:
+    """Map an asset URL to the file that serves it."""
+    if not url.startswith(BASE_URL):
+        raise ValueError(f"Asset outside {BASE_URL}: {url}")
+    relative = url[len(BASE_URL):]
+    if not relative or relative.endswith("/"):
+        relative += "index.html"
+    return PROJECT_DIR / relative
+
+
+def file_revision(path: Path) -> str:
+    """Short SHA-256 of the file contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()[:REVISION_LENGTH]
+
+
+def build_manifest(urls: list) -> dict:
+    """Revision for every asset URL."""
+    return {"assets": {url: file_revision(asset_path(url)) for url in urls}}
+
+
+def write_manifest(manifest: dict, output_path: Path = MANIFEST_PATH) -> None:
+    """Write the manifest atomically."""
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    os.replace(tmp_path, output_path)
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Write per-asset revisions for the service worker.")
+    parser.add_argument("--check", action="store_true",
+                        help="Don't write; exit with status 1 if the manifest is out of date")
+    args = parser.parse_args()
+
+    try:
+        manifest = build_manifest(read_asset_urls())
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    current = None
+    if MANIFEST_PATH.exists():
+        with open(MANIFEST_PATH, 'r', encoding='utf-8') as f:
+            current = json.load(f)
+
+    if current == manifest:
+        print(f"{MANIFEST_PATH.name} is up to date ({len(manifest['assets'])} assets)")
+        return
+
+    changed = [url for url, revision in manifest["assets"].items()
+               if (current or {}).get("assets", {}).get(url) != revision]
+    if args.check:
+        print(f"{MANIFEST_PATH.name} is out of date: {', '.join(changed) or 'removed assets'}", file=sys.stderr)
+        sys.exit(1)
+
+    write_manifest(manifest)
+    print(f"Wrote {MANIFEST_PATH.name}: {len(changed)} of {len(manifest['assets'])} assets changed")
+
+
+if __name__ == "__main__":
+    main()
@@ -59,18 +59,27 @@ def clean_html(input_path: str, output_path: str) -> dict:
     return stats
 
 
-if __name__ == '__main__':
+def main():
+    """Main function."""
+    import argparse
     from pathlib import Path
-    script_dir = Path(__file__).parent
-    project_dir = script_dir.parent
 
-    input_file = project_dir / 'source' / 'pdf24.html'
-    output_file = project_dir / 'source' / 'pdf24_clean.html'
+    source_dir = Path(__file__).parent.parent / 'source'
+    parser = argparse.ArgumentParser(description="Remove base64 images and fonts from an HTML export.")
+    parser.add_argument('input', nargs='?', default=source_dir / 'pdf24.html',
+                        help="Input HTML (default: source/pdf24.html)")
+    parser.add_argument('output', nargs='?', default=source_dir / 'pdf24_clean.html',
+                        help="Output HTML (default: source/pdf24_clean.html)")
+    args = parser.parse_args()
 
-    stats = clean_html(str(input_file), str(output_file))
+    stats = clean_html(str(args.input), str(args.output))
 
     print(f"Original size: {stats['original_size']:,} bytes")
     print(f"Final size: {stats['final_size']:,} bytes")
     print(f"Reduction: {stats['reduction_percent']}%")
     print(f"Data URLs removed: {stats['data_images_removed']}")
     print(f"Font-face blocks removed: {stats['font_faces_removed']}")
+
+
+if __name__ == '__main__':
+    main()
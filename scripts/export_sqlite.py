@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Export food data JSON files into one normalized SQLite database.
+
+Schema (one set of food tables per language):
+
+    languages            code, source, version, total_items
+    histamine_levels     name, sort_order, value, color
+    categories           name
+    subcategories        name, category
+    flags                name, code
+    labels               lang, enum, name, label    (translated enum labels)
+    foods_<lang>         id, name, histamine_level, category, subcategory, notes
+    food_flags_<lang>    food_id, flag
+    foods_<lang>_fts     FTS5 over name and notes (accent-folding tokenizer)
+
+Example: L-flagged spices whose notes mention "fermented"
+
+    SELECT f.id, f.name FROM foods_en f
+    JOIN food_flags_en ff ON ff.food_id = f.id AND ff.flag = 'HISTAMINE_LIBERATOR'
+    WHERE f.subcategory = 'SPICES'
+      AND f.id IN (SELECT rowid FROM foods_en_fts WHERE foods_en_fts MATCH 'notes:fermented*');
+
+The database is built in a temporary file inside one transaction and
+renamed into place.
+
+Usage:
+    python scripts/export_sqlite.py [data.json ...] [--output data/histali.sqlite]
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+from pathlib import Path
+
+from food_model import Category, FLAG_ABBREVIATIONS, Flag, HistamineLevel
+
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+DEFAULT_OUTPUT = DATA_DIR / "histali.sqlite"
+
+LANG_CODE = re.compile(r"^[a-z]{2,8}$")
+
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+
+SHARED_SCHEMA = """
+CREATE TABLE languages (
+    code TEXT PRIMARY KEY,
+    source TEXT,
+    version TEXT,
+    total_items INTEGER NOT NULL
+);
+CREATE TABLE histamine_levels (
+    name TEXT PRIMARY KEY,
+    sort_order INTEGER NOT NULL,
+    value INTEGER,
+    color TEXT
+);
+CREATE TABLE categories (
+    name TEXT PRIMARY KEY
+);
+CREATE TABLE subcategories (
+    name TEXT PRIMARY KEY,
+    category TEXT REFERENCES categories(name)
+);
+CREATE TABLE flags (
+    name TEXT PRIMARY KEY,
+    code TEXT
+);
+CREATE TABLE labels (
+    lang TEXT NOT NULL REFERENCES languages(code),
+    enum TEXT NOT NULL,
+    name TEXT NOT NULL,
+    label TEXT NOT NULL,
+    PRIMARY KEY (lang, enum, name)
+) WITHOUT ROWID;
+"""
+
+LANGUAGE_SCHEMA = """
+CREATE TABLE foods_{lang} (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    histamine_level TEXT NOT NULL REFERENCES histamine_levels(name),
+    category TEXT NOT NULL REFERENCES categories(name),
+    subcategory TEXT REFERENCES subcategories(name),
+    notes TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE food_flags_{lang} (
+    food_id INTEGER NOT NULL REFERENCES foods_{lang}(id),
+    flag TEXT NOT NULL REFERENCES flags(name),
+    PRIMARY KEY (food_id, flag)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE foods_{lang}_fts USING fts5(
+    name, notes,
+    content='foods_{lang}', content_rowid='id',
+    tokenize='{tokenizer}'
+);
+"""
+
+# Created after the bulk insert; building an index once is cheaper than
+# maintaining it row by row
+LANGUAGE_INDEXES = """
+CREATE INDEX idx_foods_{lang}_level ON foods_{lang}(histamine_level);
+CREATE INDEX idx_foods_{lang}_category ON foods_{lang}(category);
+CREATE INDEX idx_foods_{lang}_subcategory ON foods_{lang}(subcategory);
+CREATE INDEX idx_food_flags_{lang}_flag ON food_flags_{lang}(flag);
+INSERT INTO foods_{lang}_fts(foods_{lang}_fts) VALUES ('rebuild');
+"""
+
+# Keys of the "enums" object in the data files, as stored in labels.enum
+LABELED_ENUMS = ("histamineLevel", "flags", "categories", "subcategories")
+
+
+def run_script(conn: sqlite3.Connection, script: str) -> None:
+    """Execute ;-separated statements inside the current transaction
+    (executescript() would commit it first)."""
+    for statement in script.split(";"):
+        if statement.strip():
+            conn.execute(statement)
+
+
+def load_data(path: Path) -> tuple:
+    """Read a data JSON file; return (lang, data)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    lang = data.get("metadata", {}).get("language") or path.stem
+    if not LANG_CODE.match(lang):
+        raise ValueError(f"{path}: unusable language code {lang!r}")
+    return lang, data
+
+
+def insert_enums(conn: sqlite3.Connection, datasets: dict) -> None:
+    """Fill the shared enum tables and the translated labels."""
+    enums = [data.get("enums", {}) for data in datasets.values()]
+
+    level_info = {}
+    for e in enums:
+        for name, info in e.get("histamineLevel", {}).items():
+            level_info.setdefault(name, info)
+    conn.executemany(
+        "INSERT INTO histamine_levels VALUES (?, ?, ?, ?)",
+        ((level.name, level.value, level_info.get(level.name, {}).get("value"),
+          level_info.get(level.name, {}).get("color")) for level in HistamineLevel))
+
+    conn.executemany("INSERT INTO categories VALUES (?)", ((c.name,) for c in Category))
+
+    subcategories = {}
+    for e in enums:
+        for name, info in e.get("subcategories", {}).items():
+            subcategories.setdefault(name, info.get("category"))
+    for data in datasets.values():
+        for food in data["foods"]:
+            if food.get("subcategory") is not None:
+                subcategories.setdefault(food["subcategory"], food.get("category"))
+    conn.executemany("INSERT INTO subcategories VALUES (?, ?)", subcategories.items())
+
+    codes = {flag.name: code for code, flag in FLAG_ABBREVIATIONS.items()}
+    conn.executemany("INSERT INTO flags VALUES (?, ?)", ((f.name, codes.get(f.name)) for f in Flag))
+
+    conn.executemany(
+        "INSERT INTO labels VALUES (?, ?, ?, ?)",
+        ((lang, enum, name, info["label"])
+         for lang, data in datasets.items()
+         for enum in LABELED_ENUMS
+         for name, info in data.get("enums", {}).get(enum, {}).items()
+         if info.get("label")))
+
+
+def insert_language(conn: sqlite3.Connection, lang: str, data: dict) -> int:
+    """Create and fill the food tables of one language; return the food count."""
+    foods = data["foods"]
+    metadata = data.get("metadata", {})
+
+    run_script(conn, LANGUAGE_SCHEMA.format(lang=lang, tokenizer=FTS_TOKENIZER))
+    conn.execute("INSERT INTO languages VALUES (?, ?, ?, ?)",
+                 (lang, metadata.get("source"), metadata.get("version"), len(foods)))
+
+    # Files without ids get their position, like the app does
+    rows = [(food.get("id") or idx, food) for idx, food in enumerate(foods, start=1)]
+    conn.executemany(
+        f"INSERT INTO foods_{lang} VALUES (?, ?, ?, ?, ?, ?)",
+        ((food_id, food["name"], food["histamineLevel"], food["category"],
+          food.get("subcategory"), food.get("notes") or "") for food_id, food in rows))
+    conn.executemany(
+        f"INSERT OR IGNORE INTO food_flags_{lang} VALUES (?, ?)",
+        ((food_id, flag) for food_id, food in rows for flag in food.get("flags") or []))
+
+    run_script(conn, LANGUAGE_INDEXES.format(lang=lang))
+    return len(foods)
+
+
+def export(inputs: list, output_path: Path) -> dict:
+    """Build the database from data files; return {lang: food count}."""
+    datasets = {}
+    for path in inputs:
+        lang, data = load_data(path)
+        if lang in datasets:
+            raise ValueError(f"{path}: language {lang!r} given twice")
+        datasets[lang] = data
+
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        # Nothing to protect until the rename, so skip journaling and syncs
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("BEGIN")
+        run_script(conn, SHARED_SCHEMA)
+        counts = {lang: insert_language(conn, lang, data) for lang, data in datasets.items()}
+        insert_enums(conn, datasets)
+        conn.execute("COMMIT")
+        conn.execute("ANALYZE")
+    except BaseException:
+        conn.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+    conn.close()
+    os.replace(tmp_path, output_path)
+    return counts
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Export food data into a SQLite database with FTS5.")
+    parser.add_argument("inputs", nargs="*", type=Path,
+                        help="data/<lang>.json or merge_chunks output (default: data/*.json)")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT,
+                        help=f"Database path (default: {DEFAULT_OUTPUT.relative_to(DATA_DIR.parent)})")
+    args = parser.parse_args()
+
+    inputs = args.inputs or sorted(DATA_DIR.glob("*.json"))
+    if not inputs:
+        print("Error: no input files", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        counts = export(inputs, args.output)
+    except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    summary = ", ".join(f"{lang}: {count}" for lang, count in counts.items())
+    print(f"Wrote {args.output} ({summary})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Stable food IDs backed by a per-language registry.
+
+A food's identity is its normalized name plus category and subcategory.
+The registry (data/ids/<lang>.json) maps identities to IDs, so a rebuild or
+a new edition gives every known food the ID it had before; only new foods
+get new IDs (never reused). The registry also handles:
+
+    - moves: a food whose identity is new, but whose name matches exactly
+      one registered identity that the build no longer contains (it changed
+      category/subcategory), keeps that identity's ID
+    - renames: recorded with the `rename` command, the new name resolves to
+      the old identity
+    - collisions: a second food with the same identity in one build gets
+      the identity "<identity>#2" (and so on), in input order
+
+With an empty registry, IDs come out in input order starting at 1, the
+same as the enumeration the producers used before.
+
+Usage:
+    python scripts/food_ids.py seed <data.json> [--registry PATH]
+    python scripts/food_ids.py assign <data.json> [--registry PATH]
+    python scripts/food_ids.py rename <lang> <old name> <new name> [--registry PATH]
+"""
+
+import argparse
+import json
+import os
+import sys
+from array import array
+from pathlib import Path
+
+from food_query import normalize
+
+
+REGISTRY_DIR = Path(__file__).parent.parent / "data" / "ids"
+
+
+def identity(name: str, category, subcategory) -> str:
+    """Canonical identity: "<category>/<subcategory>/<normalized name>"."""
+    return f"{category}/{subcategory}/{' '.join(normalize(name).split())}"
+
+
+def food_identity(food: dict) -> str:
+    """Identity of a food dict from data/<lang>.json or a chunk file."""
+    return identity(food["name"], food.get("category"), food.get("subcategory"))
+
+
+def identity_name(key: str) -> str:
+    """Normalized name part of an identity."""
+    return key.split("/", 2)[2]
+
+
+def registry_path(lang: str) -> Path:
+    """Default registry location for a language."""
+    return REGISTRY_DIR / f"{lang}.json"
+
+
+class IdRegistry:
+    """Persistent identity -> ID mapping."""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self.ids = {}
+        self.renames = {}
+        self.next_id = 1
+
+    @classmethod
+    def load(cls, path) -> "IdRegistry":
+        """Read a registry; a missing file gives an empty one."""
+        registry = cls(path)
+        if registry.path.exists():
+            with open(registry.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            registry.ids = data.get("ids", {})
+            registry.renames = data.get("renames", {})
+            registry.next_id = data.get("nextId", max(registry.ids.values(), default=0) + 1)
+        return registry
+
+    def save(self) -> None:
+        """Write the registry atomically (identities in ID order)."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "nextId": self.next_id,
+            "ids": dict(sorted(self.ids.items(), key=lambda item: item[1])),
+            "renames": self.renames,
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        os.replace(tmp_path, self.path)
+
+    def resolve(self, key: str) -> str:
+        """Follow recorded renames to the registered identity."""
+        visited = set()
+        while key in self.renames and key not in visited:
+            visited.add(key)
+            key = self.renames[key]
+        return key
+
+    def rename(self, old_name: str, new_name: str) -> int:
+        """Make new_name resolve to every identity named old_name; return how many."""
+        old = ' '.join(normalize(old_name).split())
+        count = 0
+        for key in list(self.ids):
+            if identity_name(key) == old:
+                category, subcategory, _ = key.split("/", 2)
+                self.renames[identity(new_name, category, subcategory)] = key
+                count += 1
+        return count
+
+    def seed(self, foods: list) -> None:
+        """Register the IDs foods already carry (adopting an existing file)."""
+        occurrences = {}
+        for food in foods:
+            key = self.resolve(food_identity(food))
+            n = occurrences[key] = occurrences.get(key, 0) + 1
+            if food.get("id"):
+                self.ids.setdefault(key if n == 1 else f"{key}#{n}", food["id"])
+        self.next_id = max(self.next_id, max(self.ids.values(), default=0) + 1)
+
+    def allocate(self, make_keys) -> array:
+        """Return the ID for every identity, in order; register new ones.
+
+        make_keys() must return a fresh iterator over the identities each
+        time it is called (it is read twice), so the identities of a large
+        build don't have to be held in memory.
+        """
+        # Pass 1: registered identities this build still contains
+        claimed = set()
+        for key in make_keys():
+            key = self.resolve(key)
+            if key in self.ids:
+                claimed.add(key)
+
+        # Unclaimed identities by name: candidates for moved foods
+        moved = {}
+        for key in self.ids:
+            if key not in claimed:
+                moved.setdefault(identity_name(key), []).append(key)
+
+        # Pass 2: assign
+        ids = array('I')
+        occurrences = {}
+        for key in make_keys():
+            key = self.resolve(key)
+            n = occurrences[key] = occurrences.get(key, 0) + 1
+            if n > 1:
+                key = f"{key}#{n}"
+            if key not in self.ids:
+                candidates = moved.get(identity_name(key)) if n == 1 else None
+                if candidates and len(candidates) == 1:
+                    self.ids[key] = self.ids.pop(candidates.pop())
+                else:
+                    self.ids[key] = self.next_id
+                    self.next_id += 1
+            ids.append(self.ids[key])
+        return ids
+
+    def assign(self, foods: list) -> None:
+        """Set food["id"] for a list of food dicts."""
+        keys = [food_identity(food) for food in foods]
+        for food, food_id in zip(foods, self.allocate(lambda: iter(keys))):
+            food["id"] = food_id
+
+
+def main():
+    """Main function."""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--registry", type=Path, help="Registry file (default: data/ids/<lang>.json)")
+    parser = argparse.ArgumentParser(description="Manage stable food IDs.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    seed = commands.add_parser("seed", parents=[common], help="Register the IDs a data file already has")
+    seed.add_argument("data", type=Path)
+    assign = commands.add_parser("assign", parents=[common], help="Rewrite the IDs of a data file from the registry")
+    assign.add_argument("data", type=Path)
+    rename = commands.add_parser("rename", parents=[common], help="Keep the ID of a food whose name changed")
+    rename.add_argument("lang")
+    rename.add_argument("old_name")
+    rename.add_argument("new_name")
+    args = parser.parse_args()
+
+    if args.command == "rename":
+        registry = IdRegistry.load(args.registry or registry_path(args.lang))
+        count = registry.rename(args.old_name, args.new_name)
+        if not count:
+            print(f"Error: no registered food named {args.old_name!r}", file=sys.stderr)
+            sys.exit(1)
+        registry.save()
+        print(f"Recorded rename for {count} identit{'y' if count == 1 else 'ies'}")
+        return
+
+    with open(args.data, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    lang = data.get("metadata", {}).get("language") or args.data.stem
+    registry = IdRegistry.load(args.registry or registry_path(lang))
+
+    if args.command == "seed":
+        registry.seed(data["foods"])
+        registry.save()
+        print(f"Registered {len(registry.ids)} identities in {registry.path} (next ID {registry.next_id})")
+        return
+
+    before = [food.get("id") for food in data["foods"]]
+    registry.assign(data["foods"])
+    registry.save()
+    changed = sum(1 for old, food in zip(before, data["foods"]) if old != food["id"])
+    tmp_path = args.data.with_name(args.data.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, args.data)
+    print(f"Assigned IDs to {len(data['foods'])} foods in {args.data} ({changed} changed)")
+
+
+if __name__ == "__main__":
+    main()
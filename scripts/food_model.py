@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Shared compact food model for the data scripts.
+
+Histamine levels and categories are IntEnums, flags an IntFlag bitmask, and
+FoodItem is a slotted dataclass. Membership tests and flag unions become
+integer operations; serialization produces the same JSON as before (enum
+names, flags in canonical order).
+"""
+
+from dataclasses import dataclass
+from enum import IntEnum, IntFlag
+
+
+class HistamineLevel(IntEnum):
+    """Histamine tolerance level; the value is the sort order used by the app."""
+    WELL_TOLERATED = 0
+    MODERATELY_TOLERATED = 1
+    POORLY_TOLERATED = 2
+    VERY_POORLY_TOLERATED = 3
+    INSUFFICIENT_INFO = 4
+    VARIABLE = 5
+
+    @classmethod
+    def from_symbol(cls, symbol: str) -> "HistamineLevel":
+        """Convert a PDF symbol ("0"-"3", "?", "-") to a level."""
+        return LEVEL_SYMBOLS.get(symbol, cls.INSUFFICIENT_INFO)
+
+
+class Category(IntEnum):
+    """Top-level food category."""
+    ANIMAL_PRODUCTS = 0
+    PLANT_PRODUCTS = 1
+    BEVERAGES = 2
+    FOOD_ADDITIVES = 3
+    DIETARY_SUPPLEMENTS = 4
+    PREPARATIONS = 5
+
+
+class Flag(IntFlag):
+    """Food flags; bit order is the canonical order in data/<lang>.json."""
+    HIGH_HISTAMINE = 1
+    FAST_SPOILAGE = 2
+    OTHER_BIOGENIC_AMINES = 4
+    HISTAMINE_LIBERATOR = 8
+    DAO_BLOCKER = 16
+    INSUFFICIENT_INFO = 32  # Some extracted items carry this as a flag
+
+    @classmethod
+    def from_names(cls, names) -> "Flag":
+        """Combine flag names into a bitmask (raises KeyError on unknown names)."""
+        flags = cls(0)
+        for name in names:
+            flags |= cls[name]
+        return flags
+
+    @classmethod
+    def from_abbreviations(cls, text) -> "Flag":
+        """Combine PDF abbreviations ("H A L" or ["H", "L"]), ignoring unknown ones."""
+        parts = text.split() if isinstance(text, str) else text
+        flags = cls(0)
+        for part in parts:
+            flags |= FLAG_ABBREVIATIONS.get(part, 0)
+        return flags
+
+    def names(self) -> list:
+        """Return member names in canonical order."""
+        return [flag.name for flag in Flag if self & flag]
+
+
+LEVEL_SYMBOLS = {
+    "0": HistamineLevel.WELL_TOLERATED,
+    "1": HistamineLevel.MODERATELY_TOLERATED,
+    "2": HistamineLevel.POORLY_TOLERATED,
+    "3": HistamineLevel.VERY_POORLY_TOLERATED,
+    "?": HistamineLevel.INSUFFICIENT_INFO,
+    "-": HistamineLevel.VARIABLE,
+}
+
+FLAG_ABBREVIATIONS = {
+    "H": Flag.HIGH_HISTAMINE,
+    "H!": Flag.FAST_SPOILAGE,
+    "A": Flag.OTHER_BIOGENIC_AMINES,
+    "L": Flag.HISTAMINE_LIBERATOR,
+    "B": Flag.DAO_BLOCKER,
+}
+
+
+# Category written for an item parsed before any category heading
+NO_CATEGORY = "OTHER"
+
+
+@dataclass(slots=True)
+class FoodItem:
+    """Food item with properties."""
+    name: str
+    histamine_level: HistamineLevel = HistamineLevel.INSUFFICIENT_INFO
+    flags: Flag = Flag(0)
+    notes: str = ""
+    category: Category | None = None
+    subcategory: str = "OTHER"
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FoodItem":
+        """Parse a food dict from data/<lang>.json or a chunk file.
+
+        Raises KeyError for unknown level, category or flag names.
+        """
+        return cls(
+            name=data["name"],
+            histamine_level=HistamineLevel[data["histamineLevel"]],
+            flags=Flag.from_names(data.get("flags") or []),
+            notes=data.get("notes") or "",
+            category=None if data["category"] == NO_CATEGORY else Category[data["category"]],
+            subcategory=data.get("subcategory"),
+        )
+
+    @property
+    def category_name(self) -> str:
+        """Category name as written to the data files."""
+        return NO_CATEGORY if self.category is None else self.category.name
+
+    def to_dict(self, food_id: int) -> dict:
+        """Serialize in the key order used by the generated data files."""
+        return {
+            "id": food_id,
+            "category": self.category_name,
+            "subcategory": self.subcategory,
+            "name": self.name,
+            "histamineLevel": self.histamine_level.name,
+            "flags": self.flags.names(),
+            "notes": self.notes,
+        }
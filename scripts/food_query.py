@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Indexed food lookups over data/<lang>.json.
+
+Loads a language file once into indexed structures and answers queries with
+the same semantics as filterFoods/sortFoods in index.html:
+
+    - normalized-name hash (exact lookups, exact-match ranking)
+    - prefix trie over normalized names (autocomplete)
+    - per-level, per-subcategory and per-flag id sets (filters)
+
+Usage as a library:
+    from food_query import load_index
+    index = load_index("sk")
+    index.search("syr", levels=["WELL_TOLERATED"], flags=["HIGH_HISTAMINE"])
+
+Usage from the command line:
+    python scripts/food_query.py <lang> <query> [query ...]
+"""
+
+import json
+import re
+import sys
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+
+from food_model import HistamineLevel
+
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Matches HISTAMINE_SORT_ORDER in index.html
+HISTAMINE_SORT_ORDER = {level.name: level.value for level in HistamineLevel}
+
+SORT_COLUMNS = ("name", "histamineLevel")
+
+# Slovak alphabet as tailored by CLDR (used by localeCompare(..., 'sk')).
+# Letters listed here differ at the primary level; other accents
+# (á, é, ľ, ň, ...) only differ at the secondary level.
+SK_ALPHABET = [
+    "a", "ä", "b", "c", "č", "d", "e", "f", "g", "h", "ch", "i", "j", "k",
+    "l", "m", "n", "o", "ô", "p", "q", "r", "ř", "s", "š", "t", "u", "v",
+    "w", "x", "y", "z", "ž",
+]
+SK_PRIMARY = {letter: rank for rank, letter in enumerate(SK_ALPHABET)}
+
+# Root collation order of common punctuation and symbols (after whitespace)
+PUNCTUATION_ORDER = "_-,;:!?.'\"()[]{}@*/\\&#%`^+<=>|~$"
+PUNCTUATION_PRIMARY = {char: rank + 1 for rank, char in enumerate(PUNCTUATION_ORDER)}
+
+CACHE_SIZE = 1024
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip diacritics (same as normalize() in index.html)."""
+    return re.sub(r'[\u0300-\u036f]', '', unicodedata.normalize('NFD', text.lower()))
+
+
+def collation_key(text: str) -> tuple:
+    """Sort key approximating text.localeCompare(other, 'sk').
+
+    Compares primary letters first, then accents, then case, like ICU.
+    Whitespace and punctuation sort before digits, digits before letters.
+    """
+    primary, secondary, tertiary = [], [], []
+    lower = text.lower()
+    i = 0
+    while i < len(lower):
+        char = lower[i]
+        upper = text[i] != char
+
+        if lower.startswith("ch", i):
+            primary.append((2, SK_PRIMARY["ch"]))
+            secondary.append(0)
+            tertiary.append(int(upper))
+            i += 2
+            continue
+
+        if char in SK_PRIMARY:
+            primary.append((2, SK_PRIMARY[char]))
+            secondary.append(0)
+        else:
+            decomposed = unicodedata.normalize('NFD', char)
+            base = decomposed[0]
+            if base in SK_PRIMARY:
+                primary.append((2, SK_PRIMARY[base]))
+                secondary.append(sum(ord(c) for c in decomposed[1:]))
+            elif base.isdigit():
+                primary.append((1, int(base) if base.isascii() else ord(base)))
+                secondary.append(0)
+            elif base.isalpha():
+                primary.append((3, ord(base)))
+                secondary.append(sum(ord(c) for c in decomposed[1:]))
+            elif base.isspace():
+                primary.append((0, 0))
+                secondary.append(0)
+            else:
+                primary.append((0, PUNCTUATION_PRIMARY.get(base, 1000 + ord(base))))
+                secondary.append(0)
+        tertiary.append(int(upper))
+        i += 1
+
+    return tuple(primary), tuple(secondary), tuple(tertiary)
+
+
+class FoodIndex:
+    """In-memory indexes over the foods of one language file."""
+
+    def __init__(self, foods: list, lang: str = None, cache_size: int = CACHE_SIZE):
+        self.lang = lang
+        self.foods = foods
+        self.normalized = [normalize(food["name"]) for food in foods]
+
+        self.by_id = {food.get("id"): idx for idx, food in enumerate(foods)}
+
+        # Normalized name -> ids (names are not guaranteed unique)
+        self.by_name = {}
+        for idx, name in enumerate(self.normalized):
+            self.by_name.setdefault(name, []).append(idx)
+
+        self.by_level = {}
+        self.by_subcategory = {}
+        self.by_flag = {}
+        for idx, food in enumerate(foods):
+            self.by_level.setdefault(food["histamineLevel"], set()).add(idx)
+            self.by_subcategory.setdefault(food["subcategory"], set()).add(idx)
+            for flag in food.get("flags") or []:
+                self.by_flag.setdefault(flag, set()).add(idx)
+
+        self.trie = {}
+        for idx, name in enumerate(self.normalized):
+            node = self.trie
+            for char in name:
+                node = node.setdefault(char, {})
+            node.setdefault(None, []).append(idx)
+
+        self._sort_keys = None
+        self._query = lru_cache(maxsize=cache_size)(self._run_query)
+
+    @classmethod
+    def from_file(cls, path: Path, **kwargs) -> "FoodIndex":
+        """Build an index from a data JSON file."""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        lang = kwargs.pop("lang", None) or data.get("metadata", {}).get("language")
+        return cls(data["foods"], lang=lang, **kwargs)
+
+    def __len__(self):
+        return len(self.foods)
+
+    def get(self, food_id):
+        """Return the food with the given id, or None."""
+        idx = self.by_id.get(food_id)
+        return None if idx is None else self.foods[idx]
+
+    def lookup(self, name: str) -> list:
+        """Return foods whose normalized name equals the normalized input."""
+        return [self.foods[idx] for idx in self.by_name.get(normalize(name.strip()), [])]
+
+    def complete(self, prefix: str, limit: int = None) -> list:
+        """Return foods whose normalized name starts with prefix, in data order."""
+        node = self.trie
+        for char in normalize(prefix.strip()):
+            node = node.get(char)
+            if node is None:
+                return []
+
+        ids = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for key, child in current.items():
+                if key is None:
+                    ids.extend(child)
+                else:
+                    stack.append(child)
+        ids.sort()
+        if limit is not None:
+            ids = ids[:limit]
+        return [self.foods[idx] for idx in ids]
+
+    def search(self, query: str = "", levels=None, subcategories=None, flags=None,
+               sort: str = None, direction: str = "asc") -> list:
+        """Search foods like handleSearch() in index.html.
+
+        Filters are OR within a type and AND across types. With a query,
+        exact matches come first, then names in Slovak collation order.
+        Without a query (or with an explicit sort column), sort/direction
+        behave like sortFoods().
+        """
+        key = self.query_key(query, levels, subcategories, flags, sort, direction)
+        return [self.foods[idx] for idx in self._query(*key)]
+
+    def search_many(self, queries) -> list:
+        """Run many queries at once; each is a query string or a dict of search() kwargs.
+
+        Identical queries in the batch are resolved only once.
+        """
+        keys = []
+        for q in queries:
+            params = {"query": q} if isinstance(q, str) else q
+            keys.append(self.query_key(**params))
+
+        resolved = {key: self._query(*key) for key in dict.fromkeys(keys)}
+        return [[self.foods[idx] for idx in resolved[key]] for key in keys]
+
+    def cache_info(self):
+        """Return LRU statistics of the query cache."""
+        return self._query.cache_info()
+
+    def cache_clear(self) -> None:
+        """Drop all cached query results."""
+        self._query.cache_clear()
+
+    @staticmethod
+    def query_key(query: str = "", levels=None, subcategories=None, flags=None,
+                   sort: str = None, direction: str = "asc") -> tuple:
+        """Canonical, hashable form of a query (used as the cache key)."""
+        if sort not in SORT_COLUMNS:
+            sort = None
+        return (
+            normalize((query or "").strip()),
+            frozenset(levels or ()),
+            frozenset(subcategories or ()),
+            frozenset(flags or ()),
+            sort,
+            "desc" if direction == "desc" else "asc",
+        )
+
+    def _run_query(self, query: str, levels: frozenset, subcategories: frozenset,
+                   flags: frozenset, sort: str, direction: str) -> tuple:
+        """Resolve a canonical query to a tuple of food indexes."""
+        candidates = None
+        for selected, index in ((levels, self.by_level),
+                                (subcategories, self.by_subcategory),
+                                (flags, self.by_flag)):
+            if not selected:
+                continue
+            matched = set().union(*(index.get(value, ()) for value in selected))
+            candidates = matched if candidates is None else candidates & matched
+
+        if candidates is None:
+            ids = range(len(self.foods))
+        else:
+            ids = sorted(candidates)
+
+        if query:
+            normalized = self.normalized
+            ids = [idx for idx in ids if query in normalized[idx]]
+            ids.sort(key=lambda idx: (normalized[idx] != query, self._sort_key(idx)))
+        else:
+            ids = list(ids)
+
+        if sort:
+            ids = self._apply_sort(ids, sort, direction)
+
+        return tuple(ids)
+
+    def _apply_sort(self, ids: list, column: str, direction: str) -> list:
+        """Stable column sort like sortFoods() in index.html."""
+        if column == "name":
+            key = self._sort_key
+        else:
+            key = lambda idx: HISTAMINE_SORT_ORDER.get(self.foods[idx]["histamineLevel"], 99)
+
+        if direction == "asc":
+            return sorted(ids, key=key)
+
+        # Reverse the comparator, not the result, so ties keep their order
+        # (Array.prototype.sort is stable).
+        groups = {}
+        for idx in ids:
+            groups.setdefault(key(idx), []).append(idx)
+        return [idx for k in sorted(groups, reverse=True) for idx in groups[k]]
+
+    def _sort_key(self, idx: int) -> tuple:
+        """Cached Slovak collation key of a food name."""
+        if self._sort_keys is None:
+            self._sort_keys = [collation_key(food["name"]) for food in self.foods]
+        return self._sort_keys[idx]
+
+
+@lru_cache(maxsize=None)
+def load_index(lang: str, data_dir: Path = DATA_DIR) -> FoodIndex:
+    """Load and index data/<lang>.json once per process."""
+    return FoodIndex.from_file(Path(data_dir) / f"{lang}.json", lang=lang)
+
+
+def main():
+    """Main function."""
+    if len(sys.argv) < 3:
+        print("Usage: python scripts/food_query.py <lang> <query> [query ...]")
+        sys.exit(1)
+
+    index = load_index(sys.argv[1])
+    for query, results in zip(sys.argv[2:], index.search_many(sys.argv[2:])):
+        print(f"{query}: {len(results)} results")
+        for food in results[:10]:
+            print(f"  [{food['histamineLevel'][:4]}] {food['name']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Columnar statistics over food data for the scripts' reports.
+
+FoodTable keeps one row per food. Histamine level, category, subcategory
+and language are stored as small integer codes in NumPy arrays, and flags
+as a bitmask (bit i = i-th flag in canonical order). Distributions and
+cross-tabs use np.bincount and matrix products instead of per-report dict
+passes, so the reports stay fast on merged datasets with 100k+ items.
+
+Codes index a per-column vocabulary: the known enum members first (in enum
+order), then any other value seen in the data. Invalid values are still
+counted, and invalid() finds the rows that carry them.
+
+Usage:
+    python scripts/food_stats.py [data.json ...] [--crosstab ROWS COLS] [--base LANG]
+
+Columns: level, category, subcategory, lang, flags
+"""
+
+import argparse
+import json
+import sys
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from food_model import Category, Flag, HistamineLevel
+
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Coded columns and the food key they come from ("lang" is given per dataset)
+FIELDS = {
+    "level": "histamineLevel",
+    "category": "category",
+    "subcategory": "subcategory",
+    "lang": None,
+}
+
+KNOWN_LABELS = {
+    "level": [level.name for level in HistamineLevel],
+    "category": [category.name for category in Category],
+    "flags": [flag.name for flag in Flag],
+}
+
+COLUMNS = (*FIELDS, "flags")
+
+# Label for a missing (or non-string) value
+MISSING = "UNKNOWN"
+
+MAX_FLAGS = 64
+
+
+class Vocabulary:
+    """Labels of one column; known labels come first."""
+
+    def __init__(self, known=()):
+        self.labels = list(known)
+        self.known = len(self.labels)
+        self.codes = {label: code for code, label in enumerate(self.labels)}
+
+    def code(self, label) -> int:
+        """Code of a label, adding it if it is new."""
+        if not isinstance(label, str):
+            label = MISSING
+        code = self.codes.get(label)
+        if code is None:
+            code = self.codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+    def __len__(self):
+        return len(self.labels)
+
+
+@dataclass
+class CrossTab:
+    """Counts for every (row label, column label) pair."""
+    rows: list
+    columns: list
+    counts: np.ndarray
+
+    def lines(self) -> list:
+        """Format as an aligned text table."""
+        label_width = max((len(label) for label in self.rows), default=0)
+        widths = [max(len(label), len(str(self.counts[:, j].max(initial=0))))
+                  for j, label in enumerate(self.columns)]
+        header = " " * label_width + "".join(f"  {label:>{w}}" for label, w in zip(self.columns, widths))
+        lines = [header]
+        for i, label in enumerate(self.rows):
+            cells = "".join(f"  {count:>{w}}" for count, w in zip(self.counts[i], widths))
+            lines.append(f"{label:<{label_width}}{cells}")
+        return lines
+
+
+class FoodTableBuilder:
+    """Encode foods one at a time (also while they stream to a file)."""
+
+    def __init__(self):
+        self.vocab = {column: Vocabulary(KNOWN_LABELS.get(column, ())) for column in COLUMNS}
+        self.codes = {column: array('H') for column in FIELDS}
+        self.flags = array('Q')
+
+    def add(self, food: dict, lang: str = "") -> None:
+        """Append one food dict (data/<lang>.json or chunk format)."""
+        for column, key in FIELDS.items():
+            self.codes[column].append(self.vocab[column].code(food.get(key) if key else lang))
+        mask = 0
+        flags = self.vocab["flags"]
+        for name in food.get("flags") or ():
+            mask |= 1 << flags.code(name)
+        if len(flags) > MAX_FLAGS:
+            raise ValueError(f"more than {MAX_FLAGS} distinct flags")
+        self.flags.append(mask)
+
+    def collect(self, foods, lang: str = ""):
+        """Yield foods unchanged, adding each one on the way."""
+        for food in foods:
+            self.add(food, lang)
+            yield food
+
+    def build(self) -> "FoodTable":
+        """Freeze the encoded columns into a table."""
+        codes = {column: np.frombuffer(values, dtype=np.uint16) if values else np.zeros(0, np.uint16)
+                 for column, values in self.codes.items()}
+        flags = np.frombuffer(self.flags, dtype=np.uint64) if self.flags else np.zeros(0, np.uint64)
+        return FoodTable(codes, flags, self.vocab)
+
+
+class FoodTable:
+    """Coded columns of a food list, possibly spanning several languages."""
+
+    def __init__(self, codes: dict, flags: np.ndarray, vocab: dict):
+        self.codes = codes
+        self.flags = flags
+        self.vocab = vocab
+
+    @classmethod
+    def from_foods(cls, foods, lang: str = "") -> "FoodTable":
+        """Table of one food list."""
+        return cls.from_datasets({lang: foods})
+
+    @classmethod
+    def from_datasets(cls, datasets: dict) -> "FoodTable":
+        """Table of {lang: foods}, one row per food of every language."""
+        builder = FoodTableBuilder()
+        for lang, foods in datasets.items():
+            for food in foods:
+                builder.add(food, lang)
+        return builder.build()
+
+    def __len__(self):
+        return len(self.flags)
+
+    def labels(self, column: str) -> list:
+        """Labels of a column, indexed by code (bit index for flags)."""
+        return self.vocab[column].labels
+
+    def indicator(self, column: str) -> np.ndarray:
+        """Rows x labels 0/1 matrix (several 1s per row for flags)."""
+        k = len(self.vocab[column])
+        if column == "flags":
+            bits = np.arange(k, dtype=np.uint64)
+            return ((self.flags[:, None] >> bits) & np.uint64(1)).astype(np.int64)
+        matrix = np.zeros((len(self), k), dtype=np.int64)
+        matrix[np.arange(len(self)), self.codes[column]] = 1
+        return matrix
+
+    def totals(self, column: str) -> np.ndarray:
+        """Count per code (per bit for flags)."""
+        if column == "flags":
+            return self.indicator(column).sum(axis=0)
+        return np.bincount(self.codes[column], minlength=len(self.vocab[column]))
+
+    def counts(self, column: str) -> dict:
+        """{label: count} for labels that occur, in vocabulary order."""
+        totals = self.totals(column)
+        return {label: int(count) for label, count in zip(self.labels(column), totals) if count}
+
+    def crosstab(self, rows: str, columns: str, trim: bool = True) -> CrossTab:
+        """Co-occurrence counts of two columns; flags x flags gives flag
+        co-occurrence (the diagonal is the flag count)."""
+        kr, kc = len(self.vocab[rows]), len(self.vocab[columns])
+        if "flags" in (rows, columns):
+            counts = self.indicator(rows).T @ self.indicator(columns)
+        else:
+            pairs = self.codes[rows].astype(np.int64) * kc + self.codes[columns]
+            counts = np.bincount(pairs, minlength=kr * kc).reshape(kr, kc)
+        row_labels, column_labels = self.labels(rows), self.labels(columns)
+        if trim:
+            keep_rows = np.flatnonzero(counts.any(axis=1))
+            keep_columns = np.flatnonzero(counts.any(axis=0))
+            counts = counts[np.ix_(keep_rows, keep_columns)]
+            row_labels = [row_labels[i] for i in keep_rows]
+            column_labels = [column_labels[j] for j in keep_columns]
+        return CrossTab(list(row_labels), list(column_labels), counts)
+
+    def deltas(self, column: str, base: str) -> dict:
+        """{lang: {label: count - base count}} for every other language,
+        only labels whose count differs."""
+        table = self.crosstab("lang", column, trim=False)
+        if base not in table.rows:
+            raise KeyError(f"language {base!r} not in table")
+        base_counts = table.counts[table.rows.index(base)]
+        return {
+            lang: {label: int(delta) for label, delta in zip(table.columns, row - base_counts) if delta}
+            for lang, row in zip(table.rows, table.counts) if lang != base
+        }
+
+    def invalid(self, column: str) -> np.ndarray:
+        """Row indices whose value is not a known label (any unknown flag
+        for flags), in row order."""
+        known = self.vocab[column].known
+        if column == "flags":
+            return np.flatnonzero(self.flags >> np.uint64(known))
+        return np.flatnonzero(self.codes[column] >= known)
+
+
+def duplicate_values(values: list) -> list:
+    """Values occurring more than once, in order of first occurrence."""
+    if not values:
+        return []
+    unique, first, counts = np.unique(np.asarray(values), return_index=True, return_counts=True)
+    repeated = np.flatnonzero(counts > 1)
+    return [str(unique[i]) for i in repeated[np.argsort(first[repeated])]]
+
+
+def format_counts(counts: dict, total: int = None, by_count: bool = False) -> list:
+    """Report lines "  label: count" (with a share of total if given),
+    sorted by label or by descending count."""
+    items = sorted(counts.items(), key=(lambda x: -x[1]) if by_count else (lambda x: x[0]))
+    if total:
+        return [f"  {label}: {count} ({count / total * 100:.1f}%)" for label, count in items]
+    return [f"  {label}: {count}" for label, count in items]
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Distributions and cross-tabs of food data files.")
+    parser.add_argument("inputs", nargs="*", type=Path, help="data/<lang>.json files (default: data/*.json)")
+    parser.add_argument("--crosstab", nargs=2, metavar=("ROWS", "COLS"), action="append", choices=COLUMNS,
+                        help="Also print a cross-tab of two columns (repeatable)")
+    parser.add_argument("--base", help="Language the per-language deltas are relative to (default: first input)")
+    args = parser.parse_args()
+
+    inputs = args.inputs or sorted(DATA_DIR.glob("*.json"))
+    datasets = {}
+    for path in inputs:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: {path}: {e}", file=sys.stderr)
+            sys.exit(1)
+        lang = data.get("metadata", {}).get("language") or path.stem
+        datasets[lang] = data.get("foods", [])
+
+    table = FoodTable.from_datasets(datasets)
+    print(f"{len(table)} foods ({', '.join(f'{lang}: {len(foods)}' for lang, foods in datasets.items())})")
+
+    for column in ("level", "category", "flags"):
+        print(f"\n{column.capitalize()} distribution:")
+        print("\n".join(format_counts(table.counts(column), len(table), by_count=True)))
+
+    for title, rows, columns in (("Level x category", "level", "category"),
+                                 ("Flag co-occurrence", "flags", "flags"),
+                                 *((f"{r.capitalize()} x {c}", r, c) for r, c in args.crosstab or ())):
+        print(f"\n{title}:")
+        print("\n".join(table.crosstab(rows, columns).lines()))
+
+    if len(datasets) > 1:
+        base = args.base or next(iter(datasets))
+        if base not in datasets:
+            print(f"Error: no input for base language {base!r}", file=sys.stderr)
+            sys.exit(1)
+        for column in ("level", "category", "subcategory"):
+            print(f"\n{column.capitalize()} deltas vs {base}:")
+            for lang, deltas in table.deltas(column, base).items():
+                changes = ", ".join(f"{label} {delta:+d}" for label, delta in deltas.items())
+                print(f"  {lang}: {changes or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
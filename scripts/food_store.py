@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Packed binary food store with a memory-mapped reader.
+
+Layout (little-endian):
+
+    header   MAGIC, version, record count, section offsets/sizes
+    tables   UTF-8 JSON: enum code tables, enum labels, metadata
+    records  fixed-width RECORD entries, one per food
+    heap     shared UTF-8 string heap (name, normalized name, notes)
+
+Each record stores enum codes for histamineLevel/category/subcategory, a
+flag bitmask and (offset, length) pairs into the heap. FoodStore mmaps the
+file, so worker processes share one page-cached copy and opening a store
+only parses the small tables section. Records are decoded lazily.
+
+Usage:
+    python scripts/food_store.py <data.json> [output.bin]
+
+    from food_store import FoodStore
+    store = FoodStore("data/sk.bin")
+    store[0].name, store[0].flags
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from pathlib import Path
+
+from food_model import Category, Flag, HistamineLevel
+from food_query import normalize
+
+
+MAGIC = b"HSTL"
+VERSION = 1
+
+# magic, version, record count, tables offset/size, records offset, heap offset/size
+HEADER = struct.Struct("<4sHxxIIIIII")
+
+# id, name/normalized/notes offsets, name/normalized/notes lengths,
+# flag bitmask, level, category, subcategory
+RECORD = struct.Struct("<IIIIHHHHBBH")
+
+NO_SUBCATEGORY = 0xFFFF
+
+# Stored for a food without a histamineLevel or category
+MISSING = "UNKNOWN"
+
+# Default code order; values not listed here get appended in order of appearance
+LEVELS = [level.name for level in HistamineLevel]
+CATEGORIES = [category.name for category in Category]
+FLAGS = [flag.name for flag in Flag]
+
+
+def _code_table(defaults: list, values) -> list:
+    """Return defaults extended by unseen values, in order of appearance."""
+    table = list(defaults)
+    for value in values:
+        if value is not None and value not in table:
+            table.append(value)
+    return table
+
+
+def write_store(data: dict, output_path: Path) -> None:
+    """Write the foods of a data JSON structure as a binary store.
+
+    The file is written to a temporary path and renamed into place, so
+    readers holding a mapping of the old file are not affected. A food
+    without a histamineLevel or category gets MISSING for it.
+    """
+    foods = data["foods"]
+    levels = _code_table(LEVELS, (f.get("histamineLevel") or MISSING for f in foods))
+    categories = _code_table(CATEGORIES, (f.get("category") or MISSING for f in foods))
+    subcategories = _code_table([], (f.get("subcategory") for f in foods))
+    flags = _code_table(FLAGS, (flag for f in foods for flag in f.get("flags") or []))
+    if len(flags) > 16:
+        raise ValueError(f"Too many distinct flags for the bitmask: {len(flags)}")
+
+    level_codes = {v: i for i, v in enumerate(levels)}
+    category_codes = {v: i for i, v in enumerate(categories)}
+    subcategory_codes = {v: i for i, v in enumerate(subcategories)}
+    flag_bits = {v: 1 << i for i, v in enumerate(flags)}
+
+    heap = bytearray()
+    strings = {}
+
+    def intern(text: str) -> tuple:
+        """Add text to the heap once; return (offset, length)."""
+        if text not in strings:
+            encoded = text.encode('utf-8')
+            if len(encoded) > 0xFFFF:
+                raise ValueError(f"String too long for store: {text[:40]}...")
+            strings[text] = (len(heap), len(encoded))
+            heap.extend(encoded)
+        return strings[text]
+
+    records = bytearray()
+    for food in foods:
+        name_off, name_len = intern(food["name"])
+        norm_off, norm_len = intern(normalize(food["name"]))
+        notes_off, notes_len = intern(food.get("notes") or "")
+        bitmask = 0
+        for flag in food.get("flags") or []:
+            bitmask |= flag_bits[flag]
+        subcategory = food.get("subcategory")
+        records += RECORD.pack(
+            food.get("id") or 0,
+            name_off, norm_off, notes_off,
+            name_len, norm_len, notes_len,
+            bitmask,
+            level_codes[food.get("histamineLevel") or MISSING],
+            category_codes[food.get("category") or MISSING],
+            NO_SUBCATEGORY if subcategory is None else subcategory_codes[subcategory],
+        )
+
+    tables = json.dumps({
+        "histamineLevel": levels,
+        "category": categories,
+        "subcategory": subcategories,
+        "flags": flags,
+        "enums": data.get("enums", {}),
+        "metadata": data.get("metadata", {}),
+    }, ensure_ascii=False).encode('utf-8')
+
+    tables_offset = HEADER.size
+    records_offset = tables_offset + len(tables)
+    heap_offset = records_offset + len(records)
+    header = HEADER.pack(MAGIC, VERSION, len(foods), tables_offset, len(tables),
+                         records_offset, heap_offset, len(heap))
+
+    output_path = Path(output_path)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(tables)
+        f.write(records)
+        f.write(heap)
+    os.replace(tmp_path, output_path)
+
+
+class FoodRecord:
+    """Lazy view of one record; fields are decoded on access."""
+
+    __slots__ = ("_store", "_fields")
+
+    def __init__(self, store: "FoodStore", fields: tuple):
+        self._store = store
+        self._fields = fields
+
+    @property
+    def id(self) -> int:
+        return self._fields[0]
+
+    @property
+    def name(self) -> str:
+        return self._store._string(self._fields[1], self._fields[4])
+
+    @property
+    def normalized_name(self) -> str:
+        return self._store._string(self._fields[2], self._fields[5])
+
+    @property
+    def notes(self) -> str:
+        return self._store._string(self._fields[3], self._fields[6])
+
+    @property
+    def flag_mask(self) -> int:
+        return self._fields[7]
+
+    @property
+    def flags(self) -> list:
+        mask = self._fields[7]
+        return [flag for bit, flag in enumerate(self._store.flag_names) if mask & (1 << bit)]
+
+    @property
+    def histamine_level(self) -> str:
+        return self._store.level_names[self._fields[8]]
+
+    @property
+    def category(self) -> str:
+        return self._store.category_names[self._fields[9]]
+
+    @property
+    def subcategory(self):
+        code = self._fields[10]
+        return None if code == NO_SUBCATEGORY else self._store.subcategory_names[code]
+
+    def to_dict(self) -> dict:
+        """Return the record in data/<lang>.json form."""
+        return {
+            "name": self.name,
+            "histamineLevel": self.histamine_level,
+            "flags": self.flags,
+            "notes": self.notes,
+            "category": self.category,
+            "subcategory": self.subcategory,
+            "id": self.id,
+        }
+
+    def __repr__(self):
+        return f"FoodRecord(id={self.id}, name={self.name!r})"
+
+
+class FoodStore:
+    """Read-only, memory-mapped binary food store."""
+
+    def __init__(self, path: Path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, self._count, tables_offset, tables_size,
+         self._records_offset, self._heap_offset, _) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a food store: {path}")
+        if version != VERSION:
+            raise ValueError(f"Unsupported food store version {version}: {path}")
+
+        tables = json.loads(self._mmap[tables_offset:tables_offset + tables_size].decode('utf-8'))
+        self.level_names = tables["histamineLevel"]
+        self.category_names = tables["category"]
+        self.subcategory_names = tables["subcategory"]
+        self.flag_names = tables["flags"]
+        self.enums = tables["enums"]
+        self.metadata = tables["metadata"]
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index: int) -> FoodRecord:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        offset = self._records_offset + index * RECORD.size
+        return FoodRecord(self, RECORD.unpack_from(self._mmap, offset))
+
+    def __iter__(self):
+        # Unpack in place like __getitem__ (a slice would copy every record,
+        # a held memoryview would make close() fail after an early break)
+        end = self._records_offset + self._count * RECORD.size
+        for offset in range(self._records_offset, end, RECORD.size):
+            yield FoodRecord(self, RECORD.unpack_from(self._mmap, offset))
+
+    def flag_mask(self, flags) -> int:
+        """Return the bitmask for a collection of flag names."""
+        return sum(1 << self.flag_names.index(flag) for flag in flags if flag in self.flag_names)
+
+    def to_dicts(self) -> list:
+        """Decode every record (same as data/<lang>.json "foods")."""
+        return [record.to_dict() for record in self]
+
+    def close(self) -> None:
+        """Release the mapping."""
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _string(self, offset: int, length: int) -> str:
+        """Decode a heap string."""
+        start = self._heap_offset + offset
+        return self._mmap[start:start + length].decode('utf-8')
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Pack a data JSON file into a binary food store.")
+    parser.add_argument("input", type=Path, help="data/<lang>.json or merge_chunks output")
+    parser.add_argument("output", nargs="?", type=Path, help="Store path (default: input with .bin suffix)")
+    args = parser.parse_args()
+    output_path = args.output or args.input.with_suffix(".bin")
+
+    try:
+        with open(args.input, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        write_store(data, output_path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    with FoodStore(output_path) as store:
+        print(f"Wrote {len(store)} records to {output_path} ({output_path.stat().st_size:,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
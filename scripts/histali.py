@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the data scripts.
+
+Each subcommand runs the main() of one script with the remaining arguments,
+so `histali extract --jobs 4 file.html` behaves like
+`python scripts/html_to_json.py --jobs 4 file.html`. Only the chosen
+script is imported: heavy dependencies (BeautifulSoup, the FOOD_DATA table,
+multiprocessing) are loaded when a subcommand needs them, not at startup.
+
+Usage:
+    python scripts/histali.py <command> [args ...]
+    python scripts/histali.py --timings <command> [args ...]
+    python scripts/histali.py --help
+"""
+
+import sys
+import time
+from pathlib import Path
+
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+EXTRACTION_SCRIPTS_DIR = SCRIPTS_DIR.parent / "extraction" / "scripts"
+
+# command -> (module, description); modules are looked up in scripts/ and
+# extraction/scripts/
+COMMANDS = {
+    "clean": ("clean_html", "Remove base64 images and fonts from an HTML export"),
+    "extract": ("html_to_json", "Extract food data from pdftohtml/pdf24 HTML into JSON"),
+    "generate": ("parse_food_data", "Generate Slovak JSON from the built-in FOOD_DATA table"),
+    "images": ("prepare_images", "Crop, split and compress page images for extraction"),
+    "text-layer": ("text_layer", "Extract chunks from the PDF text layer"),
+    "chunks": ("extract_chunks", "Extract pending chunks concurrently"),
+    "progress": ("progress_store", "Show or compact journaled extraction progress"),
+    "merge": ("merge_chunks", "Merge chunk files into the final output JSON"),
+    "validate": ("validate_extraction", "Validate extracted food data"),
+    "stats": ("food_stats", "Distributions, cross-tabs and per-language deltas"),
+    "reconcile": ("reconcile", "Report disagreements between the food list producers"),
+    "ids": ("food_ids", "Seed, assign or rename stable food IDs"),
+    "store": ("food_store", "Pack a data JSON file into a binary food store"),
+    "export": ("export_sqlite", "Export food data into a SQLite database with FTS5"),
+    "query": ("food_query", "Search a language file from the command line"),
+    "scan": ("scan_recipes", "Scan recipes for foods from the food list"),
+    "serve": ("serve_api", "Serve food data as a JSON API"),
+    "packs": ("build_lang_packs", "Build language packs and inline the default one"),
+    "manifest": ("build_manifest", "Write per-asset revisions for the service worker"),
+    "traces": ("analyze_traces", "Percentile tables for exported performance traces"),
+}
+
+
+def print_usage(file=sys.stdout) -> None:
+    """List the commands (without importing any of them)."""
+    width = max(len(name) for name in COMMANDS)
+    print("usage: histali [--timings] <command> [args ...]\n\ncommands:", file=file)
+    for name, (_, description) in COMMANDS.items():
+        print(f"  {name:<{width}}  {description}", file=file)
+    print("\nRun 'histali <command> --help' for the options of a command.", file=file)
+
+
+def exit_status(result) -> int:
+    """Exit status for the return value of a script's main(), the same as
+    its own __main__ block: False means failure (extract_chunks), an int is
+    an exit status (progress_store), anything else is success."""
+    if result is False:
+        return 1
+    if result is None or result is True or not isinstance(result, int):
+        return 0
+    return result
+
+
+def main():
+    """Main function."""
+    started = time.perf_counter()
+    args = sys.argv[1:]
+    timings = bool(args) and args[0] == "--timings"
+    if timings:
+        args = args[1:]
+
+    if not args or args[0] in ("-h", "--help"):
+        print_usage()
+        return
+    command, rest = args[0], args[1:]
+    if command not in COMMANDS:
+        print(f"histali: unknown command '{command}'\n", file=sys.stderr)
+        print_usage(sys.stderr)
+        sys.exit(2)
+
+    module_name = COMMANDS[command][0]
+    sys.path[:0] = [str(SCRIPTS_DIR), str(EXTRACTION_SCRIPTS_DIR)]
+    sys.argv = [f"histali {command}", *rest]
+
+    import importlib
+    module = importlib.import_module(module_name)
+    imported = time.perf_counter()
+    try:
+        result = module.main()
+    finally:
+        if timings:
+            finished = time.perf_counter()
+            print(f"[histali] import {module_name}: {(imported - started) * 1000:.1f} ms, "
+                  f"run: {(finished - imported) * 1000:.1f} ms", file=sys.stderr)
+    sys.exit(exit_status(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,45 +2,42 @@
 """
 Step 2: HTML → JSON
 Extracts food data from HTML (converted from PDF via pdftohtml) into JSON format.
-Supports both pdftohtml format and pdf24 online converter format.
+Supports both pdftohtml format and pdf24 online converter format, and
+pdftohtml -xml output (.xml files), which is parsed by coordinates.
+Raw pdf24 exports are streamed directly, without running clean_html.py.
+
+Multi-page pdftohtml HTML is parsed page-parallel: a regex pre-scan finds
+the section each page starts in, pages are parsed in a process pool and
+the results are stitched back into serial order.
 
 Usage:
-    python scripts/html_to_json.py [html_file]
+    python scripts/html_to_json.py [html_file | xml_file] [--jobs N]
 
 If no html_file is provided, uses the latest file in translations/ folder.
 """
 
+import argparse
+import html
 import json
+import os
 import re
 import sys
 import unicodedata
-from dataclasses import dataclass, field
+import xml.etree.ElementTree as ET
+from collections import Counter
+from dataclasses import dataclass, replace
+from html.parser import HTMLParser
 from pathlib import Path
-from bs4 import BeautifulSoup
-
 
-# Mapping abbreviations to enum names
-FLAG_MAP = {
-    "H": "HIGH_HISTAMINE",
-    "H!": "FAST_SPOILAGE",
-    "A": "OTHER_BIOGENIC_AMINES",
-    "L": "HISTAMINE_LIBERATOR",
-    "B": "DAO_BLOCKER",
-}
+from food_ids import IdRegistry, identity, registry_path
+from food_model import FLAG_ABBREVIATIONS, Category, Flag, FoodItem, HistamineLevel
+from food_store import write_store
 
-HISTAMINE_MAP = {
-    "0": "WELL_TOLERATED",
-    "1": "MODERATELY_TOLERATED",
-    "2": "POORLY_TOLERATED",
-    "3": "VERY_POORLY_TOLERATED",
-    "?": "INSUFFICIENT_INFO",
-    "-": "VARIABLE",
-}
 
 # Category mapping
 CATEGORY_MAP = {
-    "Živočíšne potraviny": "ANIMAL_PRODUCTS",
-    "Rastlinné potraviny": "PLANT_PRODUCTS",
+    "Živočíšne potraviny": Category.ANIMAL_PRODUCTS,
+    "Rastlinné potraviny": Category.PLANT_PRODUCTS,
 }
 
 # Subcategory mapping
@@ -66,16 +63,45 @@ SUBCATEGORY_MAP = {
     "sladidlá": "SWEETENERS",
 }
 
+# Table column headers (bold in the PDF)
+COLUMN_HEADERS = ["Poznámky SK", "Označenie SK", "Oznacenie SK"]
 
-@dataclass
-class FoodItem:
-    """Food item with properties."""
-    name: str
-    histamine_level: str = "INSUFFICIENT_INFO"
-    flags: list = field(default_factory=list)
-    notes: str = ""
-    category: str = "OTHER"
-    subcategory: str = "OTHER"
+# Page header/footer text
+SKIP_MARKERS = ["Zoznam kompatibilných", "SIGHI", "www.", "http", "©", "Stav:"] + COLUMN_HEADERS
+
+HISTAMINE_PATTERN = re.compile(r'^([0-3\?\-])\s*(.*)$')
+
+# Slack (pdftohtml -xml pixels) when assigning a fragment to a column
+COLUMN_TOLERANCE = 4
+
+# pdftohtml -noframes page anchors; documents with fewer pages are parsed serially
+PAGE_ANCHOR = re.compile(r'<a name="?\d+"?\s*></a>')
+PARALLEL_MIN_PAGES = 8
+
+# Cheap tokenizer for the section pre-scan: bold text, other tags, plain text
+LINE_TOKEN = re.compile(r'<b>(.*?)</b>|<[^>]*>|([^<]+)', re.S)
+
+# pdf24 exports: read size, row grouping slack (CSS px) and tokenizer patterns
+STREAM_CHUNK_SIZE = 1 << 16
+ROW_TOLERANCE = 2.0
+# data: only as an attribute value or inside url(), @font-face only inside
+# <style>, so visible text such as "(data: ...)" is left alone
+EMBED_START = re.compile(r'''((?:=|url\()\s*["']?)data:|(<style\b[^>]*>)|(</style\s*>)|@font-face''', re.I)
+EMBED_END = re.compile(r'''["')>\s]''')
+EMBED_LOOKBEHIND = 64
+CSS_RULE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+CSS_DECLARATION = re.compile(r'([\w-]+)\s*:\s*([^;]+)')
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "wbr"}
+
+
+@dataclass(slots=True)
+class TextFragment:
+    """<text> element from pdftohtml -xml output."""
+    top: int
+    left: int
+    height: int
+    bold: bool
+    text: str
 
 
 def normalize_subcategory(text: str) -> str:
@@ -96,36 +122,63 @@ def normalize_subcategory(text: str) -> str:
 def is_only_flags(text: str) -> bool:
     """Check if text contains only flag abbreviations."""
     parts = text.split()
-    return all(p in FLAG_MAP or p == '?' for p in parts) and len(parts) > 0
+    return all(p in FLAG_ABBREVIATIONS or p == '?' for p in parts) and len(parts) > 0
 
 
-def parse_flags_from_text(text: str) -> list:
+def parse_flags_from_text(text: str) -> Flag:
     """Parse flags from a text string like 'H A L'."""
-    return [FLAG_MAP[p] for p in text.split() if p in FLAG_MAP]
+    return Flag.from_abbreviations(text)
 
 
-def add_flags(existing: list, new_flags: list) -> None:
-    """Add flags to existing list, avoiding duplicates."""
-    for flag in new_flags:
-        if flag not in existing:
-            existing.append(flag)
+@dataclass(slots=True)
+class SectionState:
+    """Category/subcategory in effect at a point of the line stream."""
+    category: Category = Category.ANIMAL_PRODUCTS
+    subcategory: str = "OTHER"
+    data_started: bool = False
 
+    def advance(self, line_type: str, text: str) -> bool:
+        """Apply a line outside a food entry; return True if it was consumed.
 
-def extract_pdftohtml_format(html_content: str) -> list:
-    """Extract foods from pdftohtml format (line-based with <br/> tags)."""
-    foods = []
-    current_category = "ANIMAL_PRODUCTS"
-    current_subcategory = "OTHER"
-    data_started = False
+        Headings are never part of a food entry, so applying this to every
+        line of a document gives the state at any point of it.
+        """
+        # Skip until we find "Živočíšne potraviny"
+        if not self.data_started:
+            if "Živočíšne potraviny" in text:
+                self.data_started = True
+                self.category = Category.ANIMAL_PRODUCTS
+            return True
 
-    # Parse HTML
-    soup = BeautifulSoup(html_content, 'html.parser')
+        # Skip headers and footers
+        if any(skip in text for skip in SKIP_MARKERS):
+            return True
 
-    # Get all text content, preserving structure
-    # pdftohtml uses <b> tags for headers and histamine levels
+        if line_type != 'bold':
+            return False
 
+        # Check for category change
+        if "Rastlinné potraviny" in text:
+            self.category = Category.PLANT_PRODUCTS
+            return True
+        elif "Živočíšne potraviny" in text:
+            self.category = Category.ANIMAL_PRODUCTS
+            return True
+
+        # Check for subcategory (bold text that's a known subcategory)
+        text_lower = text.lower()
+        for subcat_key in SUBCATEGORY_MAP.keys():
+            if subcat_key in text_lower:
+                self.subcategory = SUBCATEGORY_MAP[subcat_key]
+                return True
+        return False
+
+
+def html_lines(parent) -> list:
+    """Flatten pdftohtml HTML into ('bold' | 'text', text) lines."""
+    # pdftohtml uses <b> tags for headers and histamine levels
     lines = []
-    for element in soup.body.children if soup.body else []:
+    for element in parent.children:
         if element.name == 'b':
             lines.append(('bold', element.get_text().replace('\xa0', ' ').strip()))
         elif element.name == 'br':
@@ -140,55 +193,47 @@ def extract_pdftohtml_format(html_content: str) -> list:
             text = element.string.replace('\xa0', ' ').strip()
             if text:
                 lines.append(('text', text))
+    return lines
+
+
+def extract_pdftohtml_format(html_content: str) -> list:
+    """Extract foods from pdftohtml format (line-based with <br/> tags)."""
+    from bs4 import BeautifulSoup  # Only the pdftohtml paths need it; keeps startup fast
 
-    i = 0
+    soup = BeautifulSoup(html_content, 'html.parser')
+    return parse_lines(html_lines(soup.body) if soup.body else [])
+
+
+def parse_lines(lines: list, state: SectionState = None, start: int = 0,
+                until=None, sync: list = None) -> list:
+    """Extract foods from a flat stream of ('bold' | 'text', text) lines.
+
+    Parsing starts at line index start in the given state (updated in
+    place) and stops before the first line outside a food entry for which
+    until(index) is true. If sync is a list, (index, foods so far) is
+    appended for every such line, including the one parsing stopped at.
+    """
+    foods = []
+    state = state or SectionState()
+
+    i = start
     while i < len(lines):
+        if sync is not None:
+            sync.append((i, len(foods)))
+        if until is not None and until(i):
+            break
         line_type, text = lines[i]
 
-        # Skip until we find "Živočíšne potraviny"
-        if not data_started:
-            if "Živočíšne potraviny" in text:
-                data_started = True
-                current_category = "ANIMAL_PRODUCTS"
-            i += 1
-            continue
-
-        # Skip headers and footers
-        if any(skip in text for skip in ["Zoznam kompatibilných", "SIGHI", "www.",
-                                          "http", "©", "Stav:", "Poznámky SK",
-                                          "Označenie SK", "Oznacenie SK"]):
+        if state.advance(line_type, text):
             i += 1
             continue
 
-        # Check for category change
         if line_type == 'bold':
-            if "Rastlinné potraviny" in text:
-                current_category = "PLANT_PRODUCTS"
-                i += 1
-                continue
-            elif "Živočíšne potraviny" in text:
-                current_category = "ANIMAL_PRODUCTS"
-                i += 1
-                continue
-
-            # Check for subcategory (bold text that's a known subcategory)
-            text_lower = text.lower()
-            is_subcategory = False
-            for subcat_key in SUBCATEGORY_MAP.keys():
-                if subcat_key in text_lower:
-                    current_subcategory = SUBCATEGORY_MAP[subcat_key]
-                    is_subcategory = True
-                    break
-
-            if is_subcategory:
-                i += 1
-                continue
-
             # Check if it's a histamine level (possibly with flags)
             # Pattern: "0", "1", "2", "3", "?", "-" possibly followed by flags
-            histamine_match = re.match(r'^([0-3\?\-])\s*(.*)$', text)
+            histamine_match = HISTAMINE_PATTERN.match(text)
             if histamine_match:
-                histamine_level = HISTAMINE_MAP.get(histamine_match.group(1), "INSUFFICIENT_INFO")
+                histamine_level = HistamineLevel.from_symbol(histamine_match.group(1))
                 flags_text = histamine_match.group(2).strip()
                 flags = parse_flags_from_text(flags_text)
 
@@ -201,13 +246,13 @@ def extract_pdftohtml_format(html_content: str) -> list:
 
                     # Check if it's only flags (like "H A" or "L" or "?")
                     if is_only_flags(next_text_clean):
-                        add_flags(flags, parse_flags_from_text(next_text_clean))
+                        flags |= parse_flags_from_text(next_text_clean)
                         i += 1
                         continue
 
                     # Check if it's a single flag
-                    if next_text_clean in FLAG_MAP:
-                        add_flags(flags, [FLAG_MAP[next_text_clean]])
+                    if next_text_clean in FLAG_ABBREVIATIONS:
+                        flags |= FLAG_ABBREVIATIONS[next_text_clean]
                         i += 1
                         continue
 
@@ -226,7 +271,7 @@ def extract_pdftohtml_format(html_content: str) -> list:
                         while i < len(lines) and lines[i][0] == 'text':
                             note_text = lines[i][1].strip()
                             # Stop if it looks like a new food item (single flag or histamine)
-                            if note_text in FLAG_MAP or re.match(r'^[0-3\?\-]$', note_text):
+                            if note_text in FLAG_ABBREVIATIONS or re.match(r'^[0-3\?\-]$', note_text):
                                 break
                             if is_only_flags(note_text):
                                 break
@@ -242,8 +287,8 @@ def extract_pdftohtml_format(html_content: str) -> list:
                                     histamine_level=histamine_level,
                                     flags=flags,
                                     notes=" ".join(notes_parts),
-                                    category=current_category,
-                                    subcategory=current_subcategory
+                                    category=state.category,
+                                    subcategory=state.subcategory
                                 )
                                 foods.append(food)
                         break
@@ -257,12 +302,509 @@ def extract_pdftohtml_format(html_content: str) -> list:
     return foods
 
 
-def extract_foods(html_path: Path) -> list:
-    """Extract foods from pdftohtml HTML file."""
+def split_html_pages(html_content: str) -> list:
+    """Split a pdftohtml -noframes document at its <a name=N> page anchors."""
+    starts = [m.start() for m in PAGE_ANCHOR.finditer(html_content)]
+    bounds = [0] + [s for s in starts if s > 0] + [len(html_content)]
+    return [html_content[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def prescan_sections(pages: list) -> list:
+    """Return the SectionState each page starts in, from a regex scan of the raw HTML."""
+    state = SectionState()
+    seeds = []
+    for page in pages:
+        seeds.append(replace(state))
+        for match in LINE_TOKEN.finditer(page):
+            if match.group(1) is not None:
+                line_type, raw = 'bold', re.sub(r'<[^>]*>', '', match.group(1))
+            elif match.group(2) is not None:
+                line_type, raw = 'text', match.group(2)
+            else:
+                continue
+            text = html.unescape(raw).replace('\xa0', ' ').strip()
+            if text:
+                state.advance(line_type, text)
+    return seeds
+
+
+def parse_page(page: tuple) -> tuple:
+    """Parse one (html, seed state) page; return its lines, foods and sync points."""
+    html_content, state = page
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html_content, 'html.parser')
+    lines = html_lines(soup.body or soup)
+    sync = []
+    foods = parse_lines(lines, replace(state), sync=sync)
+    return lines, foods, sync
+
+
+def stitch_pages(results: list, seeds: list) -> list:
+    """Join per-page parse results into the foods a serial parse would return.
+
+    A page whose seed doesn't match the state computed from the actual
+    lines is parsed again. Entries at the end of a page may continue on the
+    next one, so each page's last entry is re-parsed over the boundary
+    until the parse meets a line the next page's worker started an entry
+    on; from there both parses are identical.
+    """
+    lines = []
+    offsets = []
+    state = SectionState()
+    for n, (page_lines, _, _) in enumerate(results):
+        if state != seeds[n]:
+            # Pre-scan was wrong about this page: parse it again from the real state
+            sync = []
+            foods = parse_lines(page_lines, replace(state), sync=sync)
+            results[n] = (page_lines, foods, sync)
+            seeds[n] = replace(state)
+        offsets.append(len(lines))
+        lines.extend(page_lines)
+        for line in page_lines:
+            state.advance(*line)
+    offsets.append(len(lines))
+
+    syncs = [{offsets[n] + i: count for i, count in sync} for n, (_, _, sync) in enumerate(results)]
+    later = set()
+    resync_points = []
+    for sync in reversed(syncs):
+        resync_points.append(set(later))
+        later.update(sync)
+    resync_points.reverse()
+
+    foods = []
+    position = 0
+    for n, (page_lines, page_foods, _) in enumerate(results):
+        if position >= offsets[n + 1]:
+            continue  # Covered while crossing an earlier boundary
+        sync = syncs[n]
+        last = max(sync) if sync else offsets[n]
+        if sync:
+            foods.extend(page_foods[sync[position]:sync[last]])
+
+        # State at the last entry: the page's seed advanced over the lines before it
+        state = replace(seeds[n])
+        for line in page_lines[:last - offsets[n]]:
+            state.advance(*line)
+        crossing = []
+        foods.extend(parse_lines(lines, state, start=last, sync=crossing,
+                                 until=lambda i, points=resync_points[n]: i in points))
+        position = crossing[-1][0] if crossing else last
+        if position not in resync_points[n]:
+            position = len(lines)
+    return foods
+
+
+def extract_pdftohtml_parallel(html_content: str, jobs: int = None) -> list:
+    """Extract foods from pdftohtml format, parsing pages in a process pool.
+
+    Returns the same foods as extract_pdftohtml_format().
+    """
+    jobs = jobs or os.cpu_count() or 1
+    pages = split_html_pages(html_content)
+    if len(pages) < PARALLEL_MIN_PAGES or jobs == 1:
+        return extract_pdftohtml_format(html_content)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    seeds = prescan_sections(pages)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        chunksize = max(1, len(pages) // (4 * jobs))
+        results = list(pool.map(parse_page, zip(pages, seeds), chunksize=chunksize))
+    return stitch_pages(results, seeds)
+
+
+def strip_embedded(chunks):
+    """Drop data: URL payloads and @font-face blocks from a stream of text chunks.
+
+    Works on the raw characters, so embedded fonts and images are skipped
+    as they are read and never reach the HTML tokenizer. Only data: URLs in
+    attribute values or url() and @font-face rules inside <style> are
+    dropped; page text is passed through.
+    """
+    mode = None  # None, "data" or "font-face"
+    in_style = False
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        out = []
+        while buffer:
+            if mode == "data":
+                end = EMBED_END.search(buffer)
+                if not end:
+                    buffer = ""
+                    break
+                buffer = buffer[end.start():]
+                mode = None
+            elif mode == "font-face":
+                end = buffer.find("}")
+                if end == -1:
+                    buffer = ""
+                    break
+                buffer = buffer[end + 1:]
+                mode = None
+            else:
+                match = EMBED_START.search(buffer)
+                if not match:
+                    # Hold back a tail in case a marker straddles two chunks
+                    out.append(buffer[:-EMBED_LOOKBEHIND])
+                    buffer = buffer[-EMBED_LOOKBEHIND:]
+                    break
+                data_prefix, style_open, style_close = match.groups()
+                if data_prefix is not None:
+                    out.append(buffer[:match.start()] + data_prefix)
+                    mode = "data"
+                elif style_open or style_close or not in_style:
+                    # Style tags and @font-face outside <style> pass through
+                    out.append(buffer[:match.end()])
+                    if style_open or style_close:
+                        in_style = bool(style_open)
+                else:
+                    out.append(buffer[:match.start()])
+                    mode = "font-face"
+                buffer = buffer[match.end():]
+        yield "".join(out)
+    if mode is None:
+        yield buffer
+
+
+def parse_css(declarations: str) -> dict:
+    """Extract left/top/bottom (as numbers) and bold from CSS declarations."""
+    props = {}
+    for name, value in CSS_DECLARATION.findall(declarations):
+        name = name.lower()
+        value = value.strip().lower()
+        if name in ("left", "top", "bottom"):
+            number = re.match(r'-?[\d.]+', value)
+            if number:
+                props[name] = float(number.group(0))
+        elif name == "font-weight":
+            props["bold"] = value in ("bold", "bolder") or (value.isdigit() and int(value) >= 600)
+    return props
+
+
+def parse_stylesheet(css: str) -> dict:
+    """Map single-class selectors (.x3, .fw1) to their parse_css() properties."""
+    classes = {}
+    for selectors, body in CSS_RULE.findall(css):
+        props = parse_css(body)
+        if not props:
+            continue
+        for selector in selectors.split(","):
+            selector = selector.strip()
+            if re.fullmatch(r'\.[\w-]+', selector):
+                classes.setdefault(selector[1:], {}).update(props)
+    return classes
+
+
+class Pdf24Parser(HTMLParser):
+    """Collect positioned text from pdf24 (pdf2htmlEX-style) HTML as lines.
+
+    Text elements carry their position in inline styles or .xN/.yN classes.
+    Every page (div.pf / data-page-no) is grouped into rows by vertical
+    position, sorted left to right and emitted as ('bold' | 'text', text)
+    lines, the same stream extract_pdftohtml_format() builds.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.lines = []
+        self.has_bold = False
+        self._classes = {}
+        self._style = None
+        self._stack = []
+        self._page = []
+        self._fragment = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "style":
+            self._style = []
+            return
+        if tag in VOID_TAGS:
+            return
+        attrs = dict(attrs)
+        class_names = (attrs.get("class") or "").split()
+        if "pf" in class_names or "data-page-no" in attrs:
+            self.flush_page()
+
+        props = {}
+        for name in class_names:
+            props.update(self._classes.get(name, {}))
+        props.update(parse_css(attrs.get("style") or ""))
+        parent_bold = self._stack[-1][1] if self._stack else False
+        bold = tag in ("b", "strong") or props.get("bold", parent_bold)
+        self.has_bold |= bold
+
+        if self._fragment is None and ("t" in class_names or "top" in props or "bottom" in props):
+            # pdf2htmlEX positions from the page bottom; flip so rows sort top-down
+            top = props["top"] if "top" in props else -props.get("bottom", 0.0)
+            self._fragment = {"top": top, "left": props.get("left", 0.0), "bold": bold,
+                              "text": [], "depth": len(self._stack)}
+        elif self._fragment is not None:
+            self._fragment["bold"] |= bold
+            if "_" in class_names:
+                self._fragment["text"].append(" ")  # pdf2htmlEX spacing span
+        self._stack.append((tag, bold))
+
+    def handle_endtag(self, tag):
+        if tag == "style" and self._style is not None:
+            self._classes.update(parse_stylesheet("".join(self._style)))
+            self._style = None
+            return
+        if all(open_tag != tag for open_tag, _ in self._stack):
+            return
+        while self._stack:
+            open_tag, _ = self._stack.pop()
+            if self._fragment is not None and len(self._stack) == self._fragment["depth"]:
+                self.end_fragment()
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self._style is not None:
+            self._style.append(data)
+        elif self._fragment is not None:
+            self._fragment["text"].append(data)
+
+    def end_fragment(self):
+        """Finish the current text element."""
+        fragment, self._fragment = self._fragment, None
+        text = " ".join("".join(fragment["text"]).replace('\xa0', ' ').split())
+        if text:
+            self._page.append((fragment["top"], fragment["left"], fragment["bold"], text))
+
+    def flush_page(self):
+        """Emit the collected page as lines in reading order."""
+        if self._fragment is not None:
+            self.end_fragment()
+        rows = []
+        for fragment in sorted(self._page):
+            if rows and fragment[0] - rows[-1][0][0] <= ROW_TOLERANCE:
+                rows[-1].append(fragment)
+            else:
+                rows.append([fragment])
+        for row in rows:
+            for _, _, bold, text in sorted(row, key=lambda f: f[1]):
+                self.lines.append(('bold' if bold else 'text', text))
+        self._page = []
+
+    def close(self):
+        super().close()
+        self.flush_page()
+
+
+def infer_bold(lines: list) -> list:
+    """Mark what pdftohtml prints bold (level markers, headings) in lines without weights."""
+    result = []
+    in_entry = False
+    for kind, text in lines:
+        level = HISTAMINE_PATTERN.match(text)
+        if level and (not level.group(2) or is_only_flags(level.group(2))):
+            kind, in_entry = 'bold', True
+        elif in_entry and is_only_flags(text):
+            pass  # flags between a level marker and the food name
+        elif not in_entry and (text in CATEGORY_MAP or text in COLUMN_HEADERS
+                               or text.lower() in SUBCATEGORY_MAP):
+            kind = 'bold'
+        else:
+            # A food name after a level marker can look like a heading ("Morské plody")
+            in_entry = False
+        result.append((kind, text))
+    return result
+
+
+def extract_pdf24(html_path: Path) -> list:
+    """Extract foods from a raw pdf24 HTML export in a single streaming pass.
+
+    Embedded fonts and images are dropped while reading, so the export
+    doesn't have to go through clean_html.py first.
+    """
+    parser = Pdf24Parser()
+    with open(html_path, 'r', encoding='utf-8') as f:
+        for chunk in strip_embedded(iter(lambda: f.read(STREAM_CHUNK_SIZE), "")):
+            parser.feed(chunk)
+    parser.close()
+
+    lines = parser.lines
+    if not parser.has_bold:
+        lines = infer_bold(lines)
+    return parse_lines(lines)
+
+
+def is_pdf24_html(html_path: Path) -> bool:
+    """Check whether an HTML file is a pdf24 (pdf2htmlEX-style) export."""
+    with open(html_path, 'r', encoding='utf-8') as f:
+        head = f.read(STREAM_CHUNK_SIZE)
+    return "pdf24" in head.lower() or "pdf2htmlEX" in head or "data-page-no" in head
+
+
+def read_xml_pages(source):
+    """Yield the rows of each page of pdftohtml -xml output.
+
+    Streams with iterparse; a page's elements are freed once it is yielded.
+    Rows are lists of TextFragments in x order, grouped by top coordinate.
+    """
+    fragments = []
+    for _, element in ET.iterparse(source, events=("end",)):
+        if element.tag == "text":
+            text = "".join(element.itertext()).replace('\xa0', ' ').strip()
+            if text:
+                fragments.append(TextFragment(
+                    top=int(element.get("top")),
+                    left=int(element.get("left")),
+                    height=int(element.get("height")),
+                    bold=element.find(".//b") is not None,
+                    text=text,
+                ))
+        elif element.tag == "page":
+            rows = []
+            for fragment in sorted(fragments, key=lambda f: (f.top, f.left)):
+                if rows and fragment.top - rows[-1][0].top <= rows[-1][0].height // 2:
+                    rows[-1].append(fragment)
+                else:
+                    rows.append([fragment])
+            yield [sorted(row, key=lambda f: f.left) for row in rows]
+            fragments = []
+            element.clear()
+
+
+def detect_xml_columns(rows: list) -> tuple:
+    """Return the most common (name, notes) left positions in a page's food rows.
+
+    Either may be None when the page has too few rows to tell.
+    """
+    name_lefts, notes_lefts = Counter(), Counter()
+    for row in rows:
+        if not (row[0].bold and HISTAMINE_PATTERN.match(row[0].text)):
+            continue
+        cells = [f for f in row[1:] if not is_only_flags(f.text)]
+        if cells:
+            name_lefts[cells[0].left] += 1
+        if len(cells) > 1:
+            notes_lefts[cells[1].left] += 1
+
+    def mode(counter):
+        if not counter:
+            return None
+        left, count = counter.most_common(1)[0]
+        return left if count >= 2 else None
+
+    return mode(name_lefts), mode(notes_lefts)
+
+
+def extract_pdftohtml_xml(source) -> list:
+    """Extract foods from pdftohtml -xml output (path or binary file object).
+
+    Rows come from the top coordinate and cells from the left coordinate,
+    so flags, names and wrapped notes are assigned without look-ahead.
+    Column positions are learned per page and carried over to pages with
+    too few rows to tell.
+    """
+    foods = []
+    current_category = Category.ANIMAL_PRODUCTS
+    current_subcategory = "OTHER"
+    data_started = False
+    name_left = notes_left = None
+
+    for rows in read_xml_pages(source):
+        page_name_left, page_notes_left = detect_xml_columns(rows)
+        name_left = page_name_left or name_left
+        notes_left = page_notes_left or notes_left
+        food = None
+
+        for row in rows:
+            text = " ".join(f.text for f in row)
+            first = row[0]
+
+            # Skip until we find "Živočíšne potraviny"
+            if not data_started:
+                if "Živočíšne potraviny" in text:
+                    data_started = True
+                    current_category = Category.ANIMAL_PRODUCTS
+                continue
+
+            # Skip headers and footers
+            if any(skip in text for skip in SKIP_MARKERS):
+                continue
+
+            if first.bold:
+                if "Rastlinné potraviny" in first.text:
+                    current_category = Category.PLANT_PRODUCTS
+                    food = None
+                    continue
+                elif "Živočíšne potraviny" in first.text:
+                    current_category = Category.ANIMAL_PRODUCTS
+                    food = None
+                    continue
+
+                text_lower = first.text.lower()
+                subcategory = next((v for k, v in SUBCATEGORY_MAP.items() if k in text_lower), None)
+                if subcategory:
+                    current_subcategory = subcategory
+                    food = None
+                    continue
+
+                histamine_match = HISTAMINE_PATTERN.match(first.text)
+                if not histamine_match:
+                    continue
+
+                flags = parse_flags_from_text(histamine_match.group(2))
+                name_parts, notes_parts = [], []
+                for fragment in row[1:]:
+                    if notes_left is not None and fragment.left >= notes_left - COLUMN_TOLERANCE:
+                        notes_parts.append(fragment.text)
+                    elif name_left is not None and fragment.left >= name_left - COLUMN_TOLERANCE:
+                        name_parts.append(fragment.text)
+                    elif is_only_flags(fragment.text):
+                        flags |= parse_flags_from_text(fragment.text)
+                    elif name_left is None and not name_parts:
+                        name_parts.append(fragment.text)  # No layout yet: first cell is the name
+                    else:
+                        notes_parts.append(fragment.text)
+
+                food = None
+                food_name = " ".join(name_parts)
+                if len(food_name) > 1 and not is_only_flags(food_name) and food_name not in ['?', '-']:
+                    food = FoodItem(
+                        name=food_name,
+                        histamine_level=HistamineLevel.from_symbol(histamine_match.group(1)),
+                        flags=flags,
+                        notes=" ".join(notes_parts),
+                        category=current_category,
+                        subcategory=current_subcategory
+                    )
+                    foods.append(food)
+                continue
+
+            # Plain row: wrapped name/notes (or flags) of the previous food
+            if food is None or text.isdigit():
+                continue  # Page numbers
+            for fragment in row:
+                if notes_left is not None and fragment.left >= notes_left - COLUMN_TOLERANCE:
+                    food.notes = f"{food.notes} {fragment.text}".strip()
+                elif name_left is not None and fragment.left >= name_left - COLUMN_TOLERANCE:
+                    food.name = f"{food.name} {fragment.text}"
+                elif is_only_flags(fragment.text):
+                    food.flags |= parse_flags_from_text(fragment.text)
+
+    return foods
+
+
+def extract_foods(html_path: Path, jobs: int = None) -> list:
+    """Extract foods from a pdftohtml HTML or XML (-xml) file, or a raw pdf24 export.
+
+    Multi-page pdftohtml HTML is parsed by up to jobs processes (default: all cores).
+    """
+    if html_path.suffix == ".xml":
+        return extract_pdftohtml_xml(html_path)
+    if is_pdf24_html(html_path):
+        return extract_pdf24(html_path)
+
     with open(html_path, 'r', encoding='utf-8') as f:
         content = f.read()
 
-    return extract_pdftohtml_format(content)
+    return extract_pdftohtml_parallel(content, jobs)
 
 
 def deduplicate_foods(foods: list) -> list:
@@ -277,23 +819,16 @@ def deduplicate_foods(foods: list) -> list:
     return unique
 
 
-def create_json_structure(foods: list) -> dict:
-    """Create final JSON structure."""
+def create_json_structure(foods: list, registry=None) -> dict:
+    """Create final JSON structure (IDs from registry, else in input order)."""
     subcategory_labels = {v: k.title() for k, v in SUBCATEGORY_MAP.items()}
+    if registry:
+        ids = registry.allocate(lambda: (identity(f.name, f.category_name, f.subcategory) for f in foods))
+    else:
+        ids = range(1, len(foods) + 1)
 
     return {
-        "foods": [
-            {
-                "id": i + 1,
-                "category": f.category,
-                "subcategory": f.subcategory,
-                "name": f.name,
-                "histamineLevel": f.histamine_level,
-                "flags": f.flags,
-                "notes": f.notes
-            }
-            for i, f in enumerate(foods)
-        ],
+        "foods": [f.to_dict(food_id) for f, food_id in zip(foods, ids)],
         "enums": {
             "category": {
                 "ANIMAL_PRODUCTS": "Živočíšne potraviny",
@@ -324,14 +859,26 @@ def main():
     script_dir = Path(__file__).parent
     project_dir = script_dir.parent  # Root project directory
 
+    parser = argparse.ArgumentParser(description="Extract food data from pdftohtml/pdf24 HTML into JSON.")
+    parser.add_argument("html_file", nargs="?", help="HTML or XML file (default: latest translation)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Processes for page-parallel HTML parsing (default: all cores, 1 = serial)")
+    parser.add_argument("--ids", type=Path,
+                        help="Stable ID registry (default: data/ids/sk.json if it exists, else input order)")
+    parser.add_argument("--save-ids", action="store_true",
+                        help="Write newly allocated IDs back to the registry (read-only otherwise)")
+    args = parser.parse_args()
+
     # Accept HTML path as command line argument, default to translations folder
-    if len(sys.argv) > 1:
-        html_path = Path(sys.argv[1])
+    if args.html_file:
+        html_path = Path(args.html_file)
     else:
         # Try to find latest file in source/translations/ folder
         translations_dir = project_dir / "source" / "translations"
         if translations_dir.exists():
-            html_files = sorted(translations_dir.glob("translated-*.html"), reverse=True)
+            html_files = sorted([*translations_dir.glob("translated-*.xml"),
+                                 *translations_dir.glob("translated-*.html")],
+                                key=lambda p: p.stem, reverse=True)
             if html_files:
                 html_path = html_files[0]
                 print(f"Using latest translation: {html_path.name}")
@@ -348,7 +895,7 @@ def main():
         sys.exit(1)
 
     print(f"Loading {html_path}...")
-    foods = extract_foods(html_path)
+    foods = extract_foods(html_path, args.jobs)
     print(f"Found {len(foods)} food items")
 
     print("Removing duplicates...")
@@ -356,10 +903,19 @@ def main():
     print(f"Unique items: {len(foods)}")
 
     print("Creating JSON...")
-    data = create_json_structure(foods)
+    ids_path = args.ids or registry_path("sk")
+    registry = IdRegistry.load(ids_path) if args.ids or ids_path.exists() else None
+    data = create_json_structure(foods, registry)
 
-    with open(output_path, 'w', encoding='utf-8') as f:
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, output_path)
+
+    # Packed binary copy for mmap-based Python consumers
+    write_store(data, output_path.with_suffix(".bin"))
+    if registry and args.save_ids:
+        registry.save()
 
     print(f"Saved to {output_path}")
 
@@ -371,12 +927,8 @@ def main():
 
     # Statistics
     print(f"\nStatistics:")
-    hist_counts = {}
-    for f in data["foods"]:
-        h = f["histamineLevel"]
-        hist_counts[h] = hist_counts.get(h, 0) + 1
-    for level, count in sorted(hist_counts.items()):
-        print(f"  {level}: {count}")
+    from food_stats import FoodTable, format_counts  # NumPy; only the report needs it
+    print("\n".join(format_counts(FoodTable.from_foods(data["foods"]).counts("level"))))
 
 
 if __name__ == "__main__":
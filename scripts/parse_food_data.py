@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 """Parse food data from PDF content and generate JSON."""
 
+import argparse
 import json
 import re
+from pathlib import Path
+
+from food_ids import IdRegistry, identity, registry_path
+from food_model import FLAG_ABBREVIATIONS, Category, Flag, FoodItem, HistamineLevel
 
 # Category and subcategory mappings
 CATEGORY_MAP = {
@@ -44,22 +49,6 @@ SUBCATEGORY_MAP = {
     "Nealko nápoje, limonády": "SOFT_DRINKS",
 }
 
-HISTAMINE_LEVEL_MAP = {
-    "0": "WELL_TOLERATED",
-    "1": "MODERATELY_TOLERATED",
-    "2": "POORLY_TOLERATED",
-    "3": "VERY_POORLY_TOLERATED",
-    "?": "INSUFFICIENT_INFO",
-}
-
-FLAG_MAP = {
-    "H!": "FAST_SPOILAGE",
-    "H": "HIGH_HISTAMINE",
-    "A": "OTHER_BIOGENIC_AMINES",
-    "L": "HISTAMINE_LIBERATOR",
-    "B": "DAO_BLOCKER",
-}
-
 # Complete food data extracted from PDF
 # Format: (histamine_level, flags, name, notes, category, subcategory)
 FOOD_DATA = [
@@ -585,62 +574,68 @@ FOOD_DATA = [
 
 def convert_flag(flag: str) -> str:
     """Convert short flag to full name."""
-    if flag == "H!":
-        return "FAST_SPOILAGE"
-    elif flag == "H":
-        return "HIGH_HISTAMINE"
-    elif flag == "A":
-        return "OTHER_BIOGENIC_AMINES"
-    elif flag == "L":
-        return "HISTAMINE_LIBERATOR"
-    elif flag == "B":
-        return "DAO_BLOCKER"
+    if flag in FLAG_ABBREVIATIONS:
+        return FLAG_ABBREVIATIONS[flag].name
     return flag
 
 
 def convert_histamine_level(level: str) -> str:
     """Convert numeric level to descriptive name."""
-    return HISTAMINE_LEVEL_MAP.get(level, "INSUFFICIENT_INFO")
+    return HistamineLevel.from_symbol(level).name
+
 
+def generate_json(registry=None) -> dict:
+    """Generate the complete JSON structure (IDs from registry, else in table order)."""
+    if registry:
+        ids = registry.allocate(lambda: (identity(name, category, subcategory)
+                                         for _, _, name, _, category, subcategory in FOOD_DATA))
+    else:
+        ids = range(1, len(FOOD_DATA) + 1)
 
-def generate_json() -> dict:
-    """Generate the complete JSON structure."""
     foods = []
-    for i, (level, flags, name, notes, category, subcategory) in enumerate(FOOD_DATA, 1):
-        food = {
-            "id": i,
-            "category": category,
-            "subcategory": subcategory,
-            "name": name,
-            "histamineLevel": convert_histamine_level(level),
-            "flags": [convert_flag(f) for f in flags],
-            "notes": notes
-        }
-        foods.append(food)
+    for food_id, (level, flags, name, notes, category, subcategory) in zip(ids, FOOD_DATA):
+        food = FoodItem(
+            name=name,
+            histamine_level=HistamineLevel.from_symbol(level),
+            flags=Flag.from_abbreviations(flags),
+            notes=notes,
+            category=Category[category],
+            subcategory=subcategory
+        )
+        foods.append(food.to_dict(food_id))
 
     return {"foods": foods}
 
 
 def main():
-    output_path = '/data/sk.json'
-
-    data = generate_json()
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Generate Slovak food JSON from the built-in FOOD_DATA table.")
+    # No default: FOOD_DATA is a subset of data/sk.json, which must not be
+    # overwritten by accident
+    parser.add_argument("--output", type=Path, required=True, help="Output JSON path")
+    parser.add_argument("--ids", type=Path,
+                        help="Stable ID registry (default: data/ids/sk.json if it exists, else table order)")
+    parser.add_argument("--save-ids", action="store_true",
+                        help="Write newly allocated IDs back to the registry (read-only otherwise)")
+    args = parser.parse_args()
+    output_path = args.output
+
+    ids_path = args.ids or registry_path("sk")
+    registry = IdRegistry.load(ids_path) if args.ids or ids_path.exists() else None
+    data = generate_json(registry)
 
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
+    if registry and args.save_ids:
+        registry.save()
 
     print(f"Generated {len(data['foods'])} food items")
     print(f"Output written to: {output_path}")
 
     # Print some stats
-    categories = {}
-    for food in data['foods']:
-        cat = food['category']
-        categories[cat] = categories.get(cat, 0) + 1
-
+    from food_stats import FoodTable, format_counts  # NumPy; only the report needs it
     print("\nItems per category:")
-    for cat, count in sorted(categories.items()):
-        print(f"  {cat}: {count}")
+    print("\n".join(format_counts(FoodTable.from_foods(data['foods']).counts("category"))))
 
 
 if __name__ == '__main__':
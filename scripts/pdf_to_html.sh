@@ -1,19 +1,27 @@
 #!/bin/bash
 # Step 1: PDF → HTML
 # Converts foodlist.pdf to HTML using poppler's pdftohtml
-# Output: translations/translated-{ISO-date}.html
+# Output: translations/translated-{ISO-date}.html (or .xml with --xml)
 #
-# Usage: ./scripts/pdf_to_html.sh [pdf_file]
+# Usage: ./scripts/pdf_to_html.sh [--xml] [pdf_file]
+#   --xml:    Emit pdftohtml -xml output with text coordinates, parsed by
+#             html_to_json.py by row/column position
 #   pdf_file: Optional, defaults to foodlist.pdf
 
 set -e
 
+FORMAT="html"
+if [ "$1" == "--xml" ]; then
+    FORMAT="xml"
+    shift
+fi
+
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 PROJECT_DIR="$(dirname "$SCRIPT_DIR")"
 PDF_FILE="${1:-$PROJECT_DIR/source/foodlist.pdf}"
 DATE=$(date +%Y-%m-%d)
 OUTPUT_DIR="$PROJECT_DIR/source/translations"
-OUTPUT_FILE="$OUTPUT_DIR/translated-$DATE.html"
+OUTPUT_FILE="$OUTPUT_DIR/translated-$DATE.$FORMAT"
 
 # Check if pdftohtml is installed
 if ! command -v pdftohtml &> /dev/null; then
@@ -31,8 +39,13 @@ fi
 mkdir -p "$OUTPUT_DIR"
 
 # Convert PDF to HTML
-echo "Converting $PDF_FILE to HTML..."
-pdftohtml -noframes -enc UTF-8 "$PDF_FILE" "$OUTPUT_FILE"
+if [ "$FORMAT" == "xml" ]; then
+    echo "Converting $PDF_FILE to XML..."
+    pdftohtml -xml -i -enc UTF-8 "$PDF_FILE" "$OUTPUT_FILE"
+else
+    echo "Converting $PDF_FILE to HTML..."
+    pdftohtml -noframes -enc UTF-8 "$PDF_FILE" "$OUTPUT_FILE"
+fi
 
 echo "Done! Output: $OUTPUT_FILE"
 echo ""
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Reconcile the three producers of the food list.
+
+Sources:
+    food_data  parse_food_data.FOOD_DATA (hand-maintained, Slovak only)
+    html       html_to_json extraction of a pdftohtml/pdf24 file (or its JSON)
+    merged     merge_chunks output (extraction/output/<lang>.json)
+
+Every record is canonicalized (name key, level, flags, category,
+subcategory aliases, notes) and hashed into one index per source by
+normalized name. A single pass over the union of keys reports items
+missing from a source, histamine level/flag/category/subcategory conflicts
+and note drift. The report is JSON, suitable for diffing between runs.
+
+Usage:
+    python scripts/reconcile.py [--lang sk] [--html FILE] [--merged FILE]
+                                [--output report.json] [--check]
+"""
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from pathlib import Path
+
+from food_query import normalize
+
+
+PROJECT_DIR = Path(__file__).parent.parent
+
+# Subcategory names used by parse_food_data / html_to_json -> data/<lang>.json names
+SUBCATEGORY_ALIASES = {
+    "FATS_OILS": "OILS_FATS",
+    "FRUIT": "FRUITS",
+    "MUSHROOMS_ALGAE": "MUSHROOMS",
+    "SEEDS": "NUTS",
+    "ALCOHOLIC": "ALCOHOLIC_BEVERAGES",
+    "CAFFEINATED": "CAFFEINE_DRINKS",
+    "TEAS": "CAFFEINE_DRINKS",
+    "JUICES": "FRUIT_JUICES",
+    "PLANT_MILKS": "MILK_SUBSTITUTES",
+}
+
+COMPARED_FIELDS = ("histamineLevel", "flags", "category", "subcategory")
+
+# Notes this similar (0-1) after normalization are reported as minor drift
+MINOR_DRIFT = 0.9
+
+
+@dataclass(slots=True)
+class Record:
+    """Canonical form of one food from one source."""
+    key: str
+    name: str
+    histamineLevel: str
+    flags: tuple
+    category: str
+    subcategory: str
+    notes: str
+
+
+def name_key(name: str) -> str:
+    """Join key: normalized name with punctuation and extra whitespace removed."""
+    return " ".join(re.sub(r'[^\w\s]', ' ', normalize(name)).split())
+
+
+def canonical(food: dict) -> Record:
+    """Canonicalize a food dict as written by any of the producers."""
+    category = food.get("category") or ""
+    # Category-only sections carry no subcategory in FOOD_DATA, the category name elsewhere
+    subcategory = food.get("subcategory") or category
+    return Record(
+        key=name_key(food["name"]),
+        name=food["name"],
+        histamineLevel=food.get("histamineLevel") or "",
+        flags=tuple(food.get("flags") or ()),
+        category=category,
+        subcategory=SUBCATEGORY_ALIASES.get(subcategory, subcategory),
+        notes=" ".join((food.get("notes") or "").split()),
+    )
+
+
+def build_index(foods: list) -> tuple:
+    """Hash canonical records by key; return (index, duplicate names)."""
+    index = {}
+    duplicates = []
+    for food in foods:
+        record = canonical(food)
+        if record.key in index:
+            duplicates.append(record.name)
+        else:
+            index[record.key] = record
+    return index, duplicates
+
+
+def load_food_data() -> list:
+    """Foods from parse_food_data.FOOD_DATA."""
+    from parse_food_data import generate_json
+    return generate_json()["foods"]
+
+
+def load_html(path: Path) -> list:
+    """Foods from an html_to_json JSON file, or extracted from HTML/XML."""
+    if path.suffix == ".json":
+        return load_json(path)
+    from html_to_json import deduplicate_foods, extract_foods
+    foods = deduplicate_foods(extract_foods(path))
+    return [food.to_dict(i) for i, food in enumerate(foods, 1)]
+
+
+def load_json(path: Path) -> list:
+    """Foods from a data/<lang>.json-style file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)["foods"]
+
+
+def latest_translation() -> Path:
+    """Newest source/translations/translated-* file, or None."""
+    translations_dir = PROJECT_DIR / "source" / "translations"
+    files = sorted([*translations_dir.glob("translated-*.xml"), *translations_dir.glob("translated-*.html")],
+                   key=lambda p: p.stem, reverse=True)
+    return files[0] if files else None
+
+
+def note_drift(values: dict) -> dict:
+    """Return drift details if the notes differ between sources, else None."""
+    if len(set(values.values())) <= 1:
+        return None
+    texts = [normalize(notes) for notes in values.values()]
+    # quick_ratio is a linear-time upper bound; enough to rank drift
+    similarity = min(SequenceMatcher(None, texts[0], other).quick_ratio() for other in texts[1:])
+    return {"similarity": round(similarity, 3), "minor": similarity >= MINOR_DRIFT}
+
+
+def reconcile(indexes: dict) -> dict:
+    """Compare per-source indexes {source: {key: Record}}; return the report body."""
+    sources = list(indexes)
+    keys = {}
+    for source in sources:
+        for key, record in indexes[source].items():
+            keys.setdefault(key, record.name)
+
+    missing, conflicts, drift = [], [], []
+    matched = 0
+    for key, name in keys.items():
+        records = {source: indexes[source][key] for source in sources if key in indexes[source]}
+        if len(records) < len(sources):
+            missing.append({
+                "key": key,
+                "name": name,
+                "presentIn": list(records),
+                "missingFrom": [source for source in sources if source not in records],
+            })
+        if len(records) < 2:
+            continue
+
+        clean = True
+        for field in COMPARED_FIELDS:
+            values = {source: getattr(record, field) for source, record in records.items()}
+            if len(set(values.values())) > 1:
+                clean = False
+                conflicts.append({
+                    "key": key,
+                    "name": name,
+                    "field": field,
+                    "values": {source: list(value) if field == "flags" else value
+                               for source, value in values.items()},
+                })
+
+        notes = {source: record.notes for source, record in records.items()}
+        details = note_drift(notes)
+        if details:
+            drift.append({"key": key, "name": name, **details, "values": notes})
+        elif clean:
+            matched += 1
+
+    return {
+        "summary": {
+            "keys": len(keys),
+            "matched": matched,
+            "missing": len(missing),
+            "conflicts": len(conflicts),
+            "noteDrift": len(drift),
+        },
+        "missing": missing,
+        "conflicts": conflicts,
+        "noteDrift": drift,
+    }
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Report disagreements between the food list producers.")
+    parser.add_argument("--lang", default="sk", help="Language of the html/merged sources (default: sk)")
+    parser.add_argument("--html", type=Path, help="html_to_json input (HTML/XML) or output JSON "
+                                                  "(default: latest source/translations file)")
+    parser.add_argument("--merged", type=Path, help="merge_chunks output (default: extraction/output/<lang>.json, "
+                                                    "then data/<lang>.json)")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here instead of stdout")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if the sources disagree")
+    args = parser.parse_args()
+
+    html_path = args.html or latest_translation()
+    merged_path = args.merged or next(
+        (p for p in (PROJECT_DIR / "extraction" / "output" / f"{args.lang}.json",
+                     PROJECT_DIR / "data" / f"{args.lang}.json") if p.exists()), None)
+
+    loaders = {}
+    if args.lang == "sk":
+        loaders["food_data"] = ("parse_food_data.FOOD_DATA", load_food_data)
+    if html_path and html_path.exists():
+        loaders["html"] = (str(html_path), lambda: load_html(html_path))
+    if merged_path and merged_path.exists():
+        loaders["merged"] = (str(merged_path), lambda: load_json(merged_path))
+    if len(loaders) < 2:
+        print(f"Error: need at least two sources, found: {', '.join(loaders) or 'none'}", file=sys.stderr)
+        sys.exit(1)
+
+    indexes = {}
+    source_info = {}
+    for source, (origin, load) in loaders.items():
+        foods = load()
+        indexes[source], duplicates = build_index(foods)
+        source_info[source] = {"origin": origin, "count": len(foods), "duplicates": duplicates}
+
+    report = {"lang": args.lang, "sources": source_info, **reconcile(indexes)}
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    summary = report["summary"]
+    counts = ", ".join(f"{source}: {info['count']}" for source, info in source_info.items())
+    print(f"{counts} | "
+          f"keys: {summary['keys']}, matched: {summary['matched']}, missing: {summary['missing']}, "
+          f"conflicts: {summary['conflicts']}, note drift: {summary['noteDrift']}", file=sys.stderr)
+
+    if args.check and (summary["missing"] or summary["conflicts"] or summary["noteDrift"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Bulk-scan recipes and ingredient lists for foods from data/<lang>.json.
+
+All normalized food names and their comma-separated aliases are compiled into
+one Aho-Corasick automaton, so each document is scanned once regardless of
+how many foods there are. For every document the scanner reports the matched
+foods, the worst histamineLevel and the union of flags.
+
+Input is NDJSON (one {"id": ..., "text": ...} object per line) from stdin or
+from files given on the command line. Plain-text files (anything not ending
+in .ndjson/.jsonl) are scanned as one document each. Output is NDJSON.
+
+Usage:
+    python scripts/scan_recipes.py <lang> [files ...] [--workers N]
+    cat recipes.ndjson | python scripts/scan_recipes.py sk > report.ndjson
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from itertools import islice
+from pathlib import Path
+
+from food_model import Flag
+from food_query import DATA_DIR, normalize
+
+
+# Worst-first ordering used to pick a document's overall level
+LEVEL_SEVERITY = {
+    "WELL_TOLERATED": 0,
+    "INSUFFICIENT_INFO": 1,
+    "VARIABLE": 2,
+    "MODERATELY_TOLERATED": 3,
+    "POORLY_TOLERATED": 4,
+    "VERY_POORLY_TOLERATED": 5,
+}
+
+MIN_ALIAS_LENGTH = 3
+BATCH_SIZE = 256
+
+
+def food_aliases(name: str, heads: bool = True) -> set:
+    """Return the normalized aliases of a food name.
+
+    "eggs, chicken egg, whole egg" -> {"eggs", "chicken egg", "whole egg"}.
+    Parenthesized text is split into aliases of its own. For "butter: sweet
+    cream butter" both the specific part and the general term before the
+    colon are aliases, so a recipe that only says "butter" still matches; in
+    "sweet cream butter" the longer match wins over the nested "butter" (see
+    RecipeScanner.find). Text before a colon inside parentheses is a label
+    ("(means: very young cheeses)"), not a food, and is skipped. With
+    heads=False only the specific parts are returned.
+    """
+    normalized = normalize(name)
+    parts = [(part, heads) for part in re.sub(r'\([^)]*\)?', ' ', normalized).split(",")]
+    for inner in re.findall(r'\(([^)]*)\)?', normalized):
+        parts.extend((part, False) for part in inner.split(","))
+
+    aliases = set()
+    for part, with_heads in parts:
+        *general, specific = part.split(":")
+        for candidate in [specific, *general] if with_heads else [specific]:
+            alias = " ".join(candidate.split()).strip(" ;.")
+            if len(alias) >= MIN_ALIAS_LENGTH and any(c.isalpha() for c in alias):
+                aliases.add(alias)
+    return aliases
+
+
+class Automaton:
+    """Aho-Corasick automaton over normalized strings."""
+
+    def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+    def add(self, pattern: str, value) -> None:
+        """Add a pattern; value is reported with every match."""
+        state = 0
+        for char in pattern:
+            nxt = self.goto[state].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[state][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = nxt
+        self.output[state].append((len(pattern), value))
+
+    def build(self) -> None:
+        """Compute failure links (breadth-first) and merge outputs."""
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def iter_matches(self, text: str):
+        """Yield (start, end, value) for every pattern occurrence in text."""
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for pos, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                end = pos + 1
+                for length, value in output[state]:
+                    yield end - length, end, value
+
+
+class RecipeScanner:
+    """Scans documents for foods of one language file."""
+
+    def __init__(self, foods: list, all_matches: bool = False):
+        self.foods = foods
+        self.all_matches = all_matches
+        self.automaton = Automaton()
+        specific = [food_aliases(food["name"], heads=False) for food in foods]
+        claimed = set().union(*specific)
+        for idx, food in enumerate(foods):
+            for alias in food_aliases(food["name"]):
+                # A general term ("butter") that names a food of its own
+                # matches only that food
+                if alias in specific[idx] or alias not in claimed:
+                    self.automaton.add(alias, idx)
+        self.automaton.build()
+
+    @classmethod
+    def from_file(cls, path: Path, **kwargs) -> "RecipeScanner":
+        """Build a scanner from a data JSON file."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f)["foods"], **kwargs)
+
+    def find(self, text: str) -> list:
+        """Return indexes of foods mentioned in text, in order of appearance.
+
+        Matches must start and end on word boundaries. Unless all_matches is
+        set, a match lying inside a longer match ("butter" in "peanut butter")
+        is not reported.
+        """
+        text = normalize(text)
+        spans = []
+        for start, end, idx in self.automaton.iter_matches(text):
+            if start > 0 and text[start - 1].isalnum():
+                continue
+            if end < len(text) and text[end].isalnum():
+                continue
+            spans.append((start, end, idx))
+
+        if not self.all_matches:
+            spans.sort(key=lambda s: (s[0], -s[1]))
+            kept = []
+            covered_end = -1
+            for start, end, idx in spans:
+                if end <= covered_end and not (kept and kept[-1][:2] == (start, end)):
+                    continue
+                kept.append((start, end, idx))
+                covered_end = max(covered_end, end)
+            spans = kept
+
+        spans.sort()
+        return list(dict.fromkeys(idx for _, _, idx in spans))
+
+    def scan(self, doc_id, text: str) -> dict:
+        """Return the report for one document."""
+        matched = [self.foods[idx] for idx in self.find(text)]
+
+        worst = None
+        flags = set()
+        for food in matched:
+            level = food["histamineLevel"]
+            if worst is None or LEVEL_SEVERITY.get(level, 0) > LEVEL_SEVERITY.get(worst, 0):
+                worst = level
+            flags.update(food.get("flags") or [])
+
+        return {
+            "id": doc_id,
+            "matches": [
+                {"id": food.get("id"), "name": food["name"], "histamineLevel": food["histamineLevel"]}
+                for food in matched
+            ],
+            "worstLevel": worst,
+            "flags": Flag.from_names(flags).names(),
+        }
+
+
+# Per-process scanner, built once by the pool initializer
+_scanner = None
+
+
+def _init_worker(data_path: str, all_matches: bool) -> None:
+    """Build the automaton once per worker process."""
+    global _scanner
+    _scanner = RecipeScanner.from_file(Path(data_path), all_matches=all_matches)
+
+
+def _scan_batch(batch: list) -> list:
+    """Scan a batch of (id, text) documents in a worker process."""
+    return [_scanner.scan(doc_id, text) for doc_id, text in batch]
+
+
+def iter_documents(paths: list, text_field: str = "text", id_field: str = "id"):
+    """Yield (id, text) documents from NDJSON/plain-text files, or stdin if no paths."""
+    sources = paths or ["-"]
+    line_no = 0
+    for source in sources:
+        if source != "-" and not source.endswith((".ndjson", ".jsonl")):
+            with open(source, 'r', encoding='utf-8') as f:
+                yield source, f.read()
+            continue
+
+        stream = sys.stdin if source == "-" else open(source, 'r', encoding='utf-8')
+        try:
+            for line in stream:
+                line_no += 1
+                if not line.strip():
+                    continue
+                doc = json.loads(line)
+                yield doc.get(id_field, line_no), doc.get(text_field, "")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+def batched(iterable, size: int):
+    """Yield lists of up to size items."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def scan_documents(data_path: Path, documents, workers: int = 1,
+                   all_matches: bool = False, batch_size: int = BATCH_SIZE):
+    """Yield reports for documents in input order, optionally using a process pool."""
+    if workers <= 1:
+        _init_worker(str(data_path), all_matches)
+        for batch in batched(documents, batch_size):
+            yield from _scan_batch(batch)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(str(data_path), all_matches)) as pool:
+        # Keep a bounded number of batches in flight so huge inputs stream
+        pending = []
+        for batch in batched(documents, batch_size):
+            pending.append(pool.submit(_scan_batch, batch))
+            if len(pending) >= workers * 4:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Scan recipes for foods from the food list.")
+    parser.add_argument("lang", help="Language of data/<lang>.json")
+    parser.add_argument("files", nargs="*", help="NDJSON or text files (default: NDJSON on stdin)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--text-field", default="text", help="NDJSON field with the document text")
+    parser.add_argument("--id-field", default="id", help="NDJSON field with the document id")
+    parser.add_argument("--all-matches", action="store_true",
+                        help="Also report matches nested inside longer matches")
+    args = parser.parse_args()
+
+    data_path = DATA_DIR / f"{args.lang}.json"
+    if not data_path.exists():
+        print(f"Error: data file not found: {data_path}", file=sys.stderr)
+        sys.exit(1)
+
+    documents = iter_documents(args.files, args.text_field, args.id_field)
+    for report in scan_documents(data_path, documents, args.workers, args.all_matches):
+        sys.stdout.write(json.dumps(report, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Local HTTP JSON API over data/*.json.
+
+Accepts the same query parameters as the web app URL (see updateURLParams
+and loadFiltersFromURL in index.html), plus pagination:
+
+    GET /foods?lang=sk&q=syr&hist=WELL_TOLERATED,MODERATELY_TOLERATED
+              &sub=DAIRY&flags=HIGH_HISTAMINE&sort=name&dir=desc
+              &page=1&perPage=50
+    GET /foods/<id>?lang=sk
+    GET /health
+
+Each language is held as an in-memory FoodIndex. Responses are cached per
+data snapshot, keyed by the normalized query. A background task watches the
+data files; when one changes, a complete new snapshot is built off the event
+loop and swapped in with a single assignment, so requests never see a
+half-loaded dataset and serving never pauses.
+
+Usage:
+    python scripts/serve_api.py [--host 127.0.0.1] [--port 8080] [--data-dir data]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from food_query import DATA_DIR, HISTAMINE_SORT_ORDER, FoodIndex
+
+
+DEFAULT_LANG = "en"
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 500
+RESPONSE_CACHE_SIZE = 2048
+RELOAD_INTERVAL = 2.0
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               500: "Internal Server Error"}
+
+# ASCII digits only; str.isdigit() also accepts e.g. "²", which int() rejects
+FOOD_ID = re.compile(r"[0-9]+")
+
+
+class Snapshot:
+    """Immutable set of per-language indexes plus their response cache."""
+
+    def __init__(self, data_dir: Path):
+        self.indexes = {}
+        self.mtimes = {}
+        for path in sorted(data_dir.glob("*.json")):
+            self.mtimes[path.stem] = path.stat().st_mtime_ns
+            self.indexes[path.stem] = FoodIndex.from_file(path, lang=path.stem)
+        self.cache = OrderedDict()
+
+    def cached(self, key, build):
+        """Return the cached response body for key, building it on a miss."""
+        body = self.cache.get(key)
+        if body is None:
+            body = build()
+            self.cache[key] = body
+            if len(self.cache) > RESPONSE_CACHE_SIZE:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        return body
+
+
+def current_mtimes(data_dir: Path) -> dict:
+    """Return {lang: mtime_ns} for the data files currently on disk."""
+    return {path.stem: path.stat().st_mtime_ns for path in sorted(data_dir.glob("*.json"))}
+
+
+def parse_list(params: dict, name: str, allowed) -> list:
+    """Parse a comma-separated parameter, dropping unknown values like loadFiltersFromURL."""
+    values = []
+    for raw in params.get(name, []):
+        values.extend(v for v in raw.split(",") if v in allowed)
+    return values
+
+
+def parse_int(params: dict, name: str, default: int, minimum: int, maximum: int = None) -> int:
+    """Parse a bounded integer parameter."""
+    try:
+        value = int(params[name][0])
+    except (KeyError, ValueError):
+        return default
+    value = max(minimum, value)
+    return min(value, maximum) if maximum is not None else value
+
+
+class FoodAPI:
+    """Request handling over the current snapshot."""
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = data_dir
+        self.snapshot = Snapshot(data_dir)
+
+    def handle(self, method: str, target: str) -> tuple:
+        """Return (status, body dict or bytes) for a request."""
+        if method != "GET":
+            return 405, {"error": "Only GET is supported"}
+
+        url = urlsplit(target)
+        params = parse_qs(url.query)
+        path = url.path.rstrip("/")
+
+        # Read the snapshot once so a concurrent reload can't mix datasets
+        snapshot = self.snapshot
+
+        if path == "/health":
+            return 200, {"status": "ok", "languages": {
+                lang: len(index) for lang, index in snapshot.indexes.items()
+            }}
+
+        lang = params.get("lang", [DEFAULT_LANG])[0]
+        index = snapshot.indexes.get(lang)
+        if index is None:
+            return 404, {"error": f"Unknown language: {lang}"}
+
+        if path == "/foods":
+            return 200, self.search(snapshot, index, lang, params)
+
+        if path.startswith("/foods/"):
+            food_id = path[len("/foods/"):]
+            food = index.get(int(food_id)) if FOOD_ID.fullmatch(food_id) else None
+            if food is None:
+                return 404, {"error": f"Unknown food id: {food_id}"}
+            return 200, food
+
+        return 404, {"error": f"Not found: {url.path}"}
+
+    def search(self, snapshot: Snapshot, index: FoodIndex, lang: str, params: dict) -> bytes:
+        """Return the encoded, paginated /foods response."""
+        query = params.get("q", [""])[0]
+        levels = parse_list(params, "hist", HISTAMINE_SORT_ORDER)
+        subcategories = parse_list(params, "sub", index.by_subcategory)
+        flags = parse_list(params, "flags", index.by_flag)
+        sort = params.get("sort", [None])[0]
+        direction = "desc" if params.get("dir", ["asc"])[0] == "desc" else "asc"
+        page = parse_int(params, "page", 1, 1)
+        per_page = parse_int(params, "perPage", DEFAULT_PER_PAGE, 1, MAX_PER_PAGE)
+
+        query_key = index.query_key(query, levels, subcategories, flags, sort, direction)
+
+        def build():
+            results = index.search(query, levels, subcategories, flags, sort, direction)
+            start = (page - 1) * per_page
+            return encode({
+                "lang": lang,
+                "total": len(results),
+                "page": page,
+                "perPage": per_page,
+                "foods": results[start:start + per_page],
+            })
+
+        return snapshot.cached((lang, query_key, page, per_page), build)
+
+    async def watch(self, interval: float = RELOAD_INTERVAL) -> None:
+        """Poll data files and swap in a fresh snapshot when one changes."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if current_mtimes(self.data_dir) == self.snapshot.mtimes:
+                    continue
+                # Build off the event loop; requests keep using the old snapshot
+                snapshot = await loop.run_in_executor(None, Snapshot, self.data_dir)
+            except Exception as e:
+                # Half-written file, invalid JSON or anything else: keep
+                # serving and retry next tick rather than ending the watcher
+                print(f"Reload failed, keeping previous data: {e!r}", file=sys.stderr)
+                continue
+            self.snapshot = snapshot
+            print(f"Reloaded data: {', '.join(sorted(snapshot.indexes))}")
+
+
+def encode(payload) -> bytes:
+    """Encode a JSON response body."""
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+
+async def read_request(reader: asyncio.StreamReader):
+    """Read one request head; return (method, target, headers) or None on EOF."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        return None
+
+    lines = head.decode('latin-1').split("\r\n")
+    parts = lines[0].split()
+    if len(parts) != 3:
+        return None
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return parts[0], parts[1], headers
+
+
+def make_handler(api: FoodAPI):
+    """Create the per-connection coroutine (HTTP/1.1 with keep-alive)."""
+
+    async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, headers = request
+
+                try:
+                    status, body = api.handle(method, target)
+                except Exception as e:
+                    print(f"Error handling {method} {target}: {e!r}", file=sys.stderr)
+                    status, body = 500, {"error": "Internal server error"}
+                if not isinstance(body, bytes):
+                    body = encode(body)
+
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Access-Control-Allow-Origin: *\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+                    f"\r\n".encode('latin-1') + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    return handle_connection
+
+
+async def serve(host: str, port: int, data_dir: Path) -> None:
+    """Run the API server until cancelled."""
+    api = FoodAPI(data_dir)
+    server = await asyncio.start_server(make_handler(api), host, port)
+    watcher = asyncio.create_task(api.watch())
+
+    print(f"Serving {', '.join(sorted(api.snapshot.indexes))} on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        watcher.cancel()
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Serve food data as a JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.data_dir))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+// Search and sort engine for index.html.
+//
+// Runs in a dedicated Web Worker: the page sends the foods once ('load')
+// and then only queries; the worker answers with the matching positions in
+// the page's allFoods array, in display order. If the page cannot start
+// the worker it loads this file with a <script> tag and runs SearchEngine
+// on the main thread instead.
+//
+// Typing is cheap: a query that extends the previous one (same filters) only
+// re-checks the previous matches, and the last RESULT_CACHE_SIZE results are
+// kept so backspacing or re-sorting doesn't recompute them.
+//
+// Messages:
+//   { type: 'load', foods: [{ searchName, nameRank, histamineLevel, subcategory, flags }], sortOrder }
+//   { type: 'query', seq, query, filters: { histamineLevels, subcategories, flags }, sort: { column, direction } }
+//   -> { type: 'result', seq, ids: Int32Array }
+
+const RESULT_CACHE_SIZE = 16;
+
+class SearchEngine {
+    load({ foods, sortOrder }) {
+        this.foods = foods.map((food, id) => ({
+            id,
+            searchName: food.searchName,
+            nameRank: food.nameRank,
+            histamineLevel: food.histamineLevel,
+            level: sortOrder[food.histamineLevel] ?? 99,
+            subcategory: food.subcategory,
+            flags: food.flags || []
+        }));
+
+        // Prebuilt orders: by name, and by level (stable, so ties keep data order)
+        this.nameOrder = [...this.foods].sort((a, b) => a.nameRank - b.nameRank);
+        this.levelOrder = {
+            asc: [...this.foods].sort((a, b) => a.level - b.level),
+            desc: [...this.foods].sort((a, b) => b.level - a.level)
+        };
+
+        // Previous match set (for narrowing) and recent results (for backspacing)
+        this.lastMatch = null;
+        this.results = new Map();
+    }
+
+    // Same semantics as the former filterFoods() + sortFoods() in index.html
+    query({ query, filters, sort }) {
+        const filterKey = [filters.histamineLevels, filters.subcategories, filters.flags]
+            .map(values => [...values].sort().join(',')).join('|');
+        const key = `${query}\u0000${filterKey}\u0000${sort.column}:${sort.direction}`;
+
+        let ids = this.results.get(key);
+        if (ids) {
+            this.results.delete(key);  // Refresh LRU position
+        } else {
+            ids = Int32Array.from(this.order(this.match(query, filters, filterKey), query, sort), food => food.id);
+            if (this.results.size >= RESULT_CACHE_SIZE) {
+                this.results.delete(this.results.keys().next().value);
+            }
+        }
+        this.results.set(key, ids);
+        return ids.slice();  // The caller may transfer it
+    }
+
+    // Foods passing the query and filters, in data order. When the query only
+    // got longer and the filters are the same, only the previous matches can
+    // still match, so those are the only ones checked.
+    match(query, filters, filterKey) {
+        const last = this.lastMatch;
+        const candidates = last && last.filterKey === filterKey && query.startsWith(last.query)
+            ? last.foods
+            : this.foods;
+
+        const levels = new Set(filters.histamineLevels);
+        const subcategories = new Set(filters.subcategories);
+        const flags = new Set(filters.flags);
+        const matches = (food) =>
+            (!query || food.searchName.includes(query)) &&
+            (levels.size === 0 || levels.has(food.histamineLevel)) &&
+            (subcategories.size === 0 || subcategories.has(food.subcategory)) &&
+            (flags.size === 0 || food.flags.some(flag => flags.has(flag)));
+
+        const foods = candidates === this.foods || query !== last.query
+            ? candidates.filter(matches)
+            : candidates;
+        this.lastMatch = { query, filterKey, foods };
+        return foods;
+    }
+
+    order(foods, query, sort) {
+        // Large match sets are cheapest to order by walking a prebuilt order;
+        // small ones (the usual case while typing) are sorted directly.
+        // Both give the same result: the prebuilt orders are stable sorts of
+        // data order, and so is Array.prototype.sort on data-ordered input.
+        const sorted = (prebuilt, compare) => {
+            if (foods.length * 8 < this.foods.length) return [...foods].sort(compare);
+            const member = new Uint8Array(this.foods.length);
+            for (const food of foods) member[food.id] = 1;
+            return prebuilt.filter(food => member[food.id]);
+        };
+        const byName = () => sorted(this.nameOrder, (a, b) => a.nameRank - b.nameRank);
+
+        let result;
+        if (sort.column === 'name' && sort.direction) {
+            // Name order fully determines the result; relevance doesn't matter
+            result = byName();
+            if (sort.direction === 'desc') result.reverse();
+        } else if (!query) {
+            if (sort.column === 'histamineLevel' && sort.direction) {
+                const direction = sort.direction === 'asc' ? 1 : -1;
+                result = sorted(this.levelOrder[sort.direction], (a, b) => direction * (a.level - b.level));
+            } else {
+                result = foods;
+            }
+        } else {
+            // Relevance: exact matches first, then alphabetically
+            result = byName();
+            const exact = result.filter(food => food.searchName === query);
+            if (exact.length > 0) {
+                result = exact.concat(result.filter(food => food.searchName !== query));
+            }
+            if (sort.column === 'histamineLevel' && sort.direction) {
+                const direction = sort.direction === 'asc' ? 1 : -1;
+                result.sort((a, b) => direction * (a.level - b.level));
+            }
+        }
+        return result;
+    }
+}
+
+if (typeof WorkerGlobalScope !== 'undefined' && self instanceof WorkerGlobalScope) {
+    const engine = new SearchEngine();
+    let latest = null;
+
+    // Only the newest query is answered: queries that arrive while another
+    // one runs replace each other, so stale keystrokes are dropped
+    const runLatest = () => {
+        const message = latest;
+        latest = null;
+        const ids = engine.query(message);
+        self.postMessage({ type: 'result', seq: message.seq, ids }, [ids.buffer]);
+    };
+
+    self.onmessage = (event) => {
+        const message = event.data;
+        if (message.type === 'load') {
+            engine.load(message);
+        } else if (message.type === 'query') {
+            if (!latest) setTimeout(runLatest, 0);
+            latest = message;
+        }
+    };
+}
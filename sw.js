@@ -1,12 +1,11 @@
-const CACHE_NAME = 'histali-1768163046';
+const CACHE_NAME = 'histali-assets';
 const ASSETS_TO_CACHE = [
   '/histali/',
   '/histali/index.html',
+  '/histali/search-worker.js',
   '/histali/dist/output.css',
-  '/histali/data/sk.json',
-  '/histali/data/en.json',
-  '/histali/i18n/sk.json',
-  '/histali/i18n/en.json',
+  '/histali/data/packs/sk.json',
+  '/histali/data/packs/en.json',
   '/histali/icons/icon-192.png',
   '/histali/icons/icon-512.png',
   '/histali/icons/apple-touch-icon.png',
@@ -15,11 +14,132 @@ const ASSETS_TO_CACHE = [
   '/histali/sitemap.xml'
 ];
 
+// Cache keys carry the asset revision from asset-manifest.json (built by
+// scripts/build_manifest.py), so a cached entry never goes stale: a changed
+// file gets a new key. Assets are served from the cache without touching the
+// network; only the manifest is revalidated, on page loads.
+//
+// Each manifest the worker switches to becomes a numbered generation. A page
+// is served the generation that was active when it was loaded, and the files
+// of a generation are only deleted once no open page uses it, so a tab still
+// running an old index.html never gets a newer search-worker.js or pack.
+const MANIFEST_URL = '/histali/asset-manifest.json';
+const stateKey = (name) => new URL(`${MANIFEST_URL}?${name}`, self.location).href;
+const ACTIVE_KEY = stateKey('current');    // { generation, assets } for new pages
+const CLIENTS_KEY = stateKey('clients');   // { clientId: generation }
+const generationKey = (generation) => stateKey(`generation=${generation}`);
+
+const revisionKey = (url, revision) => new URL(`${url}?rev=${revision}`, self.location).href;
+
+let active = null;              // Generation served to new pages
+let clientGenerations = null;   // Generation each open page was loaded with
+const generations = {};         // generation -> assets, read on demand
+let updating = null;
+
+async function readState(key, fallback) {
+  const stored = await caches.match(key);
+  return stored ? stored.json() : fallback;
+}
+
+async function writeState(key, value) {
+  const cache = await caches.open(CACHE_NAME);
+  await cache.put(key, new Response(JSON.stringify(value)));
+}
+
+async function loadActive() {
+  active ??= await readState(ACTIVE_KEY, { generation: 0, assets: {} });
+  return active;
+}
+
+async function loadClients() {
+  clientGenerations ??= await readState(CLIENTS_KEY, {});
+  return clientGenerations;
+}
+
+// Revisions of a generation (the active one if it is unknown or pruned)
+async function assetsOf(generation) {
+  const current = await loadActive();
+  if (generation === undefined || generation === current.generation) return current.assets;
+  generations[generation] ??= await readState(generationKey(generation), null);
+  return generations[generation] ?? current.assets;
+}
+
+// Fetch the manifest and download only the assets whose revision changed.
+// The new revisions take effect once every changed asset is cached, and only
+// for pages loaded after that.
+function updateAssets() {
+  updating ??= (async () => {
+    const response = await fetch(MANIFEST_URL, { cache: 'no-cache' });
+    if (!response.ok) throw new Error(`Manifest request failed: ${response.status}`);
+    const { assets } = await response.json();
+    const current = await loadActive();
+    const changed = ASSETS_TO_CACHE.filter((url) => assets[url] && assets[url] !== current.assets[url]);
+    if (changed.length === 0) return;
+
+    const cache = await caches.open(CACHE_NAME);
+    await Promise.all(changed.map(async (url) => {
+      const key = revisionKey(url, assets[url]);
+      if (await cache.match(key)) return;
+      const assetResponse = await fetch(key);
+      if (!assetResponse.ok) throw new Error(`${url}: ${assetResponse.status}`);
+      await cache.put(key, assetResponse);
+    }));
+
+    const next = { generation: current.generation + 1, assets };
+    await cache.put(generationKey(next.generation), new Response(JSON.stringify(assets)));
+    await cache.put(ACTIVE_KEY, new Response(JSON.stringify(next)));
+    generations[next.generation] = assets;
+    active = next;
+  })().finally(() => {
+    updating = null;
+  });
+  return updating;
+}
+
+// Drop closed pages and every revision no open page or new page refers to
+// (keepId: a page still being loaded, which may not be listed as open yet)
+async function prune(keepId) {
+  const [current, clients, open] = await Promise.all([
+    loadActive(),
+    loadClients(),
+    self.clients.matchAll({ includeUncontrolled: true, type: 'all' })
+  ]);
+  const openIds = new Set(open.map((client) => client.id));
+  for (const id of Object.keys(clients)) {
+    if (id !== keepId && !openIds.has(id)) delete clients[id];
+  }
+  await writeState(CLIENTS_KEY, clients);
+
+  const inUse = new Set([current.generation, ...Object.values(clients)]);
+  const keep = new Set([ACTIVE_KEY, CLIENTS_KEY]);
+  for (const generation of inUse) {
+    keep.add(generationKey(generation));
+    for (const [url, revision] of Object.entries(await assetsOf(generation))) {
+      keep.add(revisionKey(url, revision));
+    }
+  }
+  for (const generation of Object.keys(generations)) {
+    if (!inUse.has(Number(generation))) delete generations[generation];
+  }
+
+  const cache = await caches.open(CACHE_NAME);
+  const keys = await cache.keys();
+  await Promise.all(keys.filter((request) => !keep.has(request.url)).map((request) => cache.delete(request)));
+}
+
+// A page being loaded gets the active generation and keeps it
+async function pinClient(clientId) {
+  const [current, clients] = await Promise.all([loadActive(), loadClients()]);
+  if (clientId && clients[clientId] !== current.generation) {
+    clients[clientId] = current.generation;
+    await writeState(CLIENTS_KEY, clients);
+  }
+  return current.assets;
+}
+
 // Install - cache assets
 self.addEventListener('install', (event) => {
-  event.waitUntil(
-    caches.open(CACHE_NAME).then((cache) => cache.addAll(ASSETS_TO_CACHE))
-  );
+  event.waitUntil(updateAssets());
   self.skipWaiting();
 });
 
@@ -33,22 +153,28 @@ self.addEventListener('activate', (event) => {
   self.clients.claim();
 });
 
-// Fetch - Stale-While-Revalidate
+// Fetch - cache-first for manifest assets (in the page's generation),
+// network for everything else
 self.addEventListener('fetch', (event) => {
+  const url = new URL(event.request.url);
+  if (event.request.method !== 'GET' || url.origin !== self.location.origin) return;
+
+  const navigate = event.request.mode === 'navigate';
+  const assets = navigate
+    ? pinClient(event.resultingClientId)
+    : loadClients().then((clients) => assetsOf(clients[event.clientId]));
+
+  if (navigate) {
+    // Picked up by the next page load; pages closed since the last check
+    // release their revisions
+    event.waitUntil(assets.then(() => updateAssets()).catch(() => {}).then(() => prune(event.resultingClientId)).catch(() => {}));
+  }
+
   event.respondWith(
-    caches.open(CACHE_NAME).then((cache) => {
-      return cache.match(event.request).then((cachedResponse) => {
-        const fetchPromise = fetch(event.request).then((networkResponse) => {
-          // Update cache with fresh response
-          if (networkResponse && networkResponse.status === 200) {
-            cache.put(event.request, networkResponse.clone());
-          }
-          return networkResponse;
-        }).catch(() => cachedResponse); // Network failed, use cache
-
-        // Return cached response immediately, or wait for network
-        return cachedResponse || fetchPromise;
-      });
+    assets.then((revisions) => {
+      const revision = revisions[url.pathname];
+      const cached = revision ? caches.match(revisionKey(url.pathname, revision)) : Promise.resolve(null);
+      return cached.then((cachedResponse) => cachedResponse || fetch(event.request));
     })
   );
 });